@@ -1,4 +1,6 @@
 """Workzone metrics evaluation."""
 
-__all__ = ["__version__"]
+from .api import GTExpansionCache, evaluate
+
+__all__ = ["GTExpansionCache", "evaluate", "__version__"]
 __version__ = "0.1.0"
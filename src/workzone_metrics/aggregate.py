@@ -0,0 +1,182 @@
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from .metrics.registry import summary_fields
+from .metrics.state import REPORT_STATES, TransitionBreakdown, _safe_div
+
+
+@dataclass
+class MetricAccumulator:
+    """Count, sum and sum of squares of the non-None values of one metric."""
+
+    count: int = 0
+    total: float = 0
+    total_sq: float = 0
+
+    def add(self, value: Optional[float], sign: int = 1) -> None:
+        if value is None:
+            return
+        self.count += sign
+        self.total += sign * value
+        self.total_sq += sign * value * value
+
+    def merge(self, other: "MetricAccumulator") -> None:
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+
+    def to_list(self) -> List[float]:
+        return [self.count, self.total, self.total_sq]
+
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def std(self) -> Optional[float]:
+        # Matches utils._stdev: None without values, 0.0 for a single value.
+        if self.count <= 0:
+            return None
+        if self.count == 1:
+            return 0.0
+        mean = self.total / self.count
+        return math.sqrt(max(0.0, self.total_sq / self.count - mean * mean))
+
+
+class SummaryAccumulator:
+    """Mergeable partial aggregate of per-video payloads.
+
+    Contributions can be added, removed (for videos that are re-evaluated) and
+    merged across shards or groups; `summary()` yields the report summary block.
+    """
+
+    def __init__(self) -> None:
+        # Metrics registered with `summary` stats (see `register_metric`).
+        self.metrics: Dict[str, MetricAccumulator] = {
+            name: MetricAccumulator() for name in summary_fields()
+        }
+        self.videos_total = 0
+        self.videos_evaluated = 0
+        self.videos_slower_than_real_time = 0
+        self.transitions = TransitionBreakdown()
+        # Frame counts over REPORT_STATES, GT rows x predicted columns.
+        self.confusion: List[List[int]] = [[0] * len(REPORT_STATES) for _ in REPORT_STATES]
+
+    @classmethod
+    def from_videos(cls, videos: Iterable[Mapping[str, Any]]) -> "SummaryAccumulator":
+        acc = cls()
+        for payload in videos:
+            acc.add(payload)
+        return acc
+
+    def add(self, payload: Mapping[str, Any], sign: int = 1) -> None:
+        self.videos_total += sign
+        if "error" in payload:
+            return
+        self.videos_evaluated += sign
+        for name, acc in self.metrics.items():
+            acc.add(payload.get(name), sign)
+        rtf = payload.get("real_time_factor")
+        if rtf is not None and rtf > 1.0:
+            self.videos_slower_than_real_time += sign
+        breakdown = payload.get("transition_breakdown")
+        if breakdown is not None:
+            self.transitions.merge(TransitionBreakdown.from_dict(breakdown), sign)
+        matrix = payload.get("confusion_matrix")
+        if matrix is not None:
+            self._add_confusion(matrix, sign)
+
+    def _add_confusion(self, matrix: List[List[int]], sign: int = 1) -> None:
+        for row, other_row in zip(self.confusion, matrix):
+            for j, count in enumerate(other_row):
+                row[j] += sign * count
+
+    def remove(self, payload: Mapping[str, Any]) -> None:
+        self.add(payload, sign=-1)
+
+    def merge(self, other: "SummaryAccumulator") -> None:
+        for name, acc in other.metrics.items():
+            self.metrics.setdefault(name, MetricAccumulator()).merge(acc)
+        self.videos_total += other.videos_total
+        self.videos_evaluated += other.videos_evaluated
+        self.videos_slower_than_real_time += other.videos_slower_than_real_time
+        self.transitions.merge(other.transitions)
+        self._add_confusion(other.confusion)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable state; `from_dict` restores an accumulator that merges exactly."""
+        return {
+            "metrics": {name: acc.to_list() for name, acc in self.metrics.items() if acc.count},
+            "videos_total": self.videos_total,
+            "videos_evaluated": self.videos_evaluated,
+            "videos_slower_than_real_time": self.videos_slower_than_real_time,
+            "transitions": self.transitions.to_dict(),
+            "confusion_matrix": [list(row) for row in self.confusion],
+        }
+
+    @classmethod
+    def from_dict(cls, raw: Mapping[str, Any]) -> "SummaryAccumulator":
+        acc = cls()
+        for name, (count, total, total_sq) in raw.get("metrics", {}).items():
+            acc.metrics[name] = MetricAccumulator(count, total, total_sq)
+        acc.videos_total = raw.get("videos_total", 0)
+        acc.videos_evaluated = raw.get("videos_evaluated", 0)
+        acc.videos_slower_than_real_time = raw.get("videos_slower_than_real_time", 0)
+        acc.transitions = TransitionBreakdown.from_dict(raw.get("transitions", {}))
+        acc._add_confusion(raw.get("confusion_matrix", []))
+        return acc
+
+    def pooled(self) -> Dict[str, Optional[float]]:
+        """Micro (frame-pooled) metrics from the summed confusion matrix."""
+        matrix = self.confusion
+        total = sum(sum(row) for row in matrix)
+        out: Dict[str, Optional[float]] = {
+            "pooled_frame_accuracy": _safe_div(sum(matrix[i][i] for i in range(len(matrix))), total)
+        }
+        ious: List[float] = []
+        precisions: List[float] = []
+        recalls: List[float] = []
+        f1s: List[float] = []
+        for i, state in enumerate(REPORT_STATES):
+            tp = matrix[i][i]
+            gt_count = sum(matrix[i])
+            pred_count = sum(row[i] for row in matrix)
+            iou = _safe_div(tp, gt_count + pred_count - tp)
+            out[f"pooled_iou_{state}"] = iou
+            precision = _safe_div(tp, pred_count)
+            recall = _safe_div(tp, gt_count)
+            if iou is not None:
+                ious.append(iou)
+            if precision is not None:
+                precisions.append(precision)
+            if recall is not None:
+                recalls.append(recall)
+            if precision is not None and recall is not None and precision + recall > 0:
+                f1s.append(2 * precision * recall / (precision + recall))
+        out["pooled_mean_iou"] = _safe_div(sum(ious), len(ious))
+        out["pooled_macro_precision"] = _safe_div(sum(precisions), len(precisions))
+        out["pooled_macro_recall"] = _safe_div(sum(recalls), len(recalls))
+        out["pooled_macro_f1"] = _safe_div(sum(f1s), len(f1s))
+        return out
+
+    def summary(self) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {}
+        for name, stats in summary_fields().items():
+            acc = self.metrics.get(name) or MetricAccumulator()
+            if "mean" in stats:
+                summary[f"{name}_mean"] = acc.mean()
+            if "std" in stats:
+                summary[f"{name}_std"] = acc.std()
+            if "n" in stats:
+                summary[f"{name}_n"] = acc.count
+            if "total" in stats:
+                summary[f"{name}_total"] = acc.total
+        summary.update(self.pooled())
+        summary["confusion_matrix"] = {
+            "states": list(REPORT_STATES),
+            "counts": [list(row) for row in self.confusion],
+        }
+        summary["videos_slower_than_real_time"] = self.videos_slower_than_real_time
+        summary["transition_breakdown"] = self.transitions.summary()
+        summary["videos_evaluated"] = self.videos_evaluated
+        summary["videos_total"] = self.videos_total
+        return summary
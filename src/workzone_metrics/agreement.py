@@ -0,0 +1,186 @@
+import argparse
+import itertools
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Mapping, Optional
+
+from .compare import parse_pred_arg
+from .data_models import VideoGroundTruth
+from .io import load_ground_truth
+from .metrics.registry import EvalContext, compute_metrics, select_metrics
+from .metrics.state import _cohen_kappa, _expand_labels
+from .report import write_report
+from .utils import _mean
+
+AGREEMENT_METRICS = [
+    "frame_accuracy",
+    "iou_*",
+    "mean_iou",
+    "transition_accuracy",
+    "transition_recall",
+    "transition_precision",
+    "cohen_kappa",
+]
+
+# Matrices are indexed [reference][compared]; swapping the roles turns a
+# pair's recall into precision and vice versa. Other metrics are symmetric.
+_MIRROR = {"transition_recall": "transition_precision", "transition_precision": "transition_recall"}
+
+# Set once per worker process so annotation files are not re-sent per pair.
+_WORKER_FILES: List[Mapping[str, VideoGroundTruth]] = []
+_WORKER_LABELS: List[Mapping[str, List[str]]] = []
+
+
+def _init_worker(
+    files: List[Mapping[str, VideoGroundTruth]], labels: List[Mapping[str, List[str]]]
+) -> None:
+    global _WORKER_FILES, _WORKER_LABELS
+    _WORKER_FILES = files
+    _WORKER_LABELS = labels
+
+
+def _has_states(entry: Optional[VideoGroundTruth]) -> bool:
+    return entry is not None and any(len(v) for v in entry.states.values())
+
+
+def _agree_pair(i: int, j: int, transition_tolerance_frames: int) -> Dict[str, Any]:
+    """Per-video agreement of file `j` against file `i` (used as the reference)."""
+    a, b = _WORKER_FILES[i], _WORKER_FILES[j]
+    labels_a = _WORKER_LABELS[i]
+    names = select_metrics(AGREEMENT_METRICS)
+    videos: Dict[str, Dict[str, Any]] = {}
+    pooled: Counter = Counter()
+    for video in sorted(a.keys() & b.keys()):
+        if not _has_states(a[video]) or not _has_states(b[video]):
+            continue
+        ctx = EvalContext(
+            a[video].states,
+            b[video].states,
+            gt_labels=labels_a.get(video),
+            transition_tolerance_frames=transition_tolerance_frames,
+        )
+        videos[video] = compute_metrics(ctx, names)
+        pooled.update(ctx["label_pairs"])
+    correct = sum(n for (x, y), n in pooled.items() if x == y)
+    total = sum(pooled.values())
+    summary: Dict[str, Any] = {
+        f"{name}_mean": _mean([v.get(name) for v in videos.values()]) for name in names
+    }
+    summary["pooled_frame_accuracy"] = correct / total if total else None
+    summary["pooled_cohen_kappa"] = _cohen_kappa(pooled)
+    summary["videos_compared"] = len(videos)
+    summary["videos_only_in_a"] = len(a.keys() - b.keys())
+    summary["videos_only_in_b"] = len(b.keys() - a.keys())
+    return {"videos": videos, "summary": summary}
+
+
+def compute_agreement(
+    annotation_paths: Mapping[str, str],
+    transition_tolerance_frames: int = 0,
+    jobs: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Pairwise agreement across K annotation files.
+
+    Each file is loaded and expanded to per-frame labels once; the K*(K-1)/2
+    pairs run in parallel worker processes through the state-metric engine,
+    with the earlier file of each pair as the reference.
+    """
+    names = list(annotation_paths)
+    if len(names) < 2:
+        raise ValueError("Agreement needs at least two annotation files.")
+    files = [load_ground_truth(annotation_paths[name]) for name in names]
+    labels = [
+        {video: _expand_labels(entry.states) for video, entry in gt.items() if _has_states(entry)}
+        for gt in files
+    ]
+    pairs = list(itertools.combinations(range(len(names)), 2))
+
+    max_workers = max(1, min(len(pairs), jobs or os.cpu_count() or 1))
+    if max_workers == 1:
+        _init_worker(files, labels)
+        results = [_agree_pair(i, j, transition_tolerance_frames) for i, j in pairs]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_init_worker, initargs=(files, labels)
+        ) as pool:
+            futures = [pool.submit(_agree_pair, i, j, transition_tolerance_frames) for i, j in pairs]
+            results = [future.result() for future in futures]
+
+    metric_names = select_metrics(AGREEMENT_METRICS) + ["pooled_cohen_kappa", "pooled_frame_accuracy"]
+    matrices: Dict[str, List[List[Optional[float]]]] = {}
+    for metric in metric_names:
+        key = metric if metric.startswith("pooled_") else f"{metric}_mean"
+        matrix: List[List[Optional[float]]] = [
+            [1.0 if r == c else None for c in range(len(names))] for r in range(len(names))
+        ]
+        mirror_key = f"{_MIRROR[metric]}_mean" if metric in _MIRROR else key
+        for (i, j), result in zip(pairs, results):
+            matrix[i][j] = result["summary"][key]
+            matrix[j][i] = result["summary"][mirror_key]
+        matrices[metric] = matrix
+
+    # Per-video KxK matrices, filled only where both files annotate the video.
+    per_video: Dict[str, Dict[str, List[List[Optional[float]]]]] = {}
+    for (i, j), result in zip(pairs, results):
+        for video, values in result["videos"].items():
+            entry = per_video.get(video)
+            if entry is None:
+                entry = per_video[video] = {
+                    metric: [[None] * len(names) for _ in names] for metric in values
+                }
+            for metric, value in values.items():
+                entry[metric][i][j] = value
+                entry[metric][j][i] = values[_MIRROR.get(metric, metric)]
+
+    return {
+        "files": names,
+        "paths": dict(annotation_paths),
+        "transition_tolerance_frames": transition_tolerance_frames,
+        "pairs": {f"{names[i]}|{names[j]}": result for (i, j), result in zip(pairs, results)},
+        "matrices": matrices,
+        "videos": dict(sorted(per_video.items())),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Pairwise inter-annotator agreement across GT annotation files."
+    )
+    parser.add_argument(
+        "annotations",
+        nargs="+",
+        help="Annotation files (GT JSON or compiled store), optionally as name=path.",
+    )
+    parser.add_argument(
+        "--transition-tolerance-frames",
+        type=int,
+        default=0,
+        help="Allowed frame tolerance when matching state transitions.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes (default: one per pair, up to CPU count).",
+    )
+    parser.add_argument("--out", help="Optional path to write the agreement JSON.")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    paths = dict(parse_pred_arg(value) for value in args.annotations)
+    if len(paths) != len(args.annotations):
+        parser.error("Annotation names must be unique.")
+    if len(paths) < 2:
+        parser.error("Give at least two annotation files.")
+    write_report(
+        compute_agreement(paths, transition_tolerance_frames=args.transition_tolerance_frames, jobs=args.jobs),
+        args.out,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from .data_models import StateIntervals, VideoGroundTruth, VideoPredictions
+from .io import ground_truth_from_dict, predictions_from_dict
+from .metrics.state import _expand_labels, _transitions
+from .report import _build_report
+
+try:
+    from .metrics.batched import paint_codes
+except ImportError:  # Without NumPy only labels and transitions are cached.
+    paint_codes = None
+
+GTExpansion = Tuple[List[str], List[Tuple[str, str, int]]]
+
+
+def _states_key(states: StateIntervals) -> Tuple[Any, ...]:
+    return tuple(sorted((state, tuple(map(tuple, intervals))) for state, intervals in states.items()))
+
+
+class GTExpansionCache:
+    """Bounded LRU of expanded GT labels, transitions and state codes per video.
+
+    Entries are keyed by video name plus the GT intervals themselves, so a
+    changed annotation for the same video is expanded afresh rather than
+    served stale. The least recently used video is evicted beyond `maxsize`.
+    State codes (with NumPy) feed the batched pass; labels and transitions
+    the per-video one.
+    """
+
+    def __init__(self, maxsize: int = 2048):
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[Tuple[Any, ...], GTExpansion, Any]]" = OrderedDict()
+
+    def _lookup(self, video: str, states: StateIntervals) -> Tuple[GTExpansion, Any]:
+        key = _states_key(states)
+        cached = self._entries.get(video)
+        if cached is not None and cached[0] == key:
+            self._entries.move_to_end(video)
+            self.hits += 1
+            return cached[1], cached[2]
+        self.misses += 1
+        labels = _expand_labels(states)
+        expansion = (labels, _transitions(labels))
+        codes = paint_codes(states) if paint_codes is not None else None
+        self._entries[video] = (key, expansion, codes)
+        self._entries.move_to_end(video)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return expansion, codes
+
+    def get(self, video: str, states: StateIntervals) -> GTExpansion:
+        return self._lookup(video, states)[0]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def info(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self), "maxsize": self.maxsize}
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+
+_DEFAULT_CACHE = GTExpansionCache()
+
+GroundTruthInput = Union[VideoGroundTruth, Mapping[str, Any]]
+PredictionInput = Union[VideoPredictions, Mapping[str, Any]]
+
+
+def _as_ground_truth(gt: Mapping[str, GroundTruthInput]) -> Dict[str, VideoGroundTruth]:
+    out: Dict[str, VideoGroundTruth] = {}
+    for video, entry in gt.items():
+        out[video] = entry if isinstance(entry, VideoGroundTruth) else ground_truth_from_dict({video: entry})[video]
+    return out
+
+
+def _as_predictions(
+    preds: Union[Mapping[str, PredictionInput], Iterable[Tuple[str, PredictionInput]]]
+) -> Dict[str, VideoPredictions]:
+    items = preds.items() if isinstance(preds, Mapping) else preds
+    out: Dict[str, VideoPredictions] = {}
+    for video, entry in items:
+        if isinstance(entry, VideoPredictions):
+            out[video] = entry
+            continue
+        # A bare `{state: intervals}` dict is taken as the predicted states.
+        if "states" not in entry and "rle" not in entry:
+            entry = {"states": entry}
+        out[video] = predictions_from_dict({video: entry})[video]
+    return out
+
+
+def evaluate(
+    gt: Mapping[str, GroundTruthInput],
+    preds: Union[Mapping[str, PredictionInput], Iterable[Tuple[str, PredictionInput]]],
+    cache: Optional[GTExpansionCache] = None,
+    **params: Any,
+) -> Dict[str, Any]:
+    """Evaluate in-memory predictions against in-memory GT; returns the report dict.
+
+    `gt` maps videos to `VideoGroundTruth` or GT JSON entries
+    (`{state: [[start, end], ...]}` or `{"rle": ...}`). `preds` is a mapping
+    or an iterable of `(video, prediction)` pairs, where a prediction is a
+    `VideoPredictions`, a predictions JSON entry, or a bare `{state: intervals}`
+    dict. `params` are the report parameters (`transition_tolerance_frames`,
+    `min_event_overlap_frames`, `source_fps`, `stall_threshold_sec`,
+    `group_by`, `metrics`).
+
+    GT labels, transitions and state codes come from `cache` (a
+    process-wide `GTExpansionCache` by default), so repeated calls against
+    the same GT skip the expansion on both the batched and per-video paths.
+    """
+    cache = _DEFAULT_CACHE if cache is None else cache
+    gt_entries = _as_ground_truth(gt)
+    gt_labels: Dict[str, List[str]] = {}
+    gt_transitions: Dict[str, List[Tuple[str, str, int]]] = {}
+    gt_codes: Dict[str, Any] = {}
+    for video, entry in gt_entries.items():
+        if any(entry.states.values()):
+            (gt_labels[video], gt_transitions[video]), gt_codes[video] = cache._lookup(video, entry.states)
+    return _build_report(
+        gt_entries,
+        _as_predictions(preds),
+        gt_labels=gt_labels,
+        gt_transitions=gt_transitions,
+        gt_codes=gt_codes if paint_codes is not None else None,
+        **params,
+    )
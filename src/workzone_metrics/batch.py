@@ -0,0 +1,384 @@
+import argparse
+import json
+import os
+import queue
+import shlex
+import signal
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+
+@dataclass
+class BatchJob:
+    name: str
+    video_path: Path
+    out_dir: Path
+
+
+@dataclass
+class Worker:
+    device: str
+    gpu_id: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        return self.device if self.gpu_id is None else f"{self.device}:{self.gpu_id}"
+
+
+class Manifest:
+    """Resumable JSON record of per-video batch outcomes."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = Path(path) if path else None
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            with self.path.open("r", encoding="utf-8") as f:
+                raw = json.load(f)
+            self.entries = dict(raw.get("videos", {}))
+
+    def status(self, name: str) -> Optional[str]:
+        entry = self.entries.get(name)
+        return entry.get("status") if entry else None
+
+    def record(self, name: str, **fields: Any) -> None:
+        with self._lock:
+            self.entries[name] = fields
+            self._write()
+
+    def counts(self) -> Dict[str, int]:
+        counts = {STATUS_DONE: 0, STATUS_FAILED: 0, STATUS_SKIPPED: 0}
+        for entry in self.entries.values():
+            status = entry.get("status")
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def _write(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        payload = {"videos": self.entries, "counts": self.counts()}
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def _format_command(template: List[str], job: BatchJob, worker: Worker) -> List[str]:
+    values = {
+        "python": sys.executable,
+        "video": str(job.video_path),
+        "name": job.name,
+        "stem": Path(job.name).stem,
+        "out_dir": str(job.out_dir),
+        "device": worker.device,
+        "gpu_id": worker.gpu_id or "",
+    }
+    return [token.format(**values) for token in template]
+
+
+def _format_path(template: Optional[str], job: BatchJob) -> Optional[Path]:
+    if not template:
+        return None
+    return Path(
+        template.format(
+            name=job.name,
+            stem=Path(job.name).stem,
+            out_dir=str(job.out_dir),
+        )
+    )
+
+
+def check_templates(command_template: str, expected_output: Optional[str] = None) -> List[str]:
+    """Split the command template and format both templates for a dummy job.
+
+    Raises ValueError for unknown placeholders or unbalanced quotes/braces,
+    so a bad template fails before any job is queued.
+    """
+    job = BatchJob(name="video.mp4", video_path=Path("video.mp4"), out_dir=Path("out"))
+    try:
+        template = shlex.split(command_template)
+        _format_command(template, job, Worker(device="cpu"))
+        _format_path(expected_output, job)
+    except (KeyError, IndexError, ValueError) as exc:
+        raise ValueError(f"Invalid command or output template: {type(exc).__name__}: {exc}") from exc
+    return template
+
+
+def _run_once(cmd: List[str], env: Dict[str, str], cwd: Optional[str], timeout: Optional[float]):
+    # Run in a new session so a timeout can kill the whole process group,
+    # not just the wrapper process.
+    proc = subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        env=env,
+        start_new_session=(os.name == "posix"),
+    )
+    try:
+        return proc.wait(timeout=timeout), False
+    except subprocess.TimeoutExpired:
+        if os.name == "posix":
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        else:
+            proc.kill()
+        proc.wait()
+        return proc.returncode, True
+
+
+def _set_aside(out_path: Optional[Path]) -> None:
+    """Move an earlier attempt's output to `<name>.stale` so it cannot be mistaken for new output."""
+    if out_path is not None and out_path.exists():
+        os.replace(out_path, out_path.with_name(out_path.name + ".stale"))
+
+
+def run_batch(
+    jobs: List[BatchJob],
+    command_template: str,
+    manifest: Manifest,
+    cpu_workers: int = 1,
+    gpu_slots: int = 0,
+    gpu_ids: Optional[List[str]] = None,
+    timeout_sec: Optional[float] = None,
+    retries: int = 0,
+    expected_output: Optional[str] = None,
+    cwd: Optional[str] = None,
+    retry_failed: bool = True,
+    env: Optional[Dict[str, str]] = None,
+    accept_output_on_error: bool = False,
+) -> Dict[str, int]:
+    """Run a command per video on a pool of CPU workers and GPU slots.
+
+    Each worker pulls the next pending video from a shared queue, so a stuck
+    video only holds one slot and is killed after `timeout_sec`. A timed-out
+    attempt always fails, whatever it wrote. Output left by a non-zero exit
+    only counts with `accept_output_on_error`. An attempt that cannot start
+    (e.g. a missing executable) fails with its `error` recorded.
+    """
+    if cpu_workers < 0 or gpu_slots < 0 or cpu_workers + gpu_slots == 0:
+        raise ValueError("At least one CPU worker or GPU slot is required.")
+    template = check_templates(command_template, expected_output)
+    gpu_ids = gpu_ids or ["0"]
+
+    workers = [Worker(device="cpu") for _ in range(cpu_workers)]
+    workers.extend(
+        Worker(device="cuda", gpu_id=gpu_ids[i % len(gpu_ids)]) for i in range(gpu_slots)
+    )
+
+    pending: "queue.Queue[BatchJob]" = queue.Queue()
+    for job in jobs:
+        status = manifest.status(job.name)
+        if status in (STATUS_DONE, STATUS_SKIPPED):
+            continue
+        if status == STATUS_FAILED and not retry_failed:
+            continue
+        if not job.video_path.exists():
+            manifest.record(job.name, status=STATUS_SKIPPED, reason="missing_video")
+            continue
+        out_path = _format_path(expected_output, job)
+        # Output of a failed (e.g. timed-out) run is not trusted; the job is rerun.
+        if status is None and out_path is not None and out_path.exists():
+            manifest.record(job.name, status=STATUS_SKIPPED, reason="output_exists")
+            continue
+        pending.put(job)
+
+    total = pending.qsize()
+    progress = {"finished": 0}
+    progress_lock = threading.Lock()
+    base_env = dict(os.environ if env is None else env)
+
+    def _work(worker: Worker) -> None:
+        worker_env = dict(base_env)
+        if worker.gpu_id is not None:
+            worker_env["CUDA_VISIBLE_DEVICES"] = worker.gpu_id
+        while True:
+            try:
+                job = pending.get_nowait()
+            except queue.Empty:
+                return
+            cmd = _format_command(template, job, worker)
+            out_path = _format_path(expected_output, job)
+            attempts = 0
+            returncode = None
+            timed_out = False
+            error = None
+            ok = False
+            start = time.monotonic()
+            while attempts <= retries and not ok:
+                attempts += 1
+                try:
+                    job.out_dir.mkdir(parents=True, exist_ok=True)
+                    _set_aside(out_path)
+                    returncode, timed_out = _run_once(cmd, worker_env, cwd, timeout_sec)
+                except OSError as exc:
+                    returncode, timed_out, error = None, False, f"{type(exc).__name__}: {exc}"
+                    continue
+                error = None
+                produced = out_path is None or out_path.exists()
+                if timed_out:
+                    ok = False  # Whatever a killed run left behind is partial.
+                elif returncode == 0:
+                    ok = produced
+                else:
+                    # Pipeline crashed after writing its timeline; only kept when opted into.
+                    ok = accept_output_on_error and out_path is not None and produced
+            fields: Dict[str, Any] = {
+                "status": STATUS_DONE if ok else STATUS_FAILED,
+                "attempts": attempts,
+                "returncode": returncode,
+                "timed_out": timed_out,
+                "elapsed_sec": round(time.monotonic() - start, 3),
+                "worker": worker.label,
+            }
+            if error is not None:
+                fields["error"] = error
+            manifest.record(job.name, **fields)
+            with progress_lock:
+                progress["finished"] += 1
+                print(
+                    f"[{progress['finished']}/{total}] {fields['status'].upper()} "
+                    f"{job.name} ({worker.label}, attempts={attempts})",
+                    flush=True,
+                )
+
+    threads = [threading.Thread(target=_work, args=(w,), daemon=True) for w in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return manifest.counts()
+
+
+def _load_video_names(gt_path: Optional[str], videos_dir: Path) -> List[str]:
+    if gt_path:
+        with open(gt_path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        if not isinstance(raw, dict):
+            raise ValueError("Ground-truth JSON must be an object keyed by video filename.")
+        return sorted(raw.keys())
+    return sorted(p.name for p in videos_dir.glob("*.mp4"))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Run a per-video pipeline command over a batch of videos in parallel."
+    )
+    parser.add_argument("--videos", required=True, help="Directory containing input videos.")
+    parser.add_argument(
+        "--gt",
+        help="Optional ground-truth JSON; its keys select the videos to run (default: all *.mp4).",
+    )
+    parser.add_argument("--outputs", required=True, help="Batch outputs directory.")
+    parser.add_argument(
+        "--cmd",
+        required=True,
+        help=(
+            "Command template. Placeholders: {python}, {video}, {name}, {stem}, "
+            "{out_dir}, {device}, {gpu_id}."
+        ),
+    )
+    parser.add_argument(
+        "--out-dir-template",
+        default="{outputs}/{stem}",
+        help="Per-video output directory template (placeholders: {outputs}, {name}, {stem}).",
+    )
+    parser.add_argument(
+        "--expect",
+        help=(
+            "Expected output path template (placeholders: {name}, {stem}, {out_dir}); "
+            "a job only counts as done if it exists."
+        ),
+    )
+    parser.add_argument("--manifest", help="Manifest JSON path (default: <outputs>/batch_manifest.json).")
+    parser.add_argument("--cpu-workers", type=int, default=1, help="Number of CPU workers.")
+    parser.add_argument("--gpu-slots", type=int, default=0, help="Number of concurrent GPU jobs.")
+    parser.add_argument(
+        "--gpu-ids",
+        default="0",
+        help="Comma-separated CUDA device ids; GPU slots are spread over them round-robin.",
+    )
+    parser.add_argument("--timeout", type=float, default=None, help="Per-video timeout in seconds.")
+    parser.add_argument("--retries", type=int, default=0, help="Retries per video after a failure.")
+    parser.add_argument("--cwd", help="Working directory for the command.")
+    parser.add_argument(
+        "--accept-output-on-error",
+        action="store_true",
+        help="Count a non-zero exit as done if the --expect output was written (timeouts always fail).",
+    )
+    parser.add_argument(
+        "--no-retry-failed",
+        action="store_true",
+        help="On resume, leave videos already marked failed in the manifest.",
+    )
+    parser.add_argument("--limit", type=int, default=None, help="Optional limit on number of videos.")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    videos_dir = Path(args.videos)
+    outputs_dir = Path(args.outputs)
+    try:
+        check_templates(args.cmd, args.expect)
+    except ValueError as exc:
+        parser.error(str(exc))
+    try:
+        args.out_dir_template.format(outputs=str(outputs_dir), name="video.mp4", stem="video")
+    except (KeyError, IndexError, ValueError) as exc:
+        parser.error(f"Invalid --out-dir-template: {type(exc).__name__}: {exc}")
+    names = _load_video_names(args.gt, videos_dir)
+    if args.limit is not None:
+        names = names[: args.limit]
+
+    jobs = [
+        BatchJob(
+            name=name,
+            video_path=(videos_dir / name).resolve(),
+            out_dir=Path(
+                args.out_dir_template.format(
+                    outputs=str(outputs_dir), name=name, stem=Path(name).stem
+                )
+            ).resolve(),
+        )
+        for name in names
+    ]
+    manifest_path = args.manifest or str(outputs_dir / "batch_manifest.json")
+    manifest = Manifest(manifest_path)
+    counts = run_batch(
+        jobs,
+        args.cmd,
+        manifest,
+        cpu_workers=args.cpu_workers,
+        gpu_slots=args.gpu_slots,
+        gpu_ids=[x.strip() for x in args.gpu_ids.split(",") if x.strip()],
+        timeout_sec=args.timeout,
+        retries=args.retries,
+        expected_output=args.expect,
+        cwd=args.cwd,
+        retry_failed=not args.no_retry_failed,
+        accept_output_on_error=args.accept_output_on_error,
+    )
+    print(
+        "DONE ok {} fail {} skipped {}".format(
+            counts.get(STATUS_DONE, 0), counts.get(STATUS_FAILED, 0), counts.get(STATUS_SKIPPED, 0)
+        )
+    )
+    if counts.get(STATUS_FAILED, 0):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
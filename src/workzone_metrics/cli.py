@@ -1,15 +1,46 @@
 import argparse
+import sys
+from typing import Any, Dict, List, Optional
 
-from .report import generate_report, write_report
+from . import server
+from .compare import compare_runs, parse_pred_arg
+from .grouping import parse_group_by_specs
+from .metrics.registry import parse_metrics_arg, select_metrics
+from .io import load_ground_truth, load_predictions
+from .report import _build_report, write_report
+from .sampling import generate_sampled_report
+from .score_sweep import score_sweep, write_score_sweep
+from .segments import error_segments, write_error_segments
+from .shard import evaluate_partial, merge_partials, parse_shard
+from .store import open_store, record_run
+from .watch import watch
 
 
 def build_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(description="Evaluate workzone metrics.")
+    parser = argparse.ArgumentParser(
+        description="Evaluate workzone metrics. Run `wzm-eval serve --help` for server mode."
+    )
     parser.add_argument("--gt", required=True, help="Path to ground-truth JSON.")
     parser.add_argument(
         "--pred",
-        required=True,
-        help="Path to predictions JSON, a timeline CSV, or a directory of timeline CSVs.",
+        action="append",
+        help=(
+            "Path to predictions JSON, a timeline CSV, or a directory of timeline CSVs. "
+            "Repeat as --pred name=path to compare several runs against the same GT."
+        ),
+    )
+    parser.add_argument(
+        "--baseline",
+        help="Run name that other runs are compared against (default: first --pred).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help=(
+            "Worker processes for multi-run comparison (default: one per run, up to CPU count) "
+            "and for parsing zip prediction archives (default: 1)."
+        ),
     )
     parser.add_argument("--out", help="Optional path to write the report JSON.")
     parser.add_argument(
@@ -24,19 +55,301 @@ def build_parser() -> argparse.ArgumentParser:
         default=1,
         help="Minimum overlap (frames) to match GT/pred INSIDE events.",
     )
+    parser.add_argument(
+        "--source-fps",
+        type=float,
+        default=30.0,
+        help="Source video frame rate used for the real-time factor.",
+    )
+    parser.add_argument(
+        "--stall-threshold-sec",
+        type=float,
+        default=0.5,
+        help="Gap between timeline rows (seconds) counted as a pipeline stall.",
+    )
+    parser.add_argument(
+        "--group-by",
+        action="append",
+        help=(
+            "Add per-group summaries: city, regex:<pattern>, or <metadata.json>:<field>. "
+            "Repeat to also get summaries per group combination."
+        ),
+    )
+    parser.add_argument(
+        "--metrics",
+        help=(
+            "Comma-separated metric names or shell patterns to compute, e.g. "
+            "frame_accuracy,transition_* (default: all registered metrics)."
+        ),
+    )
+    parser.add_argument(
+        "--chunk-frames",
+        type=int,
+        metavar="N",
+        help=(
+            "Evaluate videos longer than N frames in N-frame windows, e.g. hour-long drives "
+            "(identical metrics, memory bounded by N)."
+        ),
+    )
+    parser.add_argument(
+        "--sample",
+        type=float,
+        metavar="FRACTION",
+        help="Evaluate a city-stratified sample of this fraction of GT videos and report "
+        "confidence intervals for the summary means under sample.estimates.",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for --sample.")
+    parser.add_argument(
+        "--sample-frames",
+        type=int,
+        default=1,
+        metavar="K",
+        help="With --sample, evaluate only every K-th frame.",
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=0.95,
+        help="Confidence level of the --sample intervals.",
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="I/N",
+        help="Evaluate only shard I of N (0-based, round-robin over sorted GT video names).",
+    )
+    parser.add_argument(
+        "--partial",
+        metavar="PATH",
+        help="Write mergeable aggregate state to PATH instead of a report (combine with wzm-merge).",
+    )
+    parser.add_argument(
+        "--error-segments",
+        metavar="PATH",
+        help="Write one NDJSON record per contiguous GT/pred disagreement run, longest first.",
+    )
+    parser.add_argument(
+        "--score-sweep",
+        metavar="PATH",
+        help=(
+            "Write precision/recall/false-activation curves and average precision over the "
+            "activation threshold, from per-frame prediction scores."
+        ),
+    )
+    parser.add_argument(
+        "--score-sweep-points",
+        type=int,
+        default=101,
+        help="Maximum thresholds kept per reported curve (AUC always uses all).",
+    )
+    parser.add_argument(
+        "--store",
+        metavar="DB",
+        help="Also record the run(s) and per-video metrics in this SQLite store (see wzm-store).",
+    )
+    parser.add_argument(
+        "--run-name",
+        help="Name for the stored run (default: the --pred name); prefixes run names when comparing.",
+    )
+    parser.add_argument(
+        "--watch",
+        metavar="DIR",
+        help="Poll DIR for timeline CSVs and rewrite --out as they land (replaces --pred).",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=2.0,
+        help="Seconds between directory polls in --watch mode.",
+    )
+    parser.add_argument(
+        "--write-interval",
+        type=float,
+        default=30.0,
+        help="Minimum seconds between report rewrites in --watch mode.",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=600.0,
+        help="Stop --watch after this many seconds without new or changed timelines.",
+    )
+    parser.add_argument(
+        "--sentinel",
+        default="DONE",
+        help="Stop --watch once this file appears in the watched directory.",
+    )
     return parser
 
 
-def main() -> None:
+def _store_run(args: argparse.Namespace, report: Dict[str, Any], name: str, pred_source: str) -> None:
+    params = {
+        "transition_tolerance_frames": args.transition_tolerance_frames,
+        "min_event_overlap_frames": args.min_event_overlap_frames,
+        "source_fps": args.source_fps,
+        "stall_threshold_sec": args.stall_threshold_sec,
+        "group_by": args.group_by,
+        "metrics": parse_metrics_arg(args.metrics),
+    }
+    conn = open_store(args.store)
+    try:
+        run_id = record_run(conn, report, name, gt_path=args.gt, pred_source=pred_source, params=params)
+    finally:
+        conn.close()
+    print(f"Stored run {run_id} ({name}) in {args.store}", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["serve"]:
+        server.main(argv[1:])
+        return
     parser = build_parser()
-    args = parser.parse_args()
-    report = generate_report(
-        args.gt,
-        args.pred,
+    args = parser.parse_args(argv)
+    metrics = parse_metrics_arg(args.metrics)
+    try:
+        select_metrics(metrics)
+    except ValueError as exc:
+        parser.error(str(exc))
+    try:
+        parse_group_by_specs(args.group_by or [])
+    except (ValueError, OSError) as exc:
+        parser.error(f"--group-by: {exc}")
+    sharded = bool(args.shard or args.partial)
+    if args.sample is not None and (args.watch or sharded or args.store or len(args.pred or []) > 1):
+        parser.error(
+            "--sample takes a single --pred and cannot be combined with "
+            "--watch, --shard/--partial or --store."
+        )
+    if args.error_segments and (args.watch or sharded or args.sample is not None or len(args.pred or []) > 1):
+        parser.error(
+            "--error-segments needs a single full evaluation (no --watch, --shard, --sample or multi-run)."
+        )
+    if args.score_sweep and (args.watch or sharded or args.sample is not None or len(args.pred or []) > 1):
+        parser.error(
+            "--score-sweep needs a single full evaluation (no --watch, --shard, --sample or multi-run)."
+        )
+    if args.chunk_frames is not None:
+        if args.chunk_frames < 1:
+            parser.error("--chunk-frames must be >= 1.")
+        if args.watch or sharded or args.sample is not None or len(args.pred or []) > 1:
+            parser.error("--chunk-frames needs a single full evaluation (no --watch, --shard, --sample or multi-run).")
+    if args.store and (args.watch or args.partial):
+        parser.error("--store records finished reports; it cannot be combined with --watch or --partial.")
+    if args.watch:
+        if sharded:
+            parser.error("--shard/--partial cannot be combined with --watch.")
+        if args.pred:
+            parser.error("--watch replaces --pred.")
+        if not args.out:
+            parser.error("--watch requires --out.")
+        watch(
+            args.gt,
+            args.watch,
+            args.out,
+            poll_interval_sec=args.watch_interval,
+            write_interval_sec=args.write_interval,
+            idle_timeout_sec=args.idle_timeout,
+            sentinel=args.sentinel,
+            transition_tolerance_frames=args.transition_tolerance_frames,
+            min_event_overlap_frames=args.min_event_overlap_frames,
+            source_fps=args.source_fps,
+            stall_threshold_sec=args.stall_threshold_sec,
+            metrics=metrics,
+            group_by=args.group_by,
+        )
+        return
+    if not args.pred:
+        parser.error("--pred is required (or use --watch).")
+    if sharded:
+        if len(args.pred) > 1:
+            parser.error("--shard/--partial take a single --pred.")
+        try:
+            shard = parse_shard(args.shard) if args.shard else (0, 1)
+        except ValueError as exc:
+            parser.error(str(exc))
+        partial = evaluate_partial(
+            args.gt,
+            parse_pred_arg(args.pred[0])[1],
+            shard=shard,
+            transition_tolerance_frames=args.transition_tolerance_frames,
+            min_event_overlap_frames=args.min_event_overlap_frames,
+            source_fps=args.source_fps,
+            stall_threshold_sec=args.stall_threshold_sec,
+            group_by=args.group_by,
+            metrics=metrics,
+        )
+        if args.partial:
+            write_report(partial, args.partial)
+            return
+        report = merge_partials([partial])
+        write_report(report, args.out)
+        if args.store:
+            name, pred_path = parse_pred_arg(args.pred[0])
+            _store_run(args, report, args.run_name or f"{name}[{shard[0]}/{shard[1]}]", pred_path)
+        return
+    if len(args.pred) > 1:
+        pred_paths = dict(parse_pred_arg(value) for value in args.pred)
+        if len(pred_paths) != len(args.pred):
+            parser.error("--pred run names must be unique.")
+        report = compare_runs(
+            args.gt,
+            pred_paths,
+            baseline=args.baseline,
+            jobs=args.jobs,
+            transition_tolerance_frames=args.transition_tolerance_frames,
+            min_event_overlap_frames=args.min_event_overlap_frames,
+            source_fps=args.source_fps,
+            stall_threshold_sec=args.stall_threshold_sec,
+            group_by=args.group_by,
+            metrics=metrics,
+        )
+        write_report(report, args.out)
+        if args.store:
+            for name, run in report["runs"].items():
+                run_name = f"{args.run_name}:{name}" if args.run_name else name
+                _store_run(args, run, run_name, run["pred"])
+        return
+    name, pred_path = parse_pred_arg(args.pred[0])
+    if args.sample is not None:
+        try:
+            report = generate_sampled_report(
+                args.gt,
+                pred_path,
+                args.sample,
+                seed=args.seed,
+                frame_stride=args.sample_frames,
+                confidence=args.confidence,
+                transition_tolerance_frames=args.transition_tolerance_frames,
+                min_event_overlap_frames=args.min_event_overlap_frames,
+                source_fps=args.source_fps,
+                stall_threshold_sec=args.stall_threshold_sec,
+                metrics=metrics,
+                group_by=args.group_by,
+            )
+        except ValueError as exc:
+            parser.error(str(exc))
+        write_report(report, args.out)
+        return
+    gt = load_ground_truth(args.gt)
+    preds = load_predictions(pred_path, videos=set(gt), jobs=args.jobs)
+    report = _build_report(
+        gt,
+        preds,
         transition_tolerance_frames=args.transition_tolerance_frames,
         min_event_overlap_frames=args.min_event_overlap_frames,
+        source_fps=args.source_fps,
+        stall_threshold_sec=args.stall_threshold_sec,
+        group_by=args.group_by,
+        metrics=metrics,
+        chunk_frames=args.chunk_frames,
     )
     write_report(report, args.out)
+    if args.error_segments:
+        write_error_segments(error_segments(gt, preds), args.error_segments)
+    if args.score_sweep:
+        write_score_sweep(score_sweep(gt, preds, max_points=args.score_sweep_points), args.score_sweep)
+    if args.store:
+        _store_run(args, report, args.run_name or name, pred_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,183 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .data_models import VideoGroundTruth
+from .io import load_ground_truth, load_predictions
+from .metrics.state import _expand_labels
+from .report import _build_report
+from .utils import _mean
+
+try:
+    from .metrics.batched import paint_codes
+except ImportError:  # Without NumPy only labels are expanded up front.
+    paint_codes = None
+
+HIGHER_IS_BETTER = [
+    "frame_accuracy",
+    "transition_recall",
+    "transition_precision",
+    "transition_accuracy",
+    "event_recall",
+    "event_precision",
+    "advisory_event_recall",
+    "advisory_event_precision",
+    "iou_outside",
+    "iou_approaching",
+    "iou_inside",
+    "iou_exiting",
+    "mean_iou",
+    "macro_precision",
+    "macro_recall",
+    "macro_f1",
+    "cohen_kappa",
+    "advisory_coverage_ratio",
+    "simulated_speed_violation_reduction",
+]
+
+LOWER_IS_BETTER = [
+    "time_in_error_frames",
+    "time_in_error_sec",
+    "entry_timing_mae_frames",
+    "entry_timing_mae_sec",
+    "false_activation_rate",
+    "false_activations_per_minute",
+    "false_advisory_rate",
+    "false_advisories_per_minute",
+    "advisory_timing_mae_frames",
+    "advisory_timing_mae_sec",
+    "late_advisory_rate",
+]
+
+# Set once per worker process so the GT is not re-sent with every run.
+_WORKER_GT: Optional[Mapping[str, VideoGroundTruth]] = None
+_WORKER_GT_LABELS: Optional[Mapping[str, List[str]]] = None
+
+
+def parse_pred_arg(value: str) -> Tuple[str, str]:
+    """Split a `name=path` --pred value; a bare path is named after its file/dir."""
+    if "=" in value and not Path(value).exists():
+        name, path = value.split("=", 1)
+        if name:
+            return name, path
+    return Path(value.rstrip("/\\")).name, value
+
+
+def _init_worker(
+    gt: Mapping[str, VideoGroundTruth],
+    gt_labels: Mapping[str, List[str]],
+    gt_codes: Optional[Mapping[str, Any]] = None,
+) -> None:
+    global _WORKER_GT, _WORKER_GT_LABELS, _WORKER_GT_CODES
+    _WORKER_GT = gt
+    _WORKER_GT_LABELS = gt_labels
+    _WORKER_GT_CODES = gt_codes
+
+
+def _evaluate_run(pred_path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    preds = load_predictions(pred_path)
+    return _build_report(_WORKER_GT, preds, gt_labels=_WORKER_GT_LABELS, gt_codes=_WORKER_GT_CODES, **params)
+
+
+def _paired_deltas(
+    baseline: Mapping[str, Dict[str, Any]],
+    candidate: Mapping[str, Dict[str, Any]],
+) -> Dict[str, Any]:
+    per_video: Dict[str, Dict[str, float]] = {}
+    per_metric: Dict[str, Dict[str, Any]] = {}
+    for metric in HIGHER_IS_BETTER + LOWER_IS_BETTER:
+        sign = 1 if metric in HIGHER_IS_BETTER else -1
+        wins = losses = ties = 0
+        deltas: List[float] = []
+        for video, base_entry in baseline.items():
+            cand_entry = candidate.get(video)
+            if cand_entry is None or "error" in base_entry or "error" in cand_entry:
+                continue
+            base_val = base_entry.get(metric)
+            cand_val = cand_entry.get(metric)
+            if base_val is None or cand_val is None:
+                continue
+            delta = cand_val - base_val
+            per_video.setdefault(video, {})[metric] = delta
+            deltas.append(delta)
+            if delta * sign > 0:
+                wins += 1
+            elif delta * sign < 0:
+                losses += 1
+            else:
+                ties += 1
+        per_metric[metric] = {
+            "delta_mean": _mean(deltas),
+            "n": len(deltas),
+            "wins": wins,
+            "losses": losses,
+            "ties": ties,
+        }
+    return {"metrics": per_metric, "videos": per_video}
+
+
+def compare_runs(
+    gt_path: str,
+    pred_paths: Mapping[str, str],
+    baseline: Optional[str] = None,
+    jobs: Optional[int] = None,
+    transition_tolerance_frames: int = 0,
+    min_event_overlap_frames: int = 1,
+    source_fps: float = 30.0,
+    stall_threshold_sec: float = 0.5,
+    group_by: Optional[Sequence[str]] = None,
+    metrics: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """Evaluate several prediction sets against one GT, loaded and expanded once.
+
+    Runs are evaluated in parallel worker processes. Each non-baseline run is
+    paired per video against the baseline (first run by default); wins/losses
+    respect each metric's direction.
+    """
+    if not pred_paths:
+        raise ValueError("At least one prediction set is required.")
+    names = list(pred_paths.keys())
+    baseline = baseline or names[0]
+    if baseline not in pred_paths:
+        raise ValueError(f"Unknown baseline run: {baseline}")
+
+    gt = load_ground_truth(gt_path)
+    gt_labels = {video: _expand_labels(entry.states) for video, entry in gt.items() if entry.states}
+    gt_codes = (
+        {video: paint_codes(entry.states) for video, entry in gt.items() if entry.states}
+        if paint_codes is not None
+        else None
+    )
+    params = {
+        "transition_tolerance_frames": transition_tolerance_frames,
+        "min_event_overlap_frames": min_event_overlap_frames,
+        "source_fps": source_fps,
+        "stall_threshold_sec": stall_threshold_sec,
+        "group_by": list(group_by) if group_by else None,
+        "metrics": list(metrics) if metrics else None,
+    }
+
+    max_workers = max(1, min(len(names), jobs or os.cpu_count() or 1))
+    if max_workers == 1:
+        _init_worker(gt, gt_labels, gt_codes)
+        reports = {name: _evaluate_run(pred_paths[name], params) for name in names}
+    else:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(gt, gt_labels, gt_codes),
+        ) as pool:
+            futures = {name: pool.submit(_evaluate_run, pred_paths[name], params) for name in names}
+            reports = {name: future.result() for name, future in futures.items()}
+
+    comparisons = {
+        f"{name}_vs_{baseline}": _paired_deltas(reports[baseline]["videos"], reports[name]["videos"])
+        for name in names
+        if name != baseline
+    }
+    return {
+        "baseline": baseline,
+        "runs": {name: {"pred": pred_paths[name], **reports[name]} for name in names},
+        "comparisons": comparisons,
+    }
@@ -0,0 +1,111 @@
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from .data_models import STATE_CODES, StateIntervals, VideoGroundTruth, VideoPredictions
+from .io import load_ground_truth, load_predictions
+from .metrics.state import DEFAULT_STATE_ORDER, _labels_from_intervals, _max_frame
+
+
+def encode_rle(states: StateIntervals) -> Tuple[List[List[int]], Optional[List[str]]]:
+    """Encode intervals as `[state_code, length]` runs from frame 0.
+
+    Overlaps resolve with the usual state priority; frames not covered by
+    any interval become `outside`. A run also starts at every interval start,
+    so adjacent intervals of one state stay separate events. Returns the runs
+    and a state-code table when states beyond `STATE_CODES` occur (else None).
+    """
+    if not any(states.values()):
+        return [], None
+    extra = sorted(state for state in states if state not in STATE_CODES)
+    table = STATE_CODES + extra
+    codes = {state: i for i, state in enumerate(table)}
+    # Unknown states paint first, so known states win where they overlap.
+    labels = _labels_from_intervals(states, _max_frame(states) + 1, order=extra + DEFAULT_STATE_ORDER)
+    starts = {(start, state) for state, intervals in states.items() for start, _ in intervals}
+    runs: List[List[int]] = []
+    previous = None
+    for frame, label in enumerate(labels):
+        if label != previous or (frame, label) in starts:
+            runs.append([codes[label], 1])
+            previous = label
+        else:
+            runs[-1][1] += 1
+    return runs, (table if extra else None)
+
+
+def has_overlaps(states: StateIntervals) -> bool:
+    """True when any two intervals share a frame.
+
+    `encode_rle` resolves such frames by state priority, so the converted
+    entry can give different start frames and metrics than the original.
+    """
+    intervals = sorted(interval for entries in states.values() for interval in entries)
+    return any(start <= previous_end for (_, previous_end), (start, _) in zip(intervals, intervals[1:]))
+
+
+def overlapping_videos(states_by_video: Mapping[str, Optional[StateIntervals]]) -> List[str]:
+    return sorted(video for video, states in states_by_video.items() if states and has_overlaps(states))
+
+
+def _rle_entry(states: StateIntervals) -> Dict[str, Any]:
+    runs, table = encode_rle(states)
+    entry: Dict[str, Any] = {"rle": runs}
+    if table is not None:
+        entry["state_codes"] = table
+    return entry
+
+
+def convert_ground_truth(gt: Mapping[str, VideoGroundTruth]) -> Dict[str, Any]:
+    return {video: _rle_entry(entry.states) for video, entry in gt.items()}
+
+
+def convert_predictions(preds: Mapping[str, VideoPredictions]) -> Dict[str, Any]:
+    """Predictions JSON with `rle` in place of `states`; other fields are kept."""
+    out: Dict[str, Any] = {}
+    for video, entry in preds.items():
+        converted: Dict[str, Any] = {"fps": entry.fps}
+        if entry.states is not None:
+            converted.update(_rle_entry(entry.states))
+        # Lazy detection-store handles stay in their store.
+        converted["detections"] = entry.detections if isinstance(entry.detections, (dict, list)) else None
+        converted["ocr"] = entry.ocr
+        out[video] = converted
+    return out
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Rewrite GT or predictions into the compact run-length (`rle`) JSON encoding."
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--gt", help="Ground-truth JSON to convert.")
+    source.add_argument("--pred", help="Predictions JSON, timeline CSV, or directory/archive of timeline CSVs.")
+    parser.add_argument("--out", required=True, help="Output JSON path.")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    if args.gt:
+        gt = load_ground_truth(args.gt)
+        converted = convert_ground_truth(gt)
+        resolved = overlapping_videos({video: entry.states for video, entry in gt.items()})
+    else:
+        preds = load_predictions(args.pred)
+        converted = convert_predictions(preds)
+        resolved = overlapping_videos({video: entry.states for video, entry in preds.items()})
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(converted, f, separators=(",", ":"))
+    print(f"Wrote {len(converted)} videos to {args.out}")
+    if resolved:
+        print(
+            f"Warning: resolved overlapping intervals by state priority in {len(resolved)} videos; "
+            f"their reports can differ from the original file: {', '.join(resolved)}",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,22 @@
+from array import array
 from dataclasses import dataclass
 from typing import Dict, List, Tuple, Any, Optional
 
 
 StateIntervals = Dict[str, List[Tuple[int, int]]]
 
+# Canonical code per state for compact label encodings; unknown states get
+# codes appended after these.
+STATE_CODES = ["outside", "approaching", "inside", "exiting"]
+
+
+@dataclass
+class FrameTimes:
+    """Per-row timeline timestamps kept as compact typed arrays."""
+
+    frames: array  # typecode "l": frame index per timeline row
+    times: array  # typecode "d": time_sec per timeline row
+
 
 @dataclass
 class VideoGroundTruth:
@@ -16,3 +29,5 @@ class VideoPredictions:
     fps: Optional[float]
     detections: Optional[Any]
     ocr: Optional[Any]
+    frame_times: Optional[FrameTimes] = None
+    scores: Optional[array] = None  # typecode "d": per-frame workzone score, NaN where missing
@@ -0,0 +1,274 @@
+import argparse
+import json
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .data_models import VideoPredictions
+
+DETECTION_STORE_FORMAT = "wzm-detections"
+DETECTION_STORE_VERSION = 1
+_INDEX = "index.json"
+_COLUMNS = ("frame", "class", "score", "box")
+
+
+def is_detection_store(path: str) -> bool:
+    index = Path(path) / _INDEX
+    if not index.is_file():
+        return False
+    try:
+        with index.open("r", encoding="utf-8") as f:
+            return json.load(f).get("format") == DETECTION_STORE_FORMAT
+    except (OSError, ValueError):
+        return False
+
+
+@dataclass
+class DetectionSummary:
+    """Per-frame detection summary: detection count and max score per class.
+
+    `counts` and `scores` have shape (frames, classes); frame `i` is row `i`.
+    """
+
+    classes: List[str]
+    counts: np.ndarray
+    scores: np.ndarray
+
+    @classmethod
+    def from_dict(cls, raw: Mapping[str, Any]) -> "DetectionSummary":
+        """Parse `{"frames": [...], "classes": {name: {"count": [...], "score": [...]}}}`.
+
+        `frames` defaults to 0..n-1; missing frames have no detections. Either
+        of `count` / `score` may be omitted per class.
+        """
+        classes = sorted(raw.get("classes", {}))
+        columns = [raw["classes"][name] for name in classes]
+        length = max((len(col.get("count", col.get("score", []))) for col in columns), default=0)
+        frames = np.asarray(raw.get("frames", range(length)), dtype=np.int64)
+        total = int(frames.max()) + 1 if len(frames) else 0
+        counts = np.zeros((total, len(classes)), dtype=np.float32)
+        scores = np.zeros((total, len(classes)), dtype=np.float32)
+        for j, col in enumerate(columns):
+            if "count" in col:
+                counts[frames, j] = col["count"]
+            if "score" in col:
+                scores[frames, j] = col["score"]
+        return cls(classes=classes, counts=counts, scores=scores)
+
+    def evidence(self, class_weights: Optional[Mapping[str, float]] = None, mode: str = "count") -> np.ndarray:
+        """Weighted per-frame work-zone evidence from counts or max scores."""
+        weights = np.array(
+            [1.0 if class_weights is None else class_weights.get(name, 0.0) for name in self.classes],
+            dtype=np.float32,
+        )
+        values = self.counts if mode == "count" else self.scores
+        return values @ weights
+
+
+class DetectionHandle:
+    """Lazy view of one video's rows in a `DetectionStore`.
+
+    Nothing is read until a method asks for rows; frame ranges are located by
+    binary search on the (sorted) frame column, so only the touched pages of
+    the memory-mapped columns are loaded.
+    """
+
+    def __init__(self, store: "DetectionStore", video: str):
+        self.store = store
+        self.video = video
+        self._offset, self._rows, self.num_frames, _ = store._videos[video]
+
+    @property
+    def row_count(self) -> int:
+        # Not `__len__`: a handle must stay truthy for videos with no stored detections.
+        return self._rows
+
+    def __repr__(self) -> str:
+        return f"DetectionHandle({self.store.path!r}, {self.video!r}, rows={self._rows})"
+
+    def __reduce__(self):
+        return (_open_handle, (self.store.path, self.video))
+
+    def _slice(self, start: Optional[int] = None, end: Optional[int] = None) -> slice:
+        lo, hi = self._offset, self._offset + self._rows
+        if start is None and end is None:
+            return slice(lo, hi)
+        frames = self.store.columns["frame"][lo:hi]
+        first = 0 if start is None else int(np.searchsorted(frames, start, side="left"))
+        last = self._rows if end is None else int(np.searchsorted(frames, end, side="right"))
+        return slice(lo + first, lo + last)
+
+    def rows(self, start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Column views (`frame`, `class`, `score`, `box`) for frames in [start, end]."""
+        rows = self._slice(start, end)
+        return {name: self.store.columns[name][rows] for name in _COLUMNS}
+
+    def summary(self, score_threshold: float = 0.0) -> DetectionSummary:
+        """Per-frame count and max score per class, over detections >= `score_threshold`."""
+        rows = self.rows()
+        keep = rows["score"] >= score_threshold
+        frames = rows["frame"][keep].astype(np.int64)
+        classes = rows["class"][keep].astype(np.int64)
+        scores = rows["score"][keep]
+        shape = (self.num_frames, len(self.store.classes))
+        counts = np.zeros(shape, dtype=np.float32)
+        max_scores = np.zeros(shape, dtype=np.float32)
+        np.add.at(counts, (frames, classes), 1)
+        np.maximum.at(max_scores, (frames, classes), scores)
+        return DetectionSummary(classes=list(self.store.classes), counts=counts, scores=max_scores)
+
+
+class DetectionStore(Mapping[str, VideoPredictions]):
+    """Read-only predictions mapping over a columnar detection store directory.
+
+    The store holds `frame.npy` (int32), `class.npy` (uint16), `score.npy`
+    (float32) and `box.npy` (float32, x1/y1/x2/y2) for all videos back to
+    back, plus `index.json` with class names and per-video
+    `(offset, rows, frames, fps)`. Columns are memory-mapped; items carry a
+    `DetectionHandle` in `detections` and no states.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        root = Path(path)
+        with (root / _INDEX).open("r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("format") != DETECTION_STORE_FORMAT:
+            raise ValueError(f"Not a detection store: {path}")
+        if index.get("version") != DETECTION_STORE_VERSION:
+            raise ValueError(f"Unsupported detection store version {index.get('version')!r}: {path}")
+        self.classes: List[str] = index["classes"]
+        self._videos: Dict[str, Tuple[int, int, int, Optional[float]]] = {
+            name: (int(offset), int(rows), int(frames), fps)
+            for name, (offset, rows, frames, fps) in index["videos"].items()
+        }
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.load(root / f"{name}.npy", mmap_mode="r") for name in _COLUMNS
+        }
+
+    def handle(self, video: str) -> DetectionHandle:
+        return DetectionHandle(self, video)
+
+    def __getitem__(self, video: str) -> VideoPredictions:
+        fps = self._videos[video][3]
+        return VideoPredictions(states=None, fps=fps, detections=self.handle(video), ocr=None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._videos)
+
+    def __len__(self) -> int:
+        return len(self._videos)
+
+    def __contains__(self, video: object) -> bool:
+        return video in self._videos
+
+    def __reduce__(self):
+        return (DetectionStore, (self.path,))
+
+
+def _open_handle(path: str, video: str) -> DetectionHandle:
+    return DetectionStore(path).handle(video)
+
+
+def attach_detections(
+    preds: Mapping[str, VideoPredictions],
+    store: DetectionStore,
+    videos: Optional[Collection[str]] = None,
+) -> Dict[str, VideoPredictions]:
+    """Predictions with `detections` replaced by lazy handles where the store has the video.
+
+    Store videos without predictions are added with `states=None`.
+    """
+    out = {
+        video: replace(entry, detections=store.handle(video)) if video in store else entry
+        for video, entry in preds.items()
+    }
+    for video in store:
+        if videos is None or video in videos:
+            out.setdefault(video, store[video])
+    return out
+
+
+def write_detection_store(
+    detections: Mapping[str, Sequence[Mapping[str, Any]]],
+    out_path: str,
+    fps: Optional[Mapping[str, Optional[float]]] = None,
+    num_frames: Optional[Mapping[str, int]] = None,
+) -> None:
+    """Write per-video `{"frame", "class", "score", "box"}` records as a columnar store.
+
+    Rows are sorted by frame within each video. `num_frames` defaults to the
+    last detected frame + 1.
+    """
+    classes: Dict[str, int] = {}
+    videos: Dict[str, List[Any]] = {}
+    columns: Dict[str, List[np.ndarray]] = {name: [] for name in _COLUMNS}
+    offset = 0
+    for video, records in detections.items():
+        records = sorted(records, key=lambda r: int(r["frame"]))
+        frames = np.array([int(r["frame"]) for r in records], dtype=np.int32)
+        columns["frame"].append(frames)
+        columns["class"].append(
+            np.array([classes.setdefault(str(r["class"]), len(classes)) for r in records], dtype=np.uint16)
+        )
+        columns["score"].append(np.array([float(r.get("score", 1.0)) for r in records], dtype=np.float32))
+        columns["box"].append(
+            np.array([r.get("box") or [np.nan] * 4 for r in records], dtype=np.float32).reshape(-1, 4)
+        )
+        frame_count = (num_frames or {}).get(video)
+        if frame_count is None:
+            frame_count = int(frames[-1]) + 1 if len(frames) else 0
+        videos[video] = [offset, len(records), frame_count, (fps or {}).get(video)]
+        offset += len(records)
+    if len(classes) > np.iinfo(np.uint16).max:
+        raise ValueError("Detection store supports at most 65535 classes.")
+
+    root = Path(out_path)
+    root.mkdir(parents=True, exist_ok=True)
+    empty = {"frame": (0,), "class": (0,), "score": (0,), "box": (0, 4)}
+    dtypes = {"frame": np.int32, "class": np.uint16, "score": np.float32, "box": np.float32}
+    for name in _COLUMNS:
+        data = np.concatenate(columns[name]) if columns[name] else np.zeros(empty[name], dtype=dtypes[name])
+        np.save(root / f"{name}.npy", data)
+    with (root / _INDEX).open("w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "format": DETECTION_STORE_FORMAT,
+                "version": DETECTION_STORE_VERSION,
+                "classes": list(classes),
+                "videos": videos,
+            },
+            f,
+        )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Move inline per-box `detections` out of a predictions JSON into a columnar store."
+    )
+    parser.add_argument(
+        "--pred",
+        required=True,
+        help='Predictions JSON whose `detections` are lists of {"frame", "class", "score", "box"}.',
+    )
+    parser.add_argument("--out", required=True, help="Output store directory (e.g. detections.wzd).")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    with open(args.pred, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    detections = {
+        video: entry["detections"]
+        for video, entry in raw.items()
+        if isinstance(entry, dict) and isinstance(entry.get("detections"), list)
+    }
+    write_detection_store(detections, args.out, fps={video: raw[video].get("fps") for video in detections})
+    print(f"Wrote {len(detections)} videos to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import itertools
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Sequence, Tuple
+
+from .aggregate import SummaryAccumulator
+
+MISSING_GROUP = "(missing)"
+
+
+@dataclass
+class Grouper:
+    name: str
+    key: Callable[[str], str]
+
+
+def _city(video: str) -> str:
+    # Keys look like boston_<hash>_<seq>_<frame>_snippet.mp4.
+    return video.split("_", 1)[0] if "_" in video else MISSING_GROUP
+
+
+def parse_group_by(spec: str) -> Grouper:
+    """Build a grouper from `city`, `regex:<pattern>` or `<metadata.json>:<field>`.
+
+    Regex groupers use the first capture group (or the whole match) and are
+    named by their full spec. Metadata sidecars are JSON objects keyed by
+    video name; their groupers are named by the field.
+    """
+    if spec == "city":
+        return Grouper(name="city", key=_city)
+    if spec.startswith("regex:"):
+        pattern = re.compile(spec[len("regex:") :])
+
+        def _regex_key(video: str) -> str:
+            match = pattern.search(video)
+            if match is None:
+                return MISSING_GROUP
+            return match.group(1) if pattern.groups else match.group(0)
+
+        return Grouper(name=spec, key=_regex_key)
+    path, sep, field_name = spec.rpartition(":")
+    if sep and path.lower().endswith(".json") and field_name:
+        with open(path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        if not isinstance(metadata, dict):
+            raise ValueError(f"Metadata JSON must be an object keyed by video filename: {path}")
+        for video, entry in metadata.items():
+            if entry is not None and not isinstance(entry, dict):
+                raise ValueError(f"Metadata entry for {video} in {path} must be an object.")
+
+        def _metadata_key(video: str) -> str:
+            value = (metadata.get(video) or {}).get(field_name)
+            return MISSING_GROUP if value is None else str(value)
+
+        return Grouper(name=field_name, key=_metadata_key)
+    raise ValueError(f"Unsupported --group-by spec: {spec!r} (use city, regex:<pattern>, or file.json:field)")
+
+
+def parse_group_by_specs(specs: Sequence[str]) -> List[Grouper]:
+    """Parse every `--group-by` spec; two specs may not give the same group name."""
+    groupers: List[Grouper] = []
+    for spec in specs:
+        grouper = parse_group_by(spec)
+        if any(other.name == grouper.name for other in groupers):
+            raise ValueError(f"Duplicate --group-by name {grouper.name!r} (from {spec!r}).")
+        groupers.append(grouper)
+    return groupers
+
+
+class GroupedAccumulator:
+    """Partial summary aggregates per group value and per combination of groupers.
+
+    Accumulators are keyed by combination name ("city+weather") and joined
+    group values ("boston|rain"), so partials restored with `from_dict` merge
+    without needing the groupers themselves.
+    """
+
+    def __init__(self, groupers: Sequence[Grouper]):
+        self.groupers = list(groupers)
+        self.combinations: List[Tuple[int, ...]] = [
+            combo
+            for size in range(1, len(self.groupers) + 1)
+            for combo in itertools.combinations(range(len(self.groupers)), size)
+        ]
+        self.accumulators: Dict[str, Dict[str, SummaryAccumulator]] = {
+            self._combo_name(combo): {} for combo in self.combinations
+        }
+
+    def _combo_name(self, combo: Tuple[int, ...]) -> str:
+        return "+".join(self.groupers[i].name for i in combo)
+
+    def add(self, video: str, payload: Mapping[str, Any], sign: int = 1) -> None:
+        keys = [grouper.key(video) for grouper in self.groupers]
+        for combo in self.combinations:
+            values = "|".join(keys[i] for i in combo)
+            bucket = self.accumulators[self._combo_name(combo)]
+            acc = bucket.get(values)
+            if acc is None:
+                acc = bucket[values] = SummaryAccumulator()
+            acc.add(payload, sign=sign)
+
+    def remove(self, video: str, payload: Mapping[str, Any]) -> None:
+        self.add(video, payload, sign=-1)
+
+    def merge(self, other: "GroupedAccumulator") -> None:
+        for name, bucket in other.accumulators.items():
+            target = self.accumulators.setdefault(name, {})
+            for values, acc in bucket.items():
+                if values in target:
+                    target[values].merge(acc)
+                else:
+                    target[values] = SummaryAccumulator.from_dict(acc.to_dict())
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {values: acc.to_dict() for values, acc in bucket.items()}
+            for name, bucket in self.accumulators.items()
+        }
+
+    @classmethod
+    def from_dict(cls, raw: Mapping[str, Mapping[str, Any]]) -> "GroupedAccumulator":
+        grouped = cls([])
+        grouped.accumulators = {
+            name: {values: SummaryAccumulator.from_dict(acc) for values, acc in bucket.items()}
+            for name, bucket in raw.items()
+        }
+        return grouped
+
+    def summaries(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {values: acc.summary() for values, acc in sorted(bucket.items())}
+            for name, bucket in self.accumulators.items()
+        }
@@ -0,0 +1,143 @@
+import argparse
+import json
+import mmap
+import struct
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+from .data_models import StateIntervals, VideoGroundTruth
+
+GT_STORE_MAGIC = b"WZGT\x01\x00\x00\x00"
+_HEADER = struct.Struct("<8sQ")
+_ROW_WIDTH = 3  # (state_code, start, length) per interval
+
+
+def is_gt_store(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(GT_STORE_MAGIC)) == GT_STORE_MAGIC
+    except OSError:
+        return False
+
+
+def write_gt_store(gt: Mapping[str, VideoGroundTruth], out_path: str) -> None:
+    """Write GT as a name index plus one flat int32 (state, start, length) array."""
+    state_codes: Dict[str, int] = {}
+    rows = array("i")
+    videos: Dict[str, List[int]] = {}
+    for video, entry in gt.items():
+        offset = len(rows) // _ROW_WIDTH
+        for state, intervals in entry.states.items():
+            code = state_codes.setdefault(state, len(state_codes))
+            for start, end in intervals:
+                rows.extend((code, start, end - start + 1))
+        videos[video] = [offset, len(rows) // _ROW_WIDTH - offset]
+
+    index = json.dumps(
+        {"byteorder": sys.byteorder, "states": list(state_codes), "videos": videos},
+        separators=(",", ":"),
+    ).encode("utf-8")
+    # Pad the index so the int32 payload starts 4-byte aligned.
+    index += b" " * (-(_HEADER.size + len(index)) % rows.itemsize)
+    with open(out_path, "wb") as f:
+        f.write(_HEADER.pack(GT_STORE_MAGIC, len(index)))
+        f.write(index)
+        rows.tofile(f)
+
+
+class CompiledGroundTruth(Mapping[str, VideoGroundTruth]):
+    """Read-only GT mapping backed by a memory-mapped store from `wzm-compile-gt`.
+
+    Only the name index is parsed on open; each video's intervals are decoded
+    from the shared mapping on first access and kept in a bounded LRU of
+    `cache_size` videos, so repeated lookups of one video decode it once.
+    Pickling reopens the file by path, so worker processes share the page
+    cache instead of copying parsed GT.
+    """
+
+    def __init__(self, path: str, cache_size: int = 1024):
+        self.path = path
+        self.cache_size = max(1, cache_size)
+        self._decoded: "OrderedDict[str, VideoGroundTruth]" = OrderedDict()
+        self._lock = threading.Lock()
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_len = _HEADER.unpack_from(self._mmap, 0)
+        if magic != GT_STORE_MAGIC:
+            raise ValueError(f"Not a compiled ground-truth store: {path}")
+        data_start = _HEADER.size + index_len
+        index = json.loads(bytes(self._mmap[_HEADER.size : data_start]).decode("utf-8"))
+        self._states: List[str] = index["states"]
+        self._videos: Dict[str, Tuple[int, int]] = {
+            name: (int(offset), int(count)) for name, (offset, count) in index["videos"].items()
+        }
+        self._swap = index.get("byteorder", sys.byteorder) != sys.byteorder
+        self._rows = memoryview(self._mmap)[data_start:].cast("i")
+
+    def __getitem__(self, video: str) -> VideoGroundTruth:
+        with self._lock:
+            cached = self._decoded.get(video)
+            if cached is not None:
+                self._decoded.move_to_end(video)
+                return cached
+        entry = self._decode(video)
+        with self._lock:
+            self._decoded[video] = entry
+            self._decoded.move_to_end(video)
+            while len(self._decoded) > self.cache_size:
+                self._decoded.popitem(last=False)
+        return entry
+
+    def _decode(self, video: str) -> VideoGroundTruth:
+        offset, count = self._videos[video]
+        flat = self._rows[offset * _ROW_WIDTH : (offset + count) * _ROW_WIDTH]
+        if self._swap:
+            flat = array("i", flat.tobytes())
+            flat.byteswap()
+        states: StateIntervals = {}
+        for i in range(0, len(flat), _ROW_WIDTH):
+            code, start, length = flat[i], flat[i + 1], flat[i + 2]
+            states.setdefault(self._states[code], []).append((start, start + length - 1))
+        return VideoGroundTruth(states=states)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._videos)
+
+    def __len__(self) -> int:
+        return len(self._videos)
+
+    def __contains__(self, video: object) -> bool:
+        return video in self._videos
+
+    def __reduce__(self):
+        return (CompiledGroundTruth, (self.path, self.cache_size))
+
+    def close(self) -> None:
+        self._decoded.clear()
+        self._rows.release()
+        self._mmap.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Compile a ground-truth JSON into a memory-mapped binary store."
+    )
+    parser.add_argument("--gt", required=True, help="Path to ground-truth JSON.")
+    parser.add_argument("--out", required=True, help="Output store path (e.g. annotations.wzgt).")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .io import load_ground_truth
+
+    args = build_parser().parse_args(argv)
+    gt = load_ground_truth(args.gt)
+    write_gt_store(gt, args.out)
+    print(f"Wrote {len(gt)} videos to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
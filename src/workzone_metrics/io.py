@@ -1,10 +1,26 @@
+import codecs
 import csv
 import json
+import math
 import statistics
-from pathlib import Path
-from typing import Dict, List, Tuple, Any, Optional
+import tarfile
+import zipfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatch
+from pathlib import Path, PurePosixPath
+from typing import Collection, Dict, Iterable, List, Mapping, Tuple, Any, Optional
 
-from .data_models import StateIntervals, VideoGroundTruth, VideoPredictions
+from .data_models import STATE_CODES, FrameTimes, StateIntervals, VideoGroundTruth, VideoPredictions
+from .gt_store import CompiledGroundTruth, is_gt_store
+from .label_store import LabelStore, is_label_store
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tgz", ".gz", ".bz2", ".xz")
+# Optional per-frame workzone confidence column in timeline CSVs, first match wins.
+SCORE_COLUMNS = ("score", "workzone_score", "fused_score", "confidence")
+# Members read from batch archives; the directory loader's `*.csv` fallback
+# would need a second pass over a streamed tarball.
+TIMELINE_MEMBER_PATTERNS = ("*_timeline*.csv", "sota_*.csv")
 
 
 def _normalize_intervals(intervals: List[List[int]]) -> List[Tuple[int, int]]:
@@ -16,15 +32,46 @@ def _normalize_intervals(intervals: List[List[int]]) -> List[Tuple[int, int]]:
     return sorted(cleaned)
 
 
-def load_ground_truth(path: str) -> Dict[str, VideoGroundTruth]:
+def states_from_rle(
+    rle: List[List[int]], state_codes: Optional[List[str]] = None, where: str = ""
+) -> StateIntervals:
+    """Decode ordered `[state_code, length]` runs starting at frame 0.
+
+    Codes index `state_codes` (default `STATE_CODES`). Runs are contiguous,
+    so intervals come out sorted and non-overlapping.
+    """
+    table = state_codes or STATE_CODES
+    states: StateIntervals = {}
+    start = 0
+    for run in rle:
+        code, length = int(run[0]), int(run[1])
+        if length < 0 or not 0 <= code < len(table):
+            raise ValueError(f"Invalid rle run {list(run)} for {where or 'entry'}.")
+        if length:
+            states.setdefault(table[code], []).append((start, start + length - 1))
+            start += length
+    return states
+
+
+def load_ground_truth(path: str) -> Mapping[str, VideoGroundTruth]:
+    if is_gt_store(path):
+        return CompiledGroundTruth(path)
     with open(path, "r", encoding="utf-8") as f:
         raw = json.load(f)
+    return ground_truth_from_dict(raw)
+
+
+def ground_truth_from_dict(raw: Any) -> Dict[str, VideoGroundTruth]:
+    """Parse an already-decoded ground-truth JSON object."""
     if not isinstance(raw, dict):
         raise ValueError("Ground-truth JSON must be an object keyed by video filename.")
     gt: Dict[str, VideoGroundTruth] = {}
     for video, entry in raw.items():
         if not isinstance(entry, dict):
             raise ValueError(f"Ground-truth entry for {video} must be an object.")
+        if "rle" in entry:
+            gt[video] = VideoGroundTruth(states=states_from_rle(entry["rle"], entry.get("state_codes"), video))
+            continue
         states: StateIntervals = {}
         for state, intervals in entry.items():
             if intervals is None:
@@ -36,35 +83,90 @@ def load_ground_truth(path: str) -> Dict[str, VideoGroundTruth]:
     return gt
 
 
-def load_predictions(path: str) -> Dict[str, VideoPredictions]:
+def load_predictions(
+    path: str,
+    videos: Optional[Collection[str]] = None,
+    detections: Optional[str] = None,
+    jobs: Optional[int] = None,
+) -> Mapping[str, VideoPredictions]:
+    """Load predictions; with `videos`, entries for other videos are not parsed.
+
+    Timeline CSVs (on disk or inside a zip/tar archive) of other videos are
+    never opened; JSON entries are decoded but not normalized. Label and
+    detection stores are lazy either way. `detections` names a sidecar
+    detection store whose lazy handles replace each entry's `detections`
+    (needs NumPy). `jobs` parses zip archive members in worker processes.
+    """
+    preds = _load_predictions(path, videos, jobs)
+    if detections is None:
+        return preds
+    from .detection_store import DetectionStore, attach_detections
+
+    return attach_detections(preds, DetectionStore(detections), videos=videos)
+
+
+def _load_predictions(
+    path: str, videos: Optional[Collection[str]] = None, jobs: Optional[int] = None
+) -> Mapping[str, VideoPredictions]:
     path_obj = Path(path)
+    if path_obj.is_dir() and (path_obj / "index.json").is_file():
+        # Detection stores need NumPy; only import it when one is given.
+        from .detection_store import DetectionStore, is_detection_store
+
+        if is_detection_store(path):
+            return DetectionStore(path)
     if path_obj.is_dir():
-        return load_predictions_from_timeline_dir(path)
+        return load_predictions_from_timeline_dir(path, videos=videos)
+    if is_label_store(path):
+        return LabelStore(path)
+    if is_prediction_archive(path):
+        return load_predictions_from_archive(path, videos=videos, jobs=jobs)
     if path_obj.suffix.lower() == ".csv":
+        if videos is not None and video_name_from_timeline_path(path) not in videos:
+            return {}
         return load_predictions_from_timeline_csv(path)
     with open(path, "r", encoding="utf-8") as f:
         raw = json.load(f)
+    return predictions_from_dict(raw, videos=videos)
+
+
+def predictions_from_dict(
+    raw: Any, videos: Optional[Collection[str]] = None
+) -> Dict[str, VideoPredictions]:
+    """Parse an already-decoded predictions JSON object."""
     if not isinstance(raw, dict):
         raise ValueError("Predictions JSON must be an object keyed by video filename.")
     preds: Dict[str, VideoPredictions] = {}
     for video, entry in raw.items():
+        if videos is not None and video not in videos:
+            continue
         if not isinstance(entry, dict):
             raise ValueError(f"Prediction entry for {video} must be an object.")
         fps = entry.get("fps")
         states_raw = entry.get("states")
         states: Optional[StateIntervals] = None
-        if isinstance(states_raw, dict):
+        if "rle" in entry:
+            states = states_from_rle(entry["rle"], entry.get("state_codes"), video)
+        elif isinstance(states_raw, dict):
             states = {k: _normalize_intervals(v) for k, v in states_raw.items()}
+        scores_raw = entry.get("scores")
         preds[video] = VideoPredictions(
             states=states,
             fps=float(fps) if fps is not None else None,
             detections=entry.get("detections"),
             ocr=entry.get("ocr"),
+            scores=(
+                array("d", (math.nan if v is None else float(v) for v in scores_raw))
+                if isinstance(scores_raw, list)
+                else None
+            ),
         )
     return preds
 
 
-def load_predictions_from_timeline_dir(path: str) -> Dict[str, VideoPredictions]:
+def load_predictions_from_timeline_dir(
+    path: str, videos: Optional[Collection[str]] = None
+) -> Dict[str, VideoPredictions]:
     root = Path(path)
     if not root.is_dir():
         raise ValueError(f"Timeline directory not found: {path}")
@@ -72,29 +174,105 @@ def load_predictions_from_timeline_dir(path: str) -> Dict[str, VideoPredictions]
     csv_paths = list(root.rglob("*_timeline*.csv"))
     if not csv_paths:
         csv_paths = list(root.rglob("*.csv"))
+    if not csv_paths:
+        raise ValueError(f"No timeline CSVs found under: {path}")
     for csv_path in sorted(csv_paths):
+        if videos is not None and video_name_from_timeline_path(str(csv_path)) not in videos:
+            continue
         preds.update(load_predictions_from_timeline_csv(str(csv_path)))
-    if not preds:
-        raise ValueError(f"No timeline CSVs found under: {path}")
     return preds
 
 
-def load_predictions_from_timeline_csv(path: str) -> Dict[str, VideoPredictions]:
+def is_prediction_archive(path: str) -> bool:
     path_obj = Path(path)
-    rows: List[Tuple[int, str, Optional[float]]] = []
+    if not path_obj.is_file() or not path_obj.name.lower().endswith(ARCHIVE_SUFFIXES):
+        return False
+    return zipfile.is_zipfile(path) or tarfile.is_tarfile(path)
+
+
+def _is_timeline_member(name: str, videos: Optional[Collection[str]]) -> bool:
+    base = PurePosixPath(name).name
+    if not any(fnmatch(base, pattern) for pattern in TIMELINE_MEMBER_PATTERNS):
+        return False
+    return videos is None or video_name_from_timeline_path(base) in videos
+
+
+def _parse_zip_members(path: str, members: List[str]) -> Dict[str, Dict[str, VideoPredictions]]:
+    parsed: Dict[str, Dict[str, VideoPredictions]] = {}
+    with zipfile.ZipFile(path) as zf:
+        for member in members:
+            with zf.open(member) as raw:
+                parsed[member] = _parse_timeline_csv(codecs.iterdecode(raw, "utf-8"), member)
+    return parsed
+
+
+def load_predictions_from_archive(
+    path: str, videos: Optional[Collection[str]] = None, jobs: Optional[int] = None
+) -> Dict[str, VideoPredictions]:
+    """Stream-parse timeline CSVs from a zip or tar batch archive without extracting.
+
+    Only `*_timeline*.csv` / `sota_*.csv` members (for `videos`, if given)
+    are read. Zip members can be split across `jobs` worker processes that
+    each open the archive; tarballs are read in a single streaming pass.
+    Later members win for duplicate videos, as in the directory loader.
+    """
+    parsed: Dict[str, Dict[str, VideoPredictions]] = {}
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            members = sorted(
+                info.filename
+                for info in zf.infolist()
+                if not info.is_dir() and _is_timeline_member(info.filename, videos)
+            )
+        workers = max(1, min(len(members), jobs or 1))
+        if workers == 1:
+            parsed = _parse_zip_members(path, members)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunks = [members[i::workers] for i in range(workers)]
+                for part in pool.map(_parse_zip_members, [path] * workers, chunks):
+                    parsed.update(part)
+    else:
+        with tarfile.open(path, mode="r|*") as tf:
+            for member in tf:
+                if not member.isfile() or not _is_timeline_member(member.name, videos):
+                    continue
+                raw = tf.extractfile(member)
+                if raw is not None:
+                    parsed[member.name] = _parse_timeline_csv(codecs.iterdecode(raw, "utf-8"), member.name)
+        members = sorted(parsed)
+    if not members and videos is None:
+        raise ValueError(f"No timeline CSVs found in archive: {path}")
+    preds: Dict[str, VideoPredictions] = {}
+    for member in members:
+        preds.update(parsed[member])
+    return preds
+
+
+def load_predictions_from_timeline_csv(path: str) -> Dict[str, VideoPredictions]:
     with open(path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if not row:
-                continue
-            lower = {k.lower(): v for k, v in row.items() if k is not None}
-            if "frame" not in lower or "state" not in lower:
-                continue
-            frame = int(float(lower["frame"]))
-            state = _normalize_state_label(lower["state"])
-            time_sec = lower.get("time_sec")
-            time_val = float(time_sec) if time_sec not in (None, "") else None
-            rows.append((frame, state, time_val))
+        return _parse_timeline_csv(f, path)
+
+
+def _parse_timeline_csv(lines: Iterable[str], path: str) -> Dict[str, VideoPredictions]:
+    """Parse timeline CSV lines; `path` names the video and error messages."""
+    rows: List[Tuple[int, str, Optional[float], float]] = []
+    reader = csv.DictReader(lines)
+    score_key: Optional[str] = None
+    for row in reader:
+        if not row:
+            continue
+        lower = {k.lower(): v for k, v in row.items() if k is not None}
+        if "frame" not in lower or "state" not in lower:
+            continue
+        if score_key is None:
+            score_key = next((key for key in SCORE_COLUMNS if key in lower), "")
+        frame = int(float(lower["frame"]))
+        state = _normalize_state_label(lower["state"])
+        time_sec = lower.get("time_sec")
+        time_val = float(time_sec) if time_sec not in (None, "") else None
+        score = lower.get(score_key) if score_key else None
+        rows.append((frame, state, time_val, float(score) if score not in (None, "") else math.nan))
     if not rows:
         raise ValueError(f"No valid rows with frame/state found in {path}")
 
@@ -118,18 +296,11 @@ def load_predictions_from_timeline_csv(path: str) -> Dict[str, VideoPredictions]
         last_frame = frame
 
     fps = _estimate_fps(frames, times)
+    frame_times = _frame_times(frames, times)
     intervals = _intervals_from_labels(labels)
+    scores = _frame_scores(frames, [r[3] for r in rows]) if score_key else None
 
-    video_name = path_obj.stem
-    # Batch SOTA runner prefixes timeline files with "sota_".
-    if video_name.startswith("sota_"):
-        video_name = video_name[len("sota_") :]
-    for suffix in ("_timeline_fusion", "_timeline", "_calibrated"):
-        if video_name.endswith(suffix):
-            video_name = video_name[: -len(suffix)]
-            break
-    if not video_name.endswith(".mp4"):
-        video_name = f"{video_name}.mp4"
+    video_name = video_name_from_timeline_path(path)
 
     return {
         video_name: VideoPredictions(
@@ -137,10 +308,27 @@ def load_predictions_from_timeline_csv(path: str) -> Dict[str, VideoPredictions]
             fps=fps,
             detections=None,
             ocr=None,
+            frame_times=frame_times,
+            scores=scores,
         )
     }
 
 
+def video_name_from_timeline_path(path: str) -> str:
+    """Map a timeline CSV path to the GT video key it describes."""
+    video_name = Path(path).stem
+    # Batch SOTA runner prefixes timeline files with "sota_".
+    if video_name.startswith("sota_"):
+        video_name = video_name[len("sota_") :]
+    for suffix in ("_timeline_fusion", "_timeline", "_calibrated"):
+        if video_name.endswith(suffix):
+            video_name = video_name[: -len(suffix)]
+            break
+    if not video_name.endswith(".mp4"):
+        video_name = f"{video_name}.mp4"
+    return video_name
+
+
 def _normalize_state_label(label: str) -> str:
     if label is None:
         return "outside"
@@ -187,3 +375,26 @@ def _estimate_fps(frames: List[int], times: List[Optional[float]]) -> Optional[f
     if not samples:
         return None
     return statistics.median(samples)
+
+
+def _frame_scores(frames: List[int], values: List[float]) -> array:
+    # Same fill as the state labels: each row's score holds until the next row.
+    scores = array("d", [values[0]]) * (frames[-1] + 1)
+    for idx, frame in enumerate(frames):
+        end = frames[idx + 1] if idx + 1 < len(frames) else frames[-1] + 1
+        if end > frame:
+            scores[frame:end] = array("d", [values[idx]]) * (end - frame)
+    return scores
+
+
+def _frame_times(frames: List[int], times: List[Optional[float]]) -> Optional[FrameTimes]:
+    kept_frames = array("l")
+    kept_times = array("d")
+    for frame, time_val in zip(frames, times):
+        if time_val is None:
+            continue
+        kept_frames.append(frame)
+        kept_times.append(time_val)
+    if not kept_times:
+        return None
+    return FrameTimes(frames=kept_frames, times=kept_times)
@@ -0,0 +1,142 @@
+import argparse
+import json
+import mmap
+import struct
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+from .data_models import STATE_CODES, StateIntervals, VideoPredictions
+from .metrics.state import _labels_from_intervals, _max_frame
+
+LABEL_STORE_MAGIC = b"WZLB\x01\x00\x00\x00"
+_HEADER = struct.Struct("<8sQ")
+
+
+def is_label_store(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(LABEL_STORE_MAGIC)) == LABEL_STORE_MAGIC
+    except OSError:
+        return False
+
+
+def write_label_store(preds: Mapping[str, VideoPredictions], out_path: str) -> None:
+    """Write per-frame predicted state codes as one concatenated uint8 buffer."""
+    state_codes: Dict[str, int] = {state: i for i, state in enumerate(STATE_CODES)}
+    chunks: List[bytes] = []
+    videos: Dict[str, List[Optional[float]]] = {}
+    offset = 0
+    for video, entry in preds.items():
+        if entry.states is None:
+            continue
+        labels = _labels_from_intervals(entry.states, _max_frame(entry.states) + 1)
+        for state in entry.states:
+            state_codes.setdefault(state, len(state_codes))
+        if len(state_codes) > 256:
+            raise ValueError("Label store supports at most 256 distinct states.")
+        chunks.append(bytes(state_codes[label] for label in labels))
+        videos[video] = [offset, len(labels), entry.fps]
+        offset += len(labels)
+
+    index = json.dumps(
+        {"states": list(state_codes), "videos": videos},
+        separators=(",", ":"),
+    ).encode("utf-8")
+    with open(out_path, "wb") as f:
+        f.write(_HEADER.pack(LABEL_STORE_MAGIC, len(index)))
+        f.write(index)
+        for chunk in chunks:
+            f.write(chunk)
+
+
+def _intervals_from_codes(codes: memoryview, states: List[str]) -> StateIntervals:
+    intervals: StateIntervals = {}
+    if not len(codes):
+        return intervals
+    start = 0
+    current = codes[0]
+    for idx in range(1, len(codes)):
+        if codes[idx] != current:
+            intervals.setdefault(states[current], []).append((start, idx - 1))
+            start = idx
+            current = codes[idx]
+    intervals.setdefault(states[current], []).append((start, len(codes) - 1))
+    return intervals
+
+
+class LabelStore(Mapping[str, VideoPredictions]):
+    """Read-only predictions mapping over a memory-mapped uint8 label store.
+
+    `labels(video)` is a zero-copy slice of the mapping; item access decodes
+    the slice into state intervals. Pickling reopens the file by path.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_len = _HEADER.unpack_from(self._mmap, 0)
+        if magic != LABEL_STORE_MAGIC:
+            raise ValueError(f"Not a label store: {path}")
+        data_start = _HEADER.size + index_len
+        index = json.loads(bytes(self._mmap[_HEADER.size : data_start]).decode("utf-8"))
+        self.states: List[str] = index["states"]
+        self._videos: Dict[str, Tuple[int, int, Optional[float]]] = {
+            name: (int(offset), int(length), fps)
+            for name, (offset, length, fps) in index["videos"].items()
+        }
+        self._data = memoryview(self._mmap)[data_start:]
+
+    def labels(self, video: str) -> memoryview:
+        offset, length, _ = self._videos[video]
+        return self._data[offset : offset + length]
+
+    def __getitem__(self, video: str) -> VideoPredictions:
+        _, _, fps = self._videos[video]
+        return VideoPredictions(
+            states=_intervals_from_codes(self.labels(video), self.states),
+            fps=fps,
+            detections=None,
+            ocr=None,
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._videos)
+
+    def __len__(self) -> int:
+        return len(self._videos)
+
+    def __contains__(self, video: object) -> bool:
+        return video in self._videos
+
+    def __reduce__(self):
+        return (LabelStore, (self.path,))
+
+    def close(self) -> None:
+        self._data.release()
+        self._mmap.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Export predictions to a memory-mapped per-frame label store."
+    )
+    parser.add_argument(
+        "--pred",
+        required=True,
+        help="Path to predictions JSON, a timeline CSV, or a directory of timeline CSVs.",
+    )
+    parser.add_argument("--out", required=True, help="Output store path (e.g. predictions.wzl).")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .io import load_predictions
+
+    args = build_parser().parse_args(argv)
+    preds = load_predictions(args.pred)
+    write_label_store(preds, args.out)
+    print(f"Wrote {len(preds)} videos to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
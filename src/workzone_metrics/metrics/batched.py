@@ -0,0 +1,166 @@
+from collections import Counter
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..data_models import STATE_CODES, StateIntervals
+from .state import DEFAULT_STATE_ORDER, TransitionBreakdown, _match_events, _match_transitions, _max_frame
+
+# Intermediates (see metrics/state.py) computed here for a whole dataset at
+# once; every other intermediate still runs per video on top of these.
+BATCHED_INTERMEDIATES = (
+    "total_frames",
+    "label_pairs",
+    "gt_transitions",
+    "transition_matches",
+    "advisory_events",
+    "advisory_starts",
+    "activation_lengths",
+    "false_activation_events",
+)
+
+_N_STATES = len(STATE_CODES)
+
+
+def _paint(states: StateIntervals, out: np.ndarray) -> None:
+    # Same priority as `_labels_from_intervals`: later states in the order win.
+    total = len(out)
+    for state in DEFAULT_STATE_ORDER:
+        code = STATE_CODES.index(state)
+        for start, end in states.get(state, []):
+            start, end = max(0, start), min(total - 1, end)
+            if start <= end:
+                out[start : end + 1] = code
+
+
+def paint_codes(states: StateIntervals) -> np.ndarray:
+    """`STATE_CODES` indices of one video's GT frames, as painted by `batch_intermediates`."""
+    codes = np.zeros(_max_frame(states) + 1, dtype=np.int8)
+    _paint(states, codes)
+    return codes
+
+
+def _split(values: np.ndarray, video_of: np.ndarray, count: int) -> List[np.ndarray]:
+    """Split globally ordered items into per-video chunks (items sorted by video)."""
+    return np.split(values, np.searchsorted(video_of, np.arange(1, count)))
+
+
+def _runs(mask: np.ndarray, first: np.ndarray, last: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Global (start, end) indices of True runs, never crossing a video boundary."""
+    prev = np.zeros_like(mask)
+    prev[1:] = mask[:-1]
+    nxt = np.zeros_like(mask)
+    nxt[:-1] = mask[1:]
+    starts = np.flatnonzero(mask & (first | ~prev))
+    ends = np.flatnonzero(mask & (last | ~nxt))
+    return starts, ends
+
+
+def batch_intermediates(
+    pairs: Sequence[Tuple[StateIntervals, StateIntervals]],
+    names: Collection[str] = BATCHED_INTERMEDIATES,
+    transition_tolerance_frames: int = 0,
+    min_event_overlap_frames: int = 1,
+    outside_state: str = "outside",
+    gt_codes: Optional[Sequence[Optional[np.ndarray]]] = None,
+) -> List[Dict[str, Any]]:
+    """Label-based intermediates for many (gt_states, pred_states) videos at once.
+
+    All videos' GT and predicted state codes are painted into two flat arrays
+    with an offsets vector; confusion counts, transitions, advisory runs and
+    false-activation episodes then come from a handful of segmented NumPy
+    reductions over the whole dataset. Only the greedy transition/event
+    matching runs per video, over the (short) transition and event lists.
+    Values equal the per-video intermediates in `metrics/state.py`.
+
+    `gt_codes` optionally gives each video's precomputed `paint_codes` (None
+    where missing); those videos are copied in instead of painted.
+    """
+    count = len(pairs)
+    results: List[Dict[str, Any]] = [{} for _ in range(count)]
+    if not count:
+        return results
+    totals = np.array([max(_max_frame(gt), _max_frame(pred)) + 1 for gt, pred in pairs], dtype=np.int64)
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(totals, out=offsets[1:])
+    size = int(offsets[-1])
+    cached = gt_codes if gt_codes is not None else [None] * count
+    gt_codes = np.zeros(size, dtype=np.int8)  # 0 = "outside", the default label
+    pred_codes = np.zeros(size, dtype=np.int8)
+    for i, (gt, pred) in enumerate(pairs):
+        if cached[i] is not None:
+            gt_codes[offsets[i] : offsets[i] + len(cached[i])] = cached[i]
+        else:
+            _paint(gt, gt_codes[offsets[i] : offsets[i + 1]])
+        _paint(pred, pred_codes[offsets[i] : offsets[i + 1]])
+    video_of = np.repeat(np.arange(count), totals)
+    first = np.zeros(size, dtype=bool)
+    first[offsets[:-1]] = True
+    last = np.zeros(size, dtype=bool)
+    last[offsets[1:] - 1] = True
+    outside = STATE_CODES.index(outside_state) if outside_state in STATE_CODES else -1
+
+    for i, total in enumerate(totals.tolist()):
+        results[i]["total_frames"] = total
+
+    if "label_pairs" in names:
+        counts = np.bincount(
+            (video_of * _N_STATES + gt_codes) * _N_STATES + pred_codes, minlength=count * _N_STATES * _N_STATES
+        ).reshape(count, _N_STATES, _N_STATES)
+        pair_counts: List[Counter] = [Counter() for _ in range(count)]
+        for v, g, p in zip(*(axis.tolist() for axis in np.nonzero(counts))):
+            pair_counts[v][(STATE_CODES[g], STATE_CODES[p])] = int(counts[v, g, p])
+        for i in range(count):
+            results[i]["label_pairs"] = pair_counts[i]
+
+    if "gt_transitions" in names or "transition_matches" in names:
+        transitions: Dict[str, List[List[Tuple[str, str, int]]]] = {}
+        for side, codes in (("gt", gt_codes), ("pred", pred_codes)):
+            at = np.flatnonzero((codes[1:] != codes[:-1]) & ~first[1:]) + 1
+            chunks = zip(
+                _split(at - offsets[video_of[at]], video_of[at], count),
+                _split(codes[at - 1], video_of[at], count),
+                _split(codes[at], video_of[at], count),
+            )
+            transitions[side] = [
+                [(STATE_CODES[a], STATE_CODES[b], f) for f, a, b in zip(frames.tolist(), src.tolist(), dst.tolist())]
+                for frames, src, dst in chunks
+            ]
+        for i in range(count):
+            results[i]["gt_transitions"] = transitions["gt"][i]
+            if "transition_matches" in names:
+                breakdown = TransitionBreakdown()
+                matched, gt_count, pred_count = _match_transitions(
+                    transitions["gt"][i], transitions["pred"][i], transition_tolerance_frames, breakdown
+                )
+                results[i]["transition_matches"] = (matched, gt_count, pred_count, breakdown)
+
+    if {"advisory_events", "advisory_starts", "activation_lengths"} & set(names):
+        events: Dict[str, List[List[Tuple[int, int]]]] = {}
+        for side, codes in (("gt", gt_codes), ("pred", pred_codes)):
+            starts, ends = _runs(codes != outside, first, last)
+            local = offsets[video_of[starts]]
+            chunks = zip(
+                _split(starts - local, video_of[starts], count), _split(ends - local, video_of[starts], count)
+            )
+            events[side] = [list(zip(s.tolist(), e.tolist())) for s, e in chunks]
+        for i in range(count):
+            gt_events, pred_events = events["gt"][i], events["pred"][i]
+            if "advisory_events" in names:
+                matched = _match_events(gt_events, pred_events, min_event_overlap_frames)
+                results[i]["advisory_events"] = (matched, len(gt_events), len(pred_events))
+            if "advisory_starts" in names:
+                results[i]["advisory_starts"] = (
+                    gt_events[0][0] if gt_events else None,
+                    pred_events[0][0] if pred_events else None,
+                )
+            if "activation_lengths" in names:
+                results[i]["activation_lengths"] = [end - start + 1 for start, end in pred_events]
+
+    if "false_activation_events" in names:
+        starts, _ = _runs((gt_codes == outside) & (pred_codes != outside), first, last)
+        episodes = np.bincount(video_of[starts], minlength=count).tolist()
+        for i in range(count):
+            results[i]["false_activation_events"] = episodes[i]
+    return results
+
@@ -0,0 +1,250 @@
+from collections import Counter
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..data_models import StateIntervals
+from .state import CURVE_MAX_TOLERANCE_FRAMES, DEFAULT_STATE_ORDER, TransitionBreakdown, _max_frame
+
+# Intermediates (see metrics/state.py) produced by the chunked pass; the
+# remaining built-in intermediates read the intervals and never expand labels.
+CHUNKED_INTERMEDIATES = (
+    "total_frames",
+    "label_pairs",
+    "gt_transitions",
+    "transition_matches",
+    "advisory_events",
+    "advisory_starts",
+    "activation_lengths",
+    "false_activation_events",
+)
+
+DEFAULT_CHUNK_FRAMES = 65536
+
+
+class _WindowPainter:
+    """Paints `_labels_from_intervals` labels one frame window at a time.
+
+    Only intervals overlapping the current window are kept, so memory is the
+    window plus the intervals still open across its end.
+    """
+
+    def __init__(self, states: StateIntervals, default_label: str = "outside"):
+        self.default_label = default_label
+        self._pending = {state: sorted(states.get(state, [])) for state in DEFAULT_STATE_ORDER}
+        self._next = {state: 0 for state in DEFAULT_STATE_ORDER}
+        self._open: Dict[str, List[Tuple[int, int]]] = {state: [] for state in DEFAULT_STATE_ORDER}
+
+    def window(self, start: int, stop: int) -> List[str]:
+        labels = [self.default_label] * (stop - start)
+        for state in DEFAULT_STATE_ORDER:  # Later states win, as when painting all frames.
+            intervals = self._pending[state]
+            i = self._next[state]
+            while i < len(intervals) and intervals[i][0] < stop:
+                self._open[state].append(intervals[i])
+                i += 1
+            self._next[state] = i
+            still_open = []
+            for first, last in self._open[state]:
+                lo, hi = max(first, start), min(last, stop - 1)
+                if lo <= hi:
+                    labels[lo - start : hi - start + 1] = [state] * (hi - lo + 1)
+                if last >= stop:
+                    still_open.append((first, last))
+            self._open[state] = still_open
+        return labels
+
+
+class _TransitionMatcher:
+    """Streaming `_match_transitions`: same greedy matches, bounded by the tolerance window.
+
+    A GT transition at frame g is resolved once every predicted transition up
+    to g + window is known, where the window covers the tolerance and the
+    nearest-offset range of `recall_curve`; predicted transitions older than
+    the oldest pending GT minus the window are dropped.
+    """
+
+    def __init__(self, tolerance: int):
+        self.tolerance = tolerance
+        self.window = max(CURVE_MAX_TOLERANCE_FRAMES, tolerance)
+        self.breakdown = TransitionBreakdown()
+        self.gt_transitions: List[Tuple[str, str, int]] = []
+        self.matched = 0
+        self.pred_count = 0
+        self._pending_gt: List[Tuple[str, str, int]] = []
+        self._pool: List[List[Any]] = []  # [from, to, frame, used], in frame order
+
+    def add_gt(self, transition: Tuple[str, str, int]) -> None:
+        self.gt_transitions.append(transition)
+        self.breakdown.gt[f"{transition[0]}->{transition[1]}"] += 1
+        self._pending_gt.append(transition)
+
+    def add_pred(self, transition: Tuple[str, str, int]) -> None:
+        self.pred_count += 1
+        self.breakdown.pred[f"{transition[0]}->{transition[1]}"] += 1
+        self._pool.append([*transition, False])
+
+    def resolve(self, before: Optional[int] = None) -> None:
+        """Match pending GT transitions at frames g with g + tolerance < `before` (all when None)."""
+        done = 0
+        for g_from, g_to, g_frame in self._pending_gt:
+            if before is not None and g_frame + self.window >= before:
+                break
+            done += 1
+            key = f"{g_from}->{g_to}"
+            nearest = min(
+                (abs(c[2] - g_frame) for c in self._pool if c[0] == g_from and c[1] == g_to), default=None
+            )
+            if nearest is not None and nearest <= self.window:
+                self.breakdown.nearest.setdefault(key, Counter())[nearest] += 1
+            for candidate in self._pool:
+                p_from, p_to, p_frame, used = candidate
+                if not used and p_from == g_from and p_to == g_to and abs(p_frame - g_frame) <= self.tolerance:
+                    candidate[3] = True
+                    self.matched += 1
+                    self.breakdown.matched[key] += 1
+                    self.breakdown.offsets.setdefault(key, Counter())[p_frame - g_frame] += 1
+                    break
+            oldest = g_frame - self.window
+            # Used predictions stay until they leave the window: they can still be nearest.
+            self._pool = [c for c in self._pool if c[2] >= oldest]
+        del self._pending_gt[:done]
+
+
+class _EventMatcher:
+    """Streaming `_match_events` over advisory runs, resolving each GT event as it closes.
+
+    When a GT event closes, every predicted event that can overlap it has
+    started; an open predicted event extends at least to the GT end. Closed,
+    unused predicted events ending before the next GT event are dropped.
+    """
+
+    def __init__(self, min_overlap_frames: int):
+        self.min_overlap_frames = min_overlap_frames
+        self.matched = 0
+        self.gt_count = 0
+        self.pred_count = 0
+        self._pool: List[List[Any]] = []  # [start, end or None while open, used]
+        self._open: Optional[List[Any]] = None
+
+    def open_pred(self, start: int) -> None:
+        self.pred_count += 1
+        self._open = [start, None, False]
+        self._pool.append(self._open)
+
+    def close_pred(self, end: int) -> None:
+        self._open[1] = end
+        self._open = None
+
+    def close_gt(self, start: int, end: int) -> None:
+        self.gt_count += 1
+        if self.min_overlap_frames <= 0:
+            # Every pair "overlaps", so each GT event takes the next unused prediction.
+            self.matched = min(self.gt_count, self.pred_count)
+            return
+        for candidate in self._pool:
+            p_start, p_end, used = candidate
+            if used or p_start > end:
+                continue
+            overlap = min(end, p_end if p_end is not None else end) - max(start, p_start) + 1
+            if overlap >= self.min_overlap_frames:
+                candidate[2] = True
+                self.matched += 1
+                break
+        self._pool = [c for c in self._pool if not c[2] and (c[1] is None or c[1] > end)]
+
+    def finish(self) -> None:
+        if self.min_overlap_frames <= 0:
+            self.matched = min(self.gt_count, self.pred_count)
+
+
+def chunked_intermediates(
+    gt_states: StateIntervals,
+    pred_states: StateIntervals,
+    chunk_frames: int = DEFAULT_CHUNK_FRAMES,
+    transition_tolerance_frames: int = 0,
+    min_event_overlap_frames: int = 1,
+    outside_state: str = "outside",
+) -> Dict[str, Any]:
+    """Label-based intermediates of one long video, `chunk_frames` frames at a time.
+
+    Each window of GT and predicted labels is painted, reduced to runs of
+    constant (gt, pred) labels and folded into carried state: the previous
+    labels, open advisory/false-activation runs, GT transitions still inside
+    the matching tolerance and advisory events still open. Values equal the
+    single-shot intermediates in `metrics/state.py`, while memory stays
+    bounded by the window (plus the transition and event lists).
+    """
+    if chunk_frames < 1:
+        raise ValueError("chunk_frames must be >= 1")
+    total = max(_max_frame(gt_states), _max_frame(pred_states)) + 1
+    total = total if total > 0 else 1
+    gt_painter = _WindowPainter(gt_states)
+    pred_painter = _WindowPainter(pred_states)
+    transitions = _TransitionMatcher(transition_tolerance_frames)
+    events = _EventMatcher(min_event_overlap_frames)
+    label_pairs: Counter = Counter()
+    activation_lengths: List[int] = []
+    false_activations = 0
+    gt_start: Optional[int] = None  # Open GT advisory event
+    pred_start: Optional[int] = None  # Open predicted advisory event
+    first_gt: Optional[int] = None
+    first_pred: Optional[int] = None
+    prev_gt: Optional[str] = None
+    prev_pred: Optional[str] = None
+    in_false = False
+    frame = 0
+    for chunk_start in range(0, total, chunk_frames):
+        chunk_stop = min(total, chunk_start + chunk_frames)
+        pairs = zip(gt_painter.window(chunk_start, chunk_stop), pred_painter.window(chunk_start, chunk_stop))
+        for (g, p), run in groupby(pairs):
+            length = sum(1 for _ in run)
+            label_pairs[(g, p)] += length
+            transitions.resolve(before=frame)
+            if prev_pred is not None and p != prev_pred:
+                transitions.add_pred((prev_pred, p, frame))
+            if prev_gt is not None and g != prev_gt:
+                transitions.add_gt((prev_gt, g, frame))
+            pred_active = p != outside_state
+            if pred_active and pred_start is None:
+                pred_start = frame
+                first_pred = frame if first_pred is None else first_pred
+                events.open_pred(frame)
+            elif not pred_active and pred_start is not None:
+                activation_lengths.append(frame - pred_start)
+                events.close_pred(frame - 1)
+                pred_start = None
+            gt_active = g != outside_state
+            if gt_active and gt_start is None:
+                gt_start = frame
+                first_gt = frame if first_gt is None else first_gt
+            elif not gt_active and gt_start is not None:
+                events.close_gt(gt_start, frame - 1)
+                gt_start = None
+            is_false = not gt_active and pred_active
+            if is_false and not in_false:
+                false_activations += 1
+            in_false = is_false
+            prev_gt, prev_pred = g, p
+            frame += length
+    if pred_start is not None:
+        activation_lengths.append(total - pred_start)
+        events.close_pred(total - 1)
+    if gt_start is not None:
+        events.close_gt(gt_start, total - 1)
+    events.finish()
+    transitions.resolve()
+    return {
+        "total_frames": total,
+        "label_pairs": label_pairs,
+        "gt_transitions": transitions.gt_transitions,
+        "transition_matches": (
+            transitions.matched,
+            len(transitions.gt_transitions),
+            transitions.pred_count,
+            transitions.breakdown,
+        ),
+        "advisory_events": (events.matched, events.gt_count, events.pred_count),
+        "advisory_starts": (first_gt, first_pred),
+        "activation_lengths": activation_lengths,
+        "false_activation_events": false_activations,
+    }
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import fnmatch
+import importlib
+from dataclasses import dataclass
+from importlib import metadata
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..data_models import FrameTimes, StateIntervals
+
+# Third-party packages expose metric modules (or zero-argument register
+# callables) under this entry-point group.
+ENTRY_POINT_GROUP = "workzone_metrics.metrics"
+
+DEFAULT_PARAMS: Dict[str, Any] = {
+    "transition_tolerance_frames": 0,
+    "entry_state": "inside",
+    "outside_state": "outside",
+    "min_event_overlap_frames": 1,
+    "simulated_compliance_gain": 0.4,
+    "source_fps": 30.0,
+    "stall_threshold_sec": 0.5,
+}
+
+# Returned by a metric to leave its field out of the payload entirely.
+SKIP = object()
+
+_BUILTIN_MODULES = ("workzone_metrics.metrics.state", "workzone_metrics.metrics.runtime")
+
+
+@dataclass(frozen=True)
+class Intermediate:
+    name: str
+    func: Callable[["EvalContext"], Any]
+    requires: Tuple[str, ...] = ()
+
+
+# Statistics a metric can request in the summary block: "mean" -> <metric>_mean,
+# "std" -> <metric>_std (population), "n" -> <metric>_n (non-None count),
+# "total" -> <metric>_total.
+SUMMARY_STATS = ("mean", "std", "n", "total")
+
+
+@dataclass(frozen=True)
+class Metric:
+    name: str
+    func: Callable[["EvalContext"], Any]
+    requires: Tuple[str, ...] = ()
+    summary: Tuple[str, ...] = ()
+
+
+_INTERMEDIATES: Dict[str, Intermediate] = {}
+_METRICS: Dict[str, Metric] = {}
+_SELECTIONS: Dict[Optional[Tuple[str, ...]], List[str]] = {}
+_SUMMARY_FIELDS: Optional[Dict[str, Tuple[str, ...]]] = None
+_loaded = False
+
+
+def register_intermediate(name: str, requires: Sequence[str] = ()) -> Callable:
+    """Decorator registering `func(ctx)` as a shared, memoized intermediate."""
+
+    def decorator(func: Callable[["EvalContext"], Any]) -> Callable[["EvalContext"], Any]:
+        _INTERMEDIATES[name] = Intermediate(name, func, tuple(requires))
+        return func
+
+    return decorator
+
+
+def register_metric(name: str, requires: Sequence[str] = (), summary: Sequence[str] = ()) -> Callable:
+    """Decorator registering `func(ctx)` as the per-video metric `name`.
+
+    `requires` lists the intermediates the metric reads from `ctx`; the
+    function may return `SKIP` to omit the field for this video. `summary`
+    picks the `SUMMARY_STATS` reported for it in `summary`, `groups` and
+    shard merges (none by default).
+    """
+    unknown = [stat for stat in summary if stat not in SUMMARY_STATS]
+    if unknown:
+        raise ValueError(f"Unknown summary stats for metric {name!r}: {unknown} (use {list(SUMMARY_STATS)}).")
+
+    def decorator(func: Callable[["EvalContext"], Any]) -> Callable[["EvalContext"], Any]:
+        global _SUMMARY_FIELDS
+        _METRICS[name] = Metric(name, func, tuple(requires), tuple(summary))
+        _SELECTIONS.clear()
+        _SUMMARY_FIELDS = None
+        return func
+
+    return decorator
+
+
+def _ensure_loaded() -> None:
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+    for module in _BUILTIN_MODULES:
+        importlib.import_module(module)
+    try:
+        entry_points = metadata.entry_points(group=ENTRY_POINT_GROUP)
+    except TypeError:  # Python < 3.10
+        entry_points = metadata.entry_points().get(ENTRY_POINT_GROUP, [])
+    for entry_point in entry_points:
+        loaded = entry_point.load()
+        if callable(loaded):
+            loaded()
+
+
+class EvalContext:
+    """Inputs of one video plus lazily computed intermediates, each computed once."""
+
+    def __init__(
+        self,
+        gt_states: StateIntervals,
+        pred_states: StateIntervals,
+        fps: Optional[float] = None,
+        frame_times: Optional[FrameTimes] = None,
+        gt_labels: Optional[List[str]] = None,
+        gt_transitions: Optional[List[Tuple[str, str, int]]] = None,
+        intermediates: Optional[Dict[str, Any]] = None,
+        **params: Any,
+    ):
+        self.gt_states = gt_states
+        self.pred_states = pred_states
+        self.fps = fps
+        self.frame_times = frame_times
+        # Optional precomputed `_expand_labels(gt_states)` and its transitions
+        # (only used together with `gt_labels`).
+        self.gt_labels = gt_labels
+        self.gt_transitions = gt_transitions
+        self.params = {**DEFAULT_PARAMS, **params}
+        # Optional intermediate values computed elsewhere (e.g. batched over a dataset).
+        self._cache: Dict[str, Any] = dict(intermediates) if intermediates else {}
+
+    def __getitem__(self, name: str) -> Any:
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+        _ensure_loaded()
+        spec = _INTERMEDIATES.get(name)
+        if spec is None:
+            raise KeyError(f"Unknown intermediate: {name}")
+        value = self._cache[name] = spec.func(self)
+        return value
+
+    def metric(self, name: str) -> Any:
+        _ensure_loaded()
+        return _METRICS[name].func(self)
+
+
+def available_metrics() -> List[str]:
+    _ensure_loaded()
+    return list(_METRICS)
+
+
+def summary_fields() -> Dict[str, Tuple[str, ...]]:
+    """Summary stats per registered metric that requests any, in registry order."""
+    global _SUMMARY_FIELDS
+    _ensure_loaded()
+    if _SUMMARY_FIELDS is None:
+        _SUMMARY_FIELDS = {name: metric.summary for name, metric in _METRICS.items() if metric.summary}
+    return _SUMMARY_FIELDS
+
+
+def select_metrics(patterns: Optional[Iterable[str]] = None) -> List[str]:
+    """Resolve shell-style patterns (`transition_*`) to metric names in registry order.
+
+    `None` selects every registered metric. Results are cached per pattern
+    list, so resolving once per video is cheap.
+    """
+    names = available_metrics()
+    key = tuple(patterns) if patterns is not None else None
+    cached = _SELECTIONS.get(key)
+    if cached is not None:
+        return cached
+    if key is None:
+        selection = names
+    else:
+        selected = set()
+        for pattern in key:
+            matches = fnmatch.filter(names, pattern)
+            if not matches:
+                raise ValueError(f"No registered metric matches {pattern!r}.")
+            selected.update(matches)
+        selection = [name for name in names if name in selected]
+    _SELECTIONS[key] = selection
+    return selection
+
+
+def parse_metrics_arg(value: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated `--metrics` value; empty means all metrics."""
+    if not value:
+        return None
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def required_intermediates(metrics: Iterable[str]) -> List[str]:
+    """Intermediates needed by `metrics`, dependencies first."""
+    _ensure_loaded()
+    order: List[str] = []
+    seen = set()
+
+    def visit(name: str) -> None:
+        if name in seen:
+            return
+        seen.add(name)
+        spec = _INTERMEDIATES.get(name)
+        if spec is None:
+            raise KeyError(f"Unknown intermediate: {name}")
+        for dep in spec.requires:
+            visit(dep)
+        order.append(name)
+
+    for metric in metrics:
+        for dep in _METRICS[metric].requires:
+            visit(dep)
+    return order
+
+
+def compute_metrics(ctx: EvalContext, metrics: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Evaluate metric names (all when `None`) against one video's context."""
+    names = select_metrics() if metrics is None else metrics
+    out: Dict[str, Any] = {}
+    for name in names:
+        value = _METRICS[name].func(ctx)
+        if value is not SKIP:
+            out[name] = value
+    return out
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import Any, List, Optional
+
+from ..data_models import FrameTimes
+from ..utils import _percentile
+from .registry import SKIP, EvalContext, register_intermediate, register_metric
+
+
+@dataclass
+class RuntimeMetrics:
+    latency_p50_sec: Optional[float]
+    latency_p95_sec: Optional[float]
+    latency_p99_sec: Optional[float]
+    max_gap_sec: Optional[float]
+    processing_time_sec: Optional[float]
+    real_time_factor: Optional[float]
+    stall_count: int
+
+
+def compute_runtime_metrics(
+    frame_times: FrameTimes,
+    source_fps: float = 30.0,
+    stall_threshold_sec: float = 0.5,
+) -> RuntimeMetrics:
+    """Latency and real-time metrics from per-row timeline timestamps.
+
+    `time_sec` is treated as the pipeline's processing clock. Latency is the
+    gap between consecutive timeline rows; the real-time factor is processing
+    time over the source-video duration covered by those rows (<= 1.0 keeps up
+    with real time).
+    """
+    frames = frame_times.frames
+    times = frame_times.times
+    gaps: List[float] = []
+    stall_count = 0
+    for i in range(1, len(times)):
+        if frames[i] <= frames[i - 1]:
+            continue
+        dt = times[i] - times[i - 1]
+        if dt < 0:
+            continue
+        gaps.append(dt)
+        if dt > stall_threshold_sec:
+            stall_count += 1
+    gaps.sort()
+
+    processing_time_sec = None
+    real_time_factor = None
+    if len(times) > 1:
+        processing_time_sec = max(0.0, times[-1] - times[0])
+        frame_span = frames[-1] - frames[0]
+        if source_fps and source_fps > 0 and frame_span > 0:
+            real_time_factor = processing_time_sec / (frame_span / source_fps)
+
+    return RuntimeMetrics(
+        latency_p50_sec=_percentile(gaps, 50),
+        latency_p95_sec=_percentile(gaps, 95),
+        latency_p99_sec=_percentile(gaps, 99),
+        max_gap_sec=gaps[-1] if gaps else None,
+        processing_time_sec=processing_time_sec,
+        real_time_factor=real_time_factor,
+        stall_count=stall_count,
+    )
+
+
+@register_intermediate("runtime")
+def _i_runtime(ctx: EvalContext) -> Optional[RuntimeMetrics]:
+    if ctx.frame_times is None:
+        return None
+    return compute_runtime_metrics(
+        ctx.frame_times,
+        source_fps=ctx.params["source_fps"],
+        stall_threshold_sec=ctx.params["stall_threshold_sec"],
+    )
+
+
+_RUNTIME_SUMMARY = {
+    "latency_p50_sec": ("mean",),
+    "latency_p95_sec": ("mean",),
+    "latency_p99_sec": ("mean",),
+    "max_gap_sec": ("mean", "std"),
+    "real_time_factor": ("mean", "std", "n"),
+    "stall_count": ("mean", "total"),
+}
+
+
+def _register_runtime_field(name: str) -> None:
+    # Runtime fields only appear for predictions with timeline timestamps.
+    @register_metric(name, requires=("runtime",), summary=_RUNTIME_SUMMARY.get(name, ()))
+    def _m_runtime(ctx: EvalContext) -> Any:
+        runtime = ctx["runtime"]
+        return SKIP if runtime is None else getattr(runtime, name)
+
+
+for _field in fields(RuntimeMetrics):
+    _register_runtime_field(_field.name)
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, List, Tuple, Optional
+from collections import Counter
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Mapping, Tuple, Optional
+
+from .registry import SKIP, EvalContext, register_intermediate, register_metric
 
 StateIntervals = Dict[str, List[Tuple[int, int]]]
 
 DEFAULT_STATE_ORDER = ["inside", "exiting", "approaching", "outside"]
+REPORT_STATES = ["outside", "approaching", "inside", "exiting"]
+# Nearest-prediction offsets feeding `recall_curve` are kept up to this many
+# frames (or the matching tolerance, if larger).
+CURVE_MAX_TOLERANCE_FRAMES = 30
 
 
 @dataclass
@@ -75,6 +82,82 @@ def _labels_from_intervals(
     return labels
 
 
+def _expand_labels(states: StateIntervals) -> List[str]:
+    """Per-frame labels over [0, last annotated frame], reusable across predictions."""
+    return _labels_from_intervals(states, _max_frame(states) + 1)
+
+
+def _pad_labels(labels: List[str], total_frames: int, default_label: str = "outside") -> List[str]:
+    if len(labels) >= total_frames:
+        return labels
+    return labels + [default_label] * (total_frames - len(labels))
+
+
+def _label_runs(
+    states: StateIntervals,
+    total_frames: int,
+    order: List[str] = None,
+    default_label: str = "outside",
+) -> List[Tuple[int, int, str]]:
+    """Disjoint `(start, end, label)` runs equal to `_labels_from_intervals`, without expansion.
+
+    Later states in `order` win where intervals overlap, as when painting labels.
+    """
+    if order is None:
+        order = DEFAULT_STATE_ORDER
+    priority = {state: rank for rank, state in enumerate(order)}
+    events: List[Tuple[int, int, int]] = []
+    for state, rank in priority.items():
+        for start, end in states.get(state, []):
+            start = max(0, start)
+            end = min(total_frames - 1, end)
+            if start <= end:
+                events.append((start, 1, rank))
+                events.append((end + 1, -1, rank))
+    events.sort()
+    active = [0] * len(order)
+    runs: List[Tuple[int, int, str]] = []
+    pos = 0
+    i = 0
+    while pos < total_frames:
+        while i < len(events) and events[i][0] <= pos:
+            active[events[i][2]] += events[i][1]
+            i += 1
+        next_pos = events[i][0] if i < len(events) else total_frames
+        next_pos = min(next_pos, total_frames)
+        top = max((rank for rank, count in enumerate(active) if count > 0), default=None)
+        label = order[top] if top is not None else default_label
+        if runs and runs[-1][2] == label:
+            runs[-1] = (runs[-1][0], next_pos - 1, label)
+        else:
+            runs.append((pos, next_pos - 1, label))
+        pos = next_pos
+    return runs
+
+
+def _disagreement_runs(
+    gt_runs: List[Tuple[int, int, str]], pred_runs: List[Tuple[int, int, str]]
+) -> List[Tuple[int, int, str, str]]:
+    """Linear merge of two run lists into maximal `(start, end, gt, pred)` runs with gt != pred."""
+    out: List[Tuple[int, int, str, str]] = []
+    i = j = 0
+    while i < len(gt_runs) and j < len(pred_runs):
+        g_start, g_end, g_label = gt_runs[i]
+        p_start, p_end, p_label = pred_runs[j]
+        start = max(g_start, p_start)
+        end = min(g_end, p_end)
+        if start <= end and g_label != p_label:
+            if out and out[-1][1] == start - 1 and out[-1][2:] == (g_label, p_label):
+                out[-1] = (out[-1][0], end, g_label, p_label)
+            else:
+                out.append((start, end, g_label, p_label))
+        if g_end <= p_end:
+            i += 1
+        if p_end <= g_end:
+            j += 1
+    return out
+
+
 def _transitions(labels: List[str]) -> List[Tuple[str, str, int]]:
     transitions: List[Tuple[str, str, int]] = []
     if not labels:
@@ -88,13 +171,127 @@ def _transitions(labels: List[str]) -> List[Tuple[str, str, int]]:
     return transitions
 
 
+@dataclass
+class TransitionBreakdown:
+    """Mergeable per-(from, to) transition match counts and offset histograms.
+
+    Keys are "from->to". `offsets` holds the signed (pred - gt) frame offsets
+    of matched transitions; `nearest` the |offset| of the nearest predicted
+    transition of the same type for each GT transition, matched or not (up to
+    `CURVE_MAX_TOLERANCE_FRAMES`).
+    """
+
+    gt: Counter = field(default_factory=Counter)
+    pred: Counter = field(default_factory=Counter)
+    matched: Counter = field(default_factory=Counter)
+    offsets: Dict[str, Counter] = field(default_factory=dict)
+    nearest: Dict[str, Counter] = field(default_factory=dict)
+
+    def merge(self, other: "TransitionBreakdown", sign: int = 1) -> None:
+        for mine, theirs in ((self.gt, other.gt), (self.pred, other.pred), (self.matched, other.matched)):
+            for key, count in theirs.items():
+                mine[key] += sign * count
+        for own, their in ((self.offsets, other.offsets), (self.nearest, other.nearest)):
+            for key, hist in their.items():
+                target = own.setdefault(key, Counter())
+                for offset, count in hist.items():
+                    target[offset] += sign * count
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "gt": dict(self.gt),
+            "pred": dict(self.pred),
+            "matched": dict(self.matched),
+            "offsets": {
+                key: {str(offset): count for offset, count in sorted(hist.items()) if count}
+                for key, hist in self.offsets.items()
+            },
+            "nearest": {
+                key: {str(offset): count for offset, count in sorted(hist.items()) if count}
+                for key, hist in self.nearest.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, raw: Mapping[str, Any]) -> "TransitionBreakdown":
+        return cls(
+            gt=Counter(raw.get("gt", {})),
+            pred=Counter(raw.get("pred", {})),
+            matched=Counter(raw.get("matched", {})),
+            offsets={
+                key: Counter({int(offset): count for offset, count in hist.items()})
+                for key, hist in raw.get("offsets", {}).items()
+            },
+            nearest={
+                key: Counter({int(offset): count for offset, count in hist.items()})
+                for key, hist in raw.get("nearest", {}).items()
+            },
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-type counts, rates, offset histogram and tolerance-recall curve.
+
+        The curve gives, for each tolerance up to the largest recorded nearest
+        offset, the share of GT transitions with a same-type predicted
+        transition within that many frames. It does not depend on the
+        tolerance used for matching (one prediction may be nearest to several
+        GT transitions, so it is an upper bound on one-to-one recall).
+        """
+        out: Dict[str, Any] = {}
+        for key in sorted(set(self.gt) | set(self.pred)):
+            gt_count = self.gt[key]
+            pred_count = self.pred[key]
+            if gt_count <= 0 and pred_count <= 0:
+                continue
+            matched = self.matched[key]
+            hist = {offset: n for offset, n in self.offsets.get(key, Counter()).items() if n > 0}
+            nearest = {offset: n for offset, n in self.nearest.get(key, Counter()).items() if n > 0}
+            curve = []
+            within = 0
+            for tol in range(max(nearest, default=0) + 1):
+                within += nearest.get(tol, 0)
+                curve.append([tol, _safe_div(within, gt_count)])
+            out[key] = {
+                "gt": gt_count,
+                "pred": pred_count,
+                "matched": matched,
+                "unmatched_gt": gt_count - matched,
+                "unmatched_pred": pred_count - matched,
+                "recall": _safe_div(matched, gt_count),
+                "precision": _safe_div(matched, pred_count),
+                "offset_mean": _safe_div(sum(o * n for o, n in hist.items()), matched),
+                "offset_histogram": {str(o): hist[o] for o in sorted(hist)},
+                "recall_curve": curve,
+            }
+        return out
+
+
+def _record_nearest(
+    gt: List[Tuple[str, str, int]],
+    pred: List[Tuple[str, str, int]],
+    tolerance: int,
+    breakdown: TransitionBreakdown,
+) -> None:
+    cap = max(CURVE_MAX_TOLERANCE_FRAMES, tolerance)
+    for g_from, g_to, g_frame in gt:
+        nearest = min(
+            (abs(p_frame - g_frame) for p_from, p_to, p_frame in pred if p_from == g_from and p_to == g_to),
+            default=None,
+        )
+        if nearest is not None and nearest <= cap:
+            breakdown.nearest.setdefault(f"{g_from}->{g_to}", Counter())[nearest] += 1
+
+
 def _match_transitions(
     gt: List[Tuple[str, str, int]],
     pred: List[Tuple[str, str, int]],
     tolerance: int,
+    breakdown: Optional[TransitionBreakdown] = None,
 ) -> Tuple[int, int, int]:
     matched = 0
     used = [False] * len(pred)
+    if breakdown is not None:
+        _record_nearest(gt, pred, tolerance, breakdown)
     for g_from, g_to, g_frame in gt:
         for i, (p_from, p_to, p_frame) in enumerate(pred):
             if used[i]:
@@ -102,7 +299,14 @@ def _match_transitions(
             if p_from == g_from and p_to == g_to and abs(p_frame - g_frame) <= tolerance:
                 used[i] = True
                 matched += 1
+                if breakdown is not None:
+                    key = f"{g_from}->{g_to}"
+                    breakdown.matched[key] += 1
+                    breakdown.offsets.setdefault(key, Counter())[p_frame - g_frame] += 1
                 break
+    if breakdown is not None:
+        breakdown.gt.update(f"{g_from}->{g_to}" for g_from, g_to, _ in gt)
+        breakdown.pred.update(f"{p_from}->{p_to}" for p_from, p_to, _ in pred)
     return matched, len(gt), len(pred)
 
 
@@ -119,51 +323,6 @@ def _safe_div(num: float, den: float) -> Optional[float]:
     return num / den
 
 
-def _per_state_iou(
-    gt_labels: List[str], pred_labels: List[str], states: List[str]
-) -> Dict[str, Optional[float]]:
-    out: Dict[str, Optional[float]] = {}
-    for state in states:
-        intersection = sum(
-            1 for g, p in zip(gt_labels, pred_labels) if g == state and p == state
-        )
-        union = sum(1 for g, p in zip(gt_labels, pred_labels) if g == state or p == state)
-        out[state] = _safe_div(intersection, union)
-    return out
-
-
-def _macro_classification_metrics(
-    gt_labels: List[str], pred_labels: List[str], states: List[str]
-) -> Tuple[Optional[float], Optional[float], Optional[float]]:
-    precisions: List[float] = []
-    recalls: List[float] = []
-    f1s: List[float] = []
-
-    for state in states:
-        tp = sum(1 for g, p in zip(gt_labels, pred_labels) if g == state and p == state)
-        fp = sum(1 for g, p in zip(gt_labels, pred_labels) if g != state and p == state)
-        fn = sum(1 for g, p in zip(gt_labels, pred_labels) if g == state and p != state)
-
-        precision = _safe_div(tp, tp + fp)
-        recall = _safe_div(tp, tp + fn)
-        if precision is not None and recall is not None and (precision + recall) > 0:
-            f1 = 2 * precision * recall / (precision + recall)
-        else:
-            f1 = None
-
-        if precision is not None:
-            precisions.append(precision)
-        if recall is not None:
-            recalls.append(recall)
-        if f1 is not None:
-            f1s.append(f1)
-
-    macro_precision = sum(precisions) / len(precisions) if precisions else None
-    macro_recall = sum(recalls) / len(recalls) if recalls else None
-    macro_f1 = sum(f1s) / len(f1s) if f1s else None
-    return macro_precision, macro_recall, macro_f1
-
-
 def _first_non_outside_frame(labels: List[str], outside_state: str) -> Optional[int]:
     for i, label in enumerate(labels):
         if label != outside_state:
@@ -194,175 +353,528 @@ def compute_state_metrics(
     outside_state: str = "outside",
     min_event_overlap_frames: int = 1,
     simulated_compliance_gain: float = 0.4,
+    gt_labels: Optional[List[str]] = None,
+    transition_breakdown: Optional[TransitionBreakdown] = None,
+    confusion_matrix: Optional[List[List[int]]] = None,
 ) -> StateMetrics:
-    total_frames = max(_max_frame(gt_states), _max_frame(pred_states)) + 1
-    if total_frames <= 0:
-        total_frames = 1
-
-    gt_labels = _labels_from_intervals(gt_states, total_frames)
-    pred_labels = _labels_from_intervals(pred_states, total_frames)
-
-    correct = sum(1 for g, p in zip(gt_labels, pred_labels) if g == p)
-    frame_accuracy = correct / total_frames
-    time_in_error_frames = total_frames - correct
-
-    gt_trans = _transitions(gt_labels)
-    pred_trans = _transitions(pred_labels)
-    matched, gt_count, pred_count = _match_transitions(gt_trans, pred_trans, transition_tolerance_frames)
-    transition_recall = matched / gt_count if gt_count else None
-    transition_precision = matched / pred_count if pred_count else None
-    denom = max(gt_count, pred_count)
-    transition_accuracy = matched / denom if denom else 1.0
-
-    gt_events = gt_states.get(entry_state, [])
-    pred_events = pred_states.get(entry_state, [])
-    matched_events = _match_events(gt_events, pred_events, min_event_overlap_frames)
-    event_recall = matched_events / len(gt_events) if gt_events else None
-    event_precision = matched_events / len(pred_events) if pred_events else None
-
-    gt_advisory_events = _events_from_mask([g != outside_state for g in gt_labels])
-    pred_advisory_events = _events_from_mask([p != outside_state for p in pred_labels])
-    matched_advisory_events = _match_events(
-        gt_advisory_events, pred_advisory_events, min_event_overlap_frames
-    )
-    advisory_event_recall = (
-        matched_advisory_events / len(gt_advisory_events) if gt_advisory_events else None
+    """Compute state metrics for one video.
+
+    `gt_labels` may carry `_expand_labels(gt_states)` computed once up front;
+    it is padded to the evaluation length instead of re-expanding GT. When
+    `transition_breakdown` is given, per-type transition matches are recorded
+    into it during matching; `confusion_matrix` (REPORT_STATES x REPORT_STATES,
+    GT rows) is likewise incremented with frame counts.
+    """
+    ctx = EvalContext(
+        gt_states,
+        pred_states,
+        fps=fps,
+        gt_labels=gt_labels,
+        transition_tolerance_frames=transition_tolerance_frames,
+        entry_state=entry_state,
+        outside_state=outside_state,
+        min_event_overlap_frames=min_event_overlap_frames,
+        simulated_compliance_gain=simulated_compliance_gain,
     )
-    advisory_event_precision = (
-        matched_advisory_events / len(pred_advisory_events) if pred_advisory_events else None
+    metrics = StateMetrics(**{f.name: ctx.metric(f.name) for f in fields(StateMetrics)})
+    if transition_breakdown is not None:
+        transition_breakdown.merge(ctx["transition_matches"][3])
+    if confusion_matrix is not None:
+        for row, counts in zip(confusion_matrix, _confusion_rows(ctx)):
+            for j, count in enumerate(counts):
+                row[j] += count
+    return metrics
+
+
+# Intermediates shared by the registered state metrics. Each is computed at
+# most once per video, and only when a selected metric needs it.
+
+
+def _fps_ok(ctx: EvalContext) -> bool:
+    return bool(ctx.fps and ctx.fps > 0)
+
+
+@register_intermediate("total_frames")
+def _i_total_frames(ctx: EvalContext) -> int:
+    total_frames = max(_max_frame(ctx.gt_states), _max_frame(ctx.pred_states)) + 1
+    return total_frames if total_frames > 0 else 1
+
+
+@register_intermediate("gt_labels", requires=("total_frames",))
+def _i_gt_labels(ctx: EvalContext) -> List[str]:
+    if ctx.gt_labels is None:
+        return _labels_from_intervals(ctx.gt_states, ctx["total_frames"])
+    return _pad_labels(ctx.gt_labels, ctx["total_frames"])
+
+
+@register_intermediate("pred_labels", requires=("total_frames",))
+def _i_pred_labels(ctx: EvalContext) -> List[str]:
+    return _labels_from_intervals(ctx.pred_states, ctx["total_frames"])
+
+
+@register_intermediate("label_pairs", requires=("gt_labels", "pred_labels"))
+def _i_label_pairs(ctx: EvalContext) -> Counter:
+    """Frame counts per (gt, pred) label pair: the full confusion matrix."""
+    return Counter(zip(ctx["gt_labels"], ctx["pred_labels"]))
+
+
+@register_intermediate("correct_frames", requires=("label_pairs",))
+def _i_correct_frames(ctx: EvalContext) -> int:
+    return sum(n for (g, p), n in ctx["label_pairs"].items() if g == p)
+
+
+@register_intermediate("state_counts", requires=("label_pairs",))
+def _i_state_counts(ctx: EvalContext) -> Dict[str, Tuple[int, int, int]]:
+    """(true positives, GT frames, predicted frames) per report state."""
+    tp: Counter = Counter()
+    gt_frames: Counter = Counter()
+    pred_frames: Counter = Counter()
+    for (g, p), n in ctx["label_pairs"].items():
+        gt_frames[g] += n
+        pred_frames[p] += n
+        if g == p:
+            tp[g] += n
+    return {state: (tp[state], gt_frames[state], pred_frames[state]) for state in REPORT_STATES}
+
+
+@register_intermediate("gt_transitions", requires=("gt_labels",))
+def _i_gt_transitions(ctx: EvalContext) -> List[Tuple[str, str, int]]:
+    if ctx.gt_labels is None or ctx.gt_transitions is None:
+        return _transitions(ctx["gt_labels"])
+    # Precomputed over the unpadded labels; padding may add one closing transition.
+    labels = ctx.gt_labels
+    if labels and len(ctx["gt_labels"]) > len(labels) and labels[-1] != "outside":
+        return ctx.gt_transitions + [(labels[-1], "outside", len(labels))]
+    return ctx.gt_transitions
+
+
+@register_intermediate("transition_matches", requires=("gt_transitions", "pred_labels"))
+def _i_transition_matches(ctx: EvalContext) -> Tuple[int, int, int, TransitionBreakdown]:
+    breakdown = TransitionBreakdown()
+    matched, gt_count, pred_count = _match_transitions(
+        ctx["gt_transitions"],
+        _transitions(ctx["pred_labels"]),
+        ctx.params["transition_tolerance_frames"],
+        breakdown,
     )
+    return matched, gt_count, pred_count, breakdown
+
+
+@register_intermediate("first_frames")
+def _i_first_frames(ctx: EvalContext) -> Dict[str, Tuple[Optional[int], Optional[int]]]:
+    """First (gt, pred) frame of every annotated state."""
+    return {
+        state: (_first_state_frame(ctx.gt_states, state), _first_state_frame(ctx.pred_states, state))
+        for state in set(ctx.gt_states) | set(ctx.pred_states)
+    }
+
+
+@register_intermediate("entry_events")
+def _i_entry_events(ctx: EvalContext) -> Tuple[int, int, int]:
+    entry_state = ctx.params["entry_state"]
+    gt_events = ctx.gt_states.get(entry_state, [])
+    pred_events = ctx.pred_states.get(entry_state, [])
+    matched = _match_events(gt_events, pred_events, ctx.params["min_event_overlap_frames"])
+    return matched, len(gt_events), len(pred_events)
+
 
-    gt_entry = _first_state_frame(gt_states, entry_state)
-    pred_entry = _first_state_frame(pred_states, entry_state)
-    entry_timing_mae = None
-    if gt_entry is not None and pred_entry is not None:
-        entry_timing_mae = abs(pred_entry - gt_entry)
-
-    false_activation_frames = 0
-    gt_outside_frames = 0
-    gt_advisory_frames = 0
-    matched_advisory_frames = 0
-    for g, p in zip(gt_labels, pred_labels):
+@register_intermediate("advisory_events", requires=("gt_labels", "pred_labels"))
+def _i_advisory_events(ctx: EvalContext) -> Tuple[int, int, int]:
+    outside_state = ctx.params["outside_state"]
+    gt_events = _events_from_mask([g != outside_state for g in ctx["gt_labels"]])
+    pred_events = _events_from_mask([p != outside_state for p in ctx["pred_labels"]])
+    matched = _match_events(gt_events, pred_events, ctx.params["min_event_overlap_frames"])
+    return matched, len(gt_events), len(pred_events)
+
+
+@register_intermediate("advisory_frames", requires=("label_pairs",))
+def _i_advisory_frames(ctx: EvalContext) -> Dict[str, int]:
+    outside_state = ctx.params["outside_state"]
+    out = {"gt_advisory": 0, "matched_advisory": 0, "gt_outside": 0, "false_activation": 0}
+    for (g, p), n in ctx["label_pairs"].items():
         if g != outside_state:
-            gt_advisory_frames += 1
+            out["gt_advisory"] += n
             if p != outside_state:
-                matched_advisory_frames += 1
-        if g == outside_state:
-            gt_outside_frames += 1
+                out["matched_advisory"] += n
+        else:
+            out["gt_outside"] += n
             if p != outside_state:
-                false_activation_frames += 1
-    false_activation_rate = (
-        false_activation_frames / gt_outside_frames if gt_outside_frames else 0.0
+                out["false_activation"] += n
+    return out
+
+
+@register_intermediate("advisory_starts", requires=("gt_labels", "pred_labels"))
+def _i_advisory_starts(ctx: EvalContext) -> Tuple[Optional[int], Optional[int]]:
+    outside_state = ctx.params["outside_state"]
+    return (
+        _first_non_outside_frame(ctx["gt_labels"], outside_state),
+        _first_non_outside_frame(ctx["pred_labels"], outside_state),
     )
 
-    activation_lengths: List[int] = []
+
+@register_intermediate("activation_lengths", requires=("pred_labels",))
+def _i_activation_lengths(ctx: EvalContext) -> List[int]:
+    outside_state = ctx.params["outside_state"]
+    lengths: List[int] = []
     run = 0
-    for p in pred_labels:
+    for p in ctx["pred_labels"]:
         if p != outside_state:
             run += 1
         elif run:
-            activation_lengths.append(run)
+            lengths.append(run)
             run = 0
     if run:
-        activation_lengths.append(run)
-    mean_persistence = sum(activation_lengths) / len(activation_lengths) if activation_lengths else 0.0
-
-    false_activations_per_minute = None
-    false_advisories_per_minute = None
-    entry_timing_mae_sec = None
-    mean_persistence_sec = None
-    time_in_error_sec = None
-    advisory_timing_mae_sec = None
-    advisory_start_error_sec = None
-    if fps and fps > 0:
-        total_minutes = total_frames / fps / 60.0
-        false_activation_events = 0
-        in_false = False
-        for g, p in zip(gt_labels, pred_labels):
-            is_false = g == outside_state and p != outside_state
-            if is_false and not in_false:
-                false_activation_events += 1
-            in_false = is_false
-        false_activations_per_minute = false_activation_events / total_minutes if total_minutes else 0.0
-        false_advisories_per_minute = false_activations_per_minute
-        if entry_timing_mae is not None:
-            entry_timing_mae_sec = entry_timing_mae / fps
-        mean_persistence_sec = mean_persistence / fps
-        time_in_error_sec = time_in_error_frames / fps
-
-    gt_advisory_start = _first_non_outside_frame(gt_labels, outside_state)
-    pred_advisory_start = _first_non_outside_frame(pred_labels, outside_state)
-    advisory_start_error_frames = None
-    advisory_timing_mae_frames = None
-    if gt_advisory_start is not None and pred_advisory_start is not None:
-        advisory_start_error_frames = pred_advisory_start - gt_advisory_start
-        advisory_timing_mae_frames = abs(advisory_start_error_frames)
-        if fps and fps > 0:
-            advisory_start_error_sec = advisory_start_error_frames / fps
-            advisory_timing_mae_sec = advisory_timing_mae_frames / fps
-
-    false_advisory_rate = false_activation_rate
-    advisory_coverage_ratio = None
-    late_advisory_rate = None
-    simulated_speed_violation_reduction = None
-    if gt_advisory_frames > 0:
-        gain = min(max(simulated_compliance_gain, 0.0), 1.0)
-        advisory_coverage = matched_advisory_frames / gt_advisory_frames
-        advisory_coverage_ratio = advisory_coverage
-        simulated_speed_violation_reduction = advisory_coverage * gain
-        if gt_advisory_start is not None and pred_advisory_start is not None:
-            late_frames = max(0, pred_advisory_start - gt_advisory_start)
-            late_advisory_rate = min(1.0, late_frames / gt_advisory_frames)
-
-    lead_time_sec = None
-    if fps and fps > 0 and gt_entry is not None and pred_advisory_start is not None:
-        lead_time_sec = (gt_entry - pred_advisory_start) / fps
-
-    report_states = ["outside", "approaching", "inside", "exiting"]
-    iou_by_state = _per_state_iou(gt_labels, pred_labels, report_states)
-    valid_ious = [v for v in iou_by_state.values() if v is not None]
-    mean_iou = sum(valid_ious) / len(valid_ious) if valid_ious else None
-    macro_precision, macro_recall, macro_f1 = _macro_classification_metrics(
-        gt_labels, pred_labels, report_states
+        lengths.append(run)
+    return lengths
+
+
+@register_intermediate("false_activation_events", requires=("gt_labels", "pred_labels"))
+def _i_false_activation_events(ctx: EvalContext) -> int:
+    outside_state = ctx.params["outside_state"]
+    events = 0
+    in_false = False
+    for g, p in zip(ctx["gt_labels"], ctx["pred_labels"]):
+        is_false = g == outside_state and p != outside_state
+        if is_false and not in_false:
+            events += 1
+        in_false = is_false
+    return events
+
+
+def _confusion_rows(ctx: EvalContext) -> List[List[int]]:
+    pairs = ctx["label_pairs"]
+    return [[pairs[(g, p)] for p in REPORT_STATES] for g in REPORT_STATES]
+
+
+def _entry_frames(ctx: EvalContext) -> Tuple[Optional[int], Optional[int]]:
+    return ctx["first_frames"].get(ctx.params["entry_state"], (None, None))
+
+
+def _per_sec(ctx: EvalContext, frames: Optional[float]) -> Optional[float]:
+    if frames is None or not _fps_ok(ctx):
+        return None
+    return frames / ctx.fps
+
+
+@register_metric("frame_accuracy", requires=("correct_frames", "total_frames"), summary=("mean",))
+def _m_frame_accuracy(ctx: EvalContext) -> float:
+    return ctx["correct_frames"] / ctx["total_frames"]
+
+
+@register_metric("time_in_error_frames", requires=("correct_frames", "total_frames"), summary=("mean",))
+def _m_time_in_error_frames(ctx: EvalContext) -> int:
+    return ctx["total_frames"] - ctx["correct_frames"]
+
+
+@register_metric("time_in_error_sec", requires=("correct_frames", "total_frames"), summary=("mean",))
+def _m_time_in_error_sec(ctx: EvalContext) -> Optional[float]:
+    return _per_sec(ctx, _m_time_in_error_frames(ctx))
+
+
+@register_metric("transition_recall", requires=("transition_matches",), summary=("mean", "n"))
+def _m_transition_recall(ctx: EvalContext) -> Optional[float]:
+    matched, gt_count, _, _ = ctx["transition_matches"]
+    return matched / gt_count if gt_count else None
+
+
+@register_metric("transition_precision", requires=("transition_matches",), summary=("mean", "n"))
+def _m_transition_precision(ctx: EvalContext) -> Optional[float]:
+    matched, _, pred_count, _ = ctx["transition_matches"]
+    return matched / pred_count if pred_count else None
+
+
+@register_metric("transition_accuracy", requires=("transition_matches",), summary=("mean",))
+def _m_transition_accuracy(ctx: EvalContext) -> float:
+    matched, gt_count, pred_count, _ = ctx["transition_matches"]
+    denom = max(gt_count, pred_count)
+    return matched / denom if denom else 1.0
+
+
+@register_metric("transition_breakdown", requires=("transition_matches",))
+def _m_transition_breakdown(ctx: EvalContext) -> Dict[str, Any]:
+    return ctx["transition_matches"][3].to_dict()
+
+
+@register_metric("event_recall", requires=("entry_events",), summary=("mean", "n"))
+def _m_event_recall(ctx: EvalContext) -> Optional[float]:
+    matched, gt_count, _ = ctx["entry_events"]
+    return matched / gt_count if gt_count else None
+
+
+@register_metric("event_precision", requires=("entry_events",), summary=("mean", "n"))
+def _m_event_precision(ctx: EvalContext) -> Optional[float]:
+    matched, _, pred_count = ctx["entry_events"]
+    return matched / pred_count if pred_count else None
+
+
+@register_metric("advisory_event_recall", requires=("advisory_events",), summary=("mean", "n"))
+def _m_advisory_event_recall(ctx: EvalContext) -> Optional[float]:
+    matched, gt_count, _ = ctx["advisory_events"]
+    return matched / gt_count if gt_count else None
+
+
+@register_metric("advisory_event_precision", requires=("advisory_events",), summary=("mean", "n"))
+def _m_advisory_event_precision(ctx: EvalContext) -> Optional[float]:
+    matched, _, pred_count = ctx["advisory_events"]
+    return matched / pred_count if pred_count else None
+
+
+@register_metric("entry_timing_mae_frames", requires=("first_frames",), summary=("mean",))
+def _m_entry_timing_mae_frames(ctx: EvalContext) -> Optional[int]:
+    gt_entry, pred_entry = _entry_frames(ctx)
+    if gt_entry is None or pred_entry is None:
+        return None
+    return abs(pred_entry - gt_entry)
+
+
+@register_metric("entry_timing_mae_sec", requires=("first_frames",), summary=("mean",))
+def _m_entry_timing_mae_sec(ctx: EvalContext) -> Optional[float]:
+    return _per_sec(ctx, _m_entry_timing_mae_frames(ctx))
+
+
+@register_metric("false_activation_rate", requires=("advisory_frames",), summary=("mean",))
+def _m_false_activation_rate(ctx: EvalContext) -> float:
+    frames = ctx["advisory_frames"]
+    return frames["false_activation"] / frames["gt_outside"] if frames["gt_outside"] else 0.0
+
+
+register_metric("false_advisory_rate", requires=("advisory_frames",), summary=("mean",))(_m_false_activation_rate)
+
+
+@register_metric("mean_activation_persistence_frames", requires=("activation_lengths",), summary=("mean",))
+def _m_mean_activation_persistence_frames(ctx: EvalContext) -> float:
+    lengths = ctx["activation_lengths"]
+    return sum(lengths) / len(lengths) if lengths else 0.0
+
+
+@register_metric("mean_activation_persistence_sec", requires=("activation_lengths",), summary=("mean",))
+def _m_mean_activation_persistence_sec(ctx: EvalContext) -> Optional[float]:
+    return _per_sec(ctx, _m_mean_activation_persistence_frames(ctx))
+
+
+@register_metric(
+    "false_activations_per_minute", requires=("false_activation_events", "total_frames"), summary=("mean",)
+)
+def _m_false_activations_per_minute(ctx: EvalContext) -> Optional[float]:
+    if not _fps_ok(ctx):
+        return None
+    total_minutes = ctx["total_frames"] / ctx.fps / 60.0
+    return ctx["false_activation_events"] / total_minutes if total_minutes else 0.0
+
+
+register_metric(
+    "false_advisories_per_minute", requires=("false_activation_events", "total_frames"), summary=("mean",)
+)(
+    _m_false_activations_per_minute
+)
+register_metric("false_positives_per_minute", requires=("false_activation_events", "total_frames"))(
+    _m_false_activations_per_minute
+)
+
+
+def _register_iou(state: str) -> None:
+    @register_metric(f"iou_{state}", requires=("state_counts",), summary=("mean",))
+    def _m_iou(ctx: EvalContext) -> Optional[float]:
+        tp, gt_frames, pred_frames = ctx["state_counts"][state]
+        return _safe_div(tp, gt_frames + pred_frames - tp)
+
+
+for _state in REPORT_STATES:
+    _register_iou(_state)
+
+
+@register_metric("mean_iou", requires=("state_counts",), summary=("mean",))
+def _m_mean_iou(ctx: EvalContext) -> Optional[float]:
+    ious = [ctx.metric(f"iou_{state}") for state in REPORT_STATES]
+    valid = [v for v in ious if v is not None]
+    return sum(valid) / len(valid) if valid else None
+
+
+@register_intermediate("macro_classification", requires=("state_counts",))
+def _i_macro_classification(ctx: EvalContext) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    precisions: List[float] = []
+    recalls: List[float] = []
+    f1s: List[float] = []
+    for state in REPORT_STATES:
+        tp, gt_frames, pred_frames = ctx["state_counts"][state]
+        precision = _safe_div(tp, pred_frames)
+        recall = _safe_div(tp, gt_frames)
+        if precision is not None:
+            precisions.append(precision)
+        if recall is not None:
+            recalls.append(recall)
+        if precision is not None and recall is not None and (precision + recall) > 0:
+            f1s.append(2 * precision * recall / (precision + recall))
+    return (
+        sum(precisions) / len(precisions) if precisions else None,
+        sum(recalls) / len(recalls) if recalls else None,
+        sum(f1s) / len(f1s) if f1s else None,
     )
 
-    return StateMetrics(
-        frame_accuracy=frame_accuracy,
-        transition_recall=transition_recall,
-        transition_precision=transition_precision,
-        transition_accuracy=transition_accuracy,
-        event_recall=event_recall,
-        event_precision=event_precision,
-        advisory_event_recall=advisory_event_recall,
-        advisory_event_precision=advisory_event_precision,
-        time_in_error_frames=time_in_error_frames,
-        time_in_error_sec=time_in_error_sec,
-        entry_timing_mae_frames=entry_timing_mae,
-        entry_timing_mae_sec=entry_timing_mae_sec,
-        false_activation_rate=false_activation_rate,
-        mean_activation_persistence_frames=mean_persistence,
-        mean_activation_persistence_sec=mean_persistence_sec,
-        false_activations_per_minute=false_activations_per_minute,
-        false_positives_per_minute=false_activations_per_minute,
-        iou_outside=iou_by_state["outside"],
-        iou_approaching=iou_by_state["approaching"],
-        iou_inside=iou_by_state["inside"],
-        iou_exiting=iou_by_state["exiting"],
-        mean_iou=mean_iou,
-        macro_precision=macro_precision,
-        macro_recall=macro_recall,
-        macro_f1=macro_f1,
-        advisory_timing_mae_frames=advisory_timing_mae_frames,
-        advisory_timing_mae_sec=advisory_timing_mae_sec,
-        advisory_start_error_frames=advisory_start_error_frames,
-        advisory_start_error_sec=advisory_start_error_sec,
-        false_advisory_rate=false_advisory_rate,
-        false_advisories_per_minute=false_advisories_per_minute,
-        simulated_speed_violation_reduction=simulated_speed_violation_reduction,
-        lead_time_sec=lead_time_sec,
-        late_advisory_rate=late_advisory_rate,
-        advisory_coverage_ratio=advisory_coverage_ratio,
+
+@register_metric("macro_precision", requires=("macro_classification",), summary=("mean",))
+def _m_macro_precision(ctx: EvalContext) -> Optional[float]:
+    return ctx["macro_classification"][0]
+
+
+@register_metric("macro_recall", requires=("macro_classification",), summary=("mean",))
+def _m_macro_recall(ctx: EvalContext) -> Optional[float]:
+    return ctx["macro_classification"][1]
+
+
+@register_metric("macro_f1", requires=("macro_classification",), summary=("mean",))
+def _m_macro_f1(ctx: EvalContext) -> Optional[float]:
+    return ctx["macro_classification"][2]
+
+
+def _cohen_kappa(label_pairs: Mapping[Tuple[str, str], int]) -> Optional[float]:
+    """Cohen's kappa from (a, b) label-pair frame counts; None when chance agreement is 1."""
+    total = sum(label_pairs.values())
+    if total == 0:
+        return None
+    a_counts: Counter = Counter()
+    b_counts: Counter = Counter()
+    observed = 0
+    for (a, b), n in label_pairs.items():
+        a_counts[a] += n
+        b_counts[b] += n
+        if a == b:
+            observed += n
+    expected = sum(a_counts[label] * b_counts[label] for label in a_counts) / (total * total)
+    if expected >= 1.0:
+        return None
+    return (observed / total - expected) / (1.0 - expected)
+
+
+@register_metric("cohen_kappa", requires=("label_pairs",), summary=("mean", "n"))
+def _m_cohen_kappa(ctx: EvalContext) -> Optional[float]:
+    return _cohen_kappa(ctx["label_pairs"])
+
+
+@register_metric("confusion_matrix", requires=("label_pairs",))
+def _m_confusion_matrix(ctx: EvalContext) -> List[List[int]]:
+    return _confusion_rows(ctx)
+
+
+@register_metric("advisory_start_error_frames", requires=("advisory_starts",), summary=("mean", "std"))
+def _m_advisory_start_error_frames(ctx: EvalContext) -> Optional[int]:
+    gt_start, pred_start = ctx["advisory_starts"]
+    if gt_start is None or pred_start is None:
+        return None
+    return pred_start - gt_start
+
+
+@register_metric("advisory_start_error_sec", requires=("advisory_starts",), summary=("mean", "std"))
+def _m_advisory_start_error_sec(ctx: EvalContext) -> Optional[float]:
+    return _per_sec(ctx, _m_advisory_start_error_frames(ctx))
+
+
+@register_metric("advisory_timing_mae_frames", requires=("advisory_starts",), summary=("mean",))
+def _m_advisory_timing_mae_frames(ctx: EvalContext) -> Optional[int]:
+    error = _m_advisory_start_error_frames(ctx)
+    return abs(error) if error is not None else None
+
+
+@register_metric("advisory_timing_mae_sec", requires=("advisory_starts",), summary=("mean",))
+def _m_advisory_timing_mae_sec(ctx: EvalContext) -> Optional[float]:
+    return _per_sec(ctx, _m_advisory_timing_mae_frames(ctx))
+
+
+@register_metric("advisory_coverage_ratio", requires=("advisory_frames",), summary=("mean",))
+def _m_advisory_coverage_ratio(ctx: EvalContext) -> Optional[float]:
+    frames = ctx["advisory_frames"]
+    return _safe_div(frames["matched_advisory"], frames["gt_advisory"])
+
+
+@register_metric("simulated_speed_violation_reduction", requires=("advisory_frames",), summary=("mean",))
+def _m_simulated_speed_violation_reduction(ctx: EvalContext) -> Optional[float]:
+    coverage = _m_advisory_coverage_ratio(ctx)
+    if coverage is None:
+        return None
+    gain = min(max(ctx.params["simulated_compliance_gain"], 0.0), 1.0)
+    return coverage * gain
+
+
+@register_metric("late_advisory_rate", requires=("advisory_frames", "advisory_starts"), summary=("mean",))
+def _m_late_advisory_rate(ctx: EvalContext) -> Optional[float]:
+    gt_advisory_frames = ctx["advisory_frames"]["gt_advisory"]
+    gt_start, pred_start = ctx["advisory_starts"]
+    if gt_advisory_frames <= 0 or gt_start is None or pred_start is None:
+        return None
+    return min(1.0, max(0, pred_start - gt_start) / gt_advisory_frames)
+
+
+@register_metric("lead_time_sec", requires=("first_frames", "advisory_starts"), summary=("mean", "std"))
+def _m_lead_time_sec(ctx: EvalContext) -> Optional[float]:
+    gt_entry, _ = _entry_frames(ctx)
+    _, pred_start = ctx["advisory_starts"]
+    if not _fps_ok(ctx) or gt_entry is None or pred_start is None:
+        return None
+    return (gt_entry - pred_start) / ctx.fps
+
+
+def _matched_pred_start(
+    gt_intervals: List[Tuple[int, int]], pred_intervals: List[Tuple[int, int]], min_overlap_frames: int
+) -> Optional[int]:
+    for g in gt_intervals:
+        for p in pred_intervals:
+            if _overlap_len(g, p) >= min_overlap_frames:
+                return p[0]
+    return None
+
+
+def _register_start_stats(state: str) -> None:
+    """Report-only diagnostics on the first `state` frame, raw and overlap-matched."""
+
+    @register_intermediate(f"matched_start_{state}")
+    def _i_matched_start(ctx: EvalContext) -> Optional[int]:
+        return _matched_pred_start(
+            ctx.gt_states.get(state, []),
+            ctx.pred_states.get(state, []),
+            ctx.params["min_event_overlap_frames"],
+        )
+
+    @register_metric(f"gt_{state}_start_frame", requires=("first_frames",), summary=("mean", "std"))
+    def _m_gt_start(ctx: EvalContext) -> Optional[int]:
+        return ctx["first_frames"].get(state, (None, None))[0]
+
+    @register_metric(f"pred_{state}_start_frame", requires=("first_frames",), summary=("mean", "std"))
+    def _m_pred_start(ctx: EvalContext) -> Optional[int]:
+        return ctx["first_frames"].get(state, (None, None))[1]
+
+    @register_metric(f"pred_minus_gt_{state}_start_frame", requires=("first_frames",), summary=("mean", "std"))
+    def _m_start_error(ctx: EvalContext) -> Any:
+        gt_start, pred_start = ctx["first_frames"].get(state, (None, None))
+        if gt_start is None or pred_start is None:
+            return SKIP
+        return pred_start - gt_start
+
+    @register_metric(
+        f"pred_{state}_start_matched_frame", requires=(f"matched_start_{state}",), summary=("mean", "std")
     )
+    def _m_matched_start(ctx: EvalContext) -> Optional[int]:
+        return ctx[f"matched_start_{state}"]
+
+    @register_metric(
+        f"pred_minus_gt_{state}_start_matched_frame",
+        requires=("first_frames", f"matched_start_{state}"),
+        summary=("mean", "std"),
+    )
+    def _m_matched_start_error(ctx: EvalContext) -> Any:
+        gt_start = ctx["first_frames"].get(state, (None, None))[0]
+        matched = ctx[f"matched_start_{state}"]
+        if gt_start is None or matched is None:
+            return SKIP
+        return matched - gt_start
+
+
+for _state in ("inside", "approaching"):
+    _register_start_stats(_state)
+
+
+@register_metric("fps_estimate", summary=("mean",))
+def _m_fps_estimate(ctx: EvalContext) -> Any:
+    return ctx.fps if ctx.fps is not None else SKIP
 
 
 def _overlap_len(a: Tuple[int, int], b: Tuple[int, int]) -> int:
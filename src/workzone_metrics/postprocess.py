@@ -0,0 +1,256 @@
+import argparse
+import itertools
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .data_models import STATE_CODES, VideoGroundTruth, VideoPredictions
+from .io import load_ground_truth, load_predictions
+from .metrics.state import _labels_from_intervals, _match_transitions, _max_frame
+from .report import write_report
+from .utils import _mean
+
+ENTRY_CODE = STATE_CODES.index("inside")
+
+
+@dataclass(frozen=True)
+class FilterConfig:
+    majority_window: int = 1
+    min_duration_frames: int = 1
+    hysteresis_frames: int = 1
+
+
+def labels_to_codes(labels: Sequence[str]) -> np.ndarray:
+    """Map state labels to `STATE_CODES` indices; unknown states get later codes."""
+    codes = {state: i for i, state in enumerate(STATE_CODES)}
+    return np.fromiter(
+        (codes.setdefault(label, len(codes)) for label in labels), dtype=np.int16, count=len(labels)
+    )
+
+
+def _runs(codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    if len(codes) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), codes[:0]
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(codes)) + 1))
+    lengths = np.diff(np.concatenate((starts, [len(codes)])))
+    return starts, lengths, codes[starts]
+
+
+def majority_filter(codes: np.ndarray, window: int) -> np.ndarray:
+    """Centered majority vote (mode) over state labels.
+
+    States are nominal, so no order between codes is assumed. On a tie the
+    frame keeps its own state when it is among the most frequent, otherwise
+    the lowest tied code wins.
+    """
+    if window <= 1 or len(codes) == 0:
+        return codes
+    half = window // 2
+    padded = np.pad(codes, (half, window - 1 - half), mode="edge")
+    values = np.unique(codes)
+    # Per-state window counts from cumulative one-hot sums: (states, frames).
+    cumulative = np.cumsum(padded[None, :] == values[:, None], axis=1)
+    cumulative = np.concatenate((np.zeros((len(values), 1), dtype=cumulative.dtype), cumulative), axis=1)
+    counts = cumulative[:, window:] - cumulative[:, :-window]
+    own = counts[np.searchsorted(values, codes), np.arange(len(codes))]
+    return np.where(own == counts.max(axis=0), codes, values[counts.argmax(axis=0)]).astype(codes.dtype)
+
+
+def min_duration_filter(codes: np.ndarray, min_frames: int) -> np.ndarray:
+    """Absorb runs shorter than `min_frames` into the preceding kept run."""
+    if min_frames <= 1 or len(codes) == 0:
+        return codes
+    _, lengths, values = _runs(codes)
+    keep = lengths >= min_frames
+    if not keep.any():
+        return codes
+    source = np.maximum.accumulate(np.where(keep, np.arange(len(keep)), -1))
+    # Leading short runs take the first kept run's state.
+    source[source < 0] = np.argmax(keep)
+    return np.repeat(values[source], lengths)
+
+
+def hysteresis_stack(codes: np.ndarray, hold_frames: Sequence[int]) -> np.ndarray:
+    """`hysteresis_filter` for several hold lengths at once: one row per hold."""
+    holds = np.maximum(np.asarray(hold_frames, dtype=np.int64), 1)
+    if len(codes) == 0:
+        return np.zeros((len(holds), 0), dtype=codes.dtype)
+    starts, lengths, values = _runs(codes)
+    qualifying = lengths[None, :] >= holds[:, None]
+    qualifying[:, 0] = True
+    switch_at = starts[None, :] + holds[:, None] - 1
+    switch_at[:, 0] = 0
+    marker = np.full((len(holds), len(codes)), -1)
+    rows, runs = np.nonzero(qualifying)
+    marker[rows, switch_at[rows, runs]] = runs
+    return values[np.maximum.accumulate(marker, axis=1)]
+
+
+def hysteresis_filter(codes: np.ndarray, hold_frames: int) -> np.ndarray:
+    """Only switch state once the new state has persisted for `hold_frames`."""
+    if hold_frames <= 1 or len(codes) == 0:
+        return codes
+    return hysteresis_stack(codes, [hold_frames])[0]
+
+
+def apply_filters(codes: np.ndarray, config: FilterConfig) -> np.ndarray:
+    out = majority_filter(codes, config.majority_window)
+    out = min_duration_filter(out, config.min_duration_frames)
+    return hysteresis_filter(out, config.hysteresis_frames)
+
+
+def _transitions_from_codes(codes: np.ndarray) -> List[Tuple[int, int, int]]:
+    frames = np.flatnonzero(np.diff(codes)) + 1
+    return list(zip(codes[frames - 1].tolist(), codes[frames].tolist(), frames.tolist()))
+
+
+def _first_frame(codes: np.ndarray, code: int) -> Optional[int]:
+    hits = np.flatnonzero(codes == code)
+    return int(hits[0]) if len(hits) else None
+
+
+def grid_search(
+    gt: Mapping[str, VideoGroundTruth],
+    preds: Mapping[str, VideoPredictions],
+    majority_windows: Sequence[int] = (1,),
+    min_durations: Sequence[int] = (1,),
+    hysteresis_frames: Sequence[int] = (1,),
+    transition_tolerance_frames: int = 0,
+) -> Dict[str, Any]:
+    """Evaluate every filter combination against GT and return results plus Pareto front.
+
+    Filter stages are cached along the grid (majority, then min-duration),
+    so each intermediate sequence is computed once per video. All hysteresis
+    lengths of one (majority, min-duration) pair run as one `(holds, frames)`
+    stack, which also yields frame accuracy and entry frames; transition
+    matching still loops over configurations in Python.
+    """
+    configs = [
+        FilterConfig(m, d, h)
+        for m, d, h in itertools.product(majority_windows, min_durations, hysteresis_frames)
+    ]
+    stages: Dict[Tuple[int, int], List[FilterConfig]] = {}
+    for config in configs:
+        stages.setdefault((config.majority_window, config.min_duration_frames), []).append(config)
+    metrics = ("transition_precision", "transition_recall", "entry_timing_mae_frames", "frame_accuracy")
+    per_config: Dict[FilterConfig, Dict[str, List[Optional[float]]]] = {
+        config: {metric: [] for metric in metrics} for config in configs
+    }
+    videos = 0
+    for video, gt_entry in gt.items():
+        pred_entry = preds.get(video)
+        if not gt_entry.states or all(len(v) == 0 for v in gt_entry.states.values()):
+            continue
+        if pred_entry is None or pred_entry.states is None:
+            continue
+        videos += 1
+        total_frames = max(_max_frame(gt_entry.states), _max_frame(pred_entry.states)) + 1
+        gt_codes = labels_to_codes(_labels_from_intervals(gt_entry.states, total_frames))
+        pred_codes = labels_to_codes(_labels_from_intervals(pred_entry.states, total_frames))
+        gt_trans = _transitions_from_codes(gt_codes)
+        gt_entry_frame = _first_frame(gt_codes, ENTRY_CODE)
+
+        majorities: Dict[int, np.ndarray] = {}
+        for (m, d), stage_configs in stages.items():
+            if m not in majorities:
+                majorities[m] = majority_filter(pred_codes, m)
+            stack = hysteresis_stack(
+                min_duration_filter(majorities[m], d), [config.hysteresis_frames for config in stage_configs]
+            )
+            accuracy = (stack == gt_codes[None, :]).mean(axis=1)
+            entered = stack == ENTRY_CODE
+            entry_frames = np.where(entered.any(axis=1), entered.argmax(axis=1), -1)
+
+            for config, filtered, frame_accuracy, pred_entry_frame in zip(
+                stage_configs, stack, accuracy.tolist(), entry_frames.tolist()
+            ):
+                pred_trans = _transitions_from_codes(filtered)
+                matched, gt_count, pred_count = _match_transitions(
+                    gt_trans, pred_trans, transition_tolerance_frames
+                )
+                bucket = per_config[config]
+                bucket["transition_precision"].append(matched / pred_count if pred_count else None)
+                bucket["transition_recall"].append(matched / gt_count if gt_count else None)
+                bucket["entry_timing_mae_frames"].append(
+                    abs(pred_entry_frame - gt_entry_frame)
+                    if pred_entry_frame >= 0 and gt_entry_frame is not None
+                    else None
+                )
+                bucket["frame_accuracy"].append(frame_accuracy)
+
+    results = []
+    for config in configs:
+        row: Dict[str, Any] = asdict(config)
+        for metric, values in per_config[config].items():
+            row[f"{metric}_mean"] = _mean(values)
+        results.append(row)
+    return {
+        "videos_evaluated": videos,
+        "transition_tolerance_frames": transition_tolerance_frames,
+        "results": results,
+        "pareto_front": pareto_front(results),
+    }
+
+
+def pareto_front(
+    results: Sequence[Mapping[str, Any]],
+    maximize: str = "transition_precision_mean",
+    minimize: str = "entry_timing_mae_frames_mean",
+) -> List[Mapping[str, Any]]:
+    """Non-dominated rows: higher `maximize` and lower `minimize` are better."""
+    rows = [r for r in results if r.get(maximize) is not None and r.get(minimize) is not None]
+    rows.sort(key=lambda r: (r[minimize], -r[maximize]))
+    front: List[Mapping[str, Any]] = []
+    best = None
+    for row in rows:
+        if best is None or row[maximize] > best:
+            front.append(row)
+            best = row[maximize]
+    return front
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(x.strip()) for x in value.split(",") if x.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Grid-search smoothing/hysteresis filters over predicted state sequences."
+    )
+    parser.add_argument("--gt", required=True, help="Path to ground-truth JSON.")
+    parser.add_argument("--pred", required=True, help="Path to predictions JSON/CSV/dir.")
+    parser.add_argument(
+        "--majority", default="1", help="Comma-separated majority-vote windows in frames (1 = off)."
+    )
+    parser.add_argument(
+        "--min-duration", default="1", help="Comma-separated minimum run lengths in frames (1 = off)."
+    )
+    parser.add_argument(
+        "--hysteresis", default="1", help="Comma-separated hold lengths in frames (1 = off)."
+    )
+    parser.add_argument(
+        "--transition-tolerance-frames",
+        type=int,
+        default=0,
+        help="Allowed frame tolerance when matching state transitions.",
+    )
+    parser.add_argument("--out", help="Optional path to write the results JSON.")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    results = grid_search(
+        load_ground_truth(args.gt),
+        load_predictions(args.pred),
+        majority_windows=_int_list(args.majority),
+        min_durations=_int_list(args.min_duration),
+        hysteresis_frames=_int_list(args.hysteresis),
+        transition_tolerance_frames=args.transition_tolerance_frames,
+    )
+    write_report(results, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+import argparse
+import itertools
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .aggregate import SummaryAccumulator
+from .data_models import STATE_CODES, StateIntervals, VideoGroundTruth, VideoPredictions
+from .detection_store import DetectionSummary
+from .io import load_ground_truth, load_predictions
+from .metrics.state import _expand_labels, compute_state_metrics
+from .postprocess import _runs, pareto_front
+from .report import write_report
+
+OUTSIDE, APPROACHING, INSIDE, EXITING = range(4)
+
+REPLAY_METRICS = (
+    "frame_accuracy",
+    "transition_precision",
+    "transition_recall",
+    "entry_timing_mae_frames",
+    "event_recall",
+    "event_precision",
+    "false_activations_per_minute",
+    "mean_iou",
+    "macro_f1",
+)
+
+
+@dataclass(frozen=True)
+class ReplayConfig:
+    """Thresholds of the replayed state machine on EMA-smoothed evidence.
+
+    outside -> approaching at `approach_on`; approaching -> inside at
+    `inside_on`; inside -> exiting below `inside_off`; exiting -> inside at
+    `inside_on`; approaching/exiting -> outside below `approach_off`.
+    """
+
+    ema_alpha: float = 0.3
+    approach_on: float = 1.0
+    inside_on: float = 3.0
+    inside_off: float = 2.0
+    approach_off: float = 0.5
+
+    def valid(self) -> bool:
+        return (
+            0 < self.ema_alpha <= 1
+            and self.approach_off <= self.approach_on <= self.inside_on
+            and self.inside_off <= self.inside_on
+        )
+
+
+def replay_states(evidence: np.ndarray, configs: Sequence[ReplayConfig]) -> np.ndarray:
+    """Run the state machine for every config at once; returns (configs, frames) codes.
+
+    The loop is over frames only; each step updates all configs as vectors.
+    """
+    k = len(configs)
+    codes = np.empty((k, len(evidence)), dtype=np.int8)
+    if len(evidence) == 0:
+        return codes
+    alpha = np.array([c.ema_alpha for c in configs])
+    approach_on = np.array([c.approach_on for c in configs])
+    inside_on = np.array([c.inside_on for c in configs])
+    inside_off = np.array([c.inside_off for c in configs])
+    approach_off = np.array([c.approach_off for c in configs])
+    state = np.full(k, OUTSIDE, dtype=np.int8)
+    ema = np.full(k, float(evidence[0]))
+    for t, value in enumerate(evidence.tolist()):
+        ema = alpha * value + (1 - alpha) * ema
+        rising = ema >= inside_on
+        falling = ema < approach_off
+        new = state.copy()
+        new[(state == OUTSIDE) & (ema >= approach_on)] = APPROACHING
+        new[((state == APPROACHING) | (state == EXITING)) & rising] = INSIDE
+        new[((state == APPROACHING) | (state == EXITING)) & falling & ~rising] = OUTSIDE
+        new[(state == INSIDE) & (ema < inside_off)] = EXITING
+        state = new
+        codes[:, t] = state
+    return codes
+
+
+def codes_to_intervals(codes: np.ndarray) -> StateIntervals:
+    """State intervals of a code sequence; empty for no frames (scored as all `outside`)."""
+    states: StateIntervals = {}
+    if len(codes) == 0:
+        return states
+    starts, lengths, values = _runs(codes)
+    for start, length, value in zip(starts.tolist(), lengths.tolist(), values.tolist()):
+        states.setdefault(STATE_CODES[value], []).append((start, start + length - 1))
+    return states
+
+
+def replay_sweep(
+    gt: Mapping[str, VideoGroundTruth],
+    preds: Mapping[str, VideoPredictions],
+    configs: Sequence[ReplayConfig],
+    class_weights: Optional[Mapping[str, float]] = None,
+    evidence_mode: str = "count",
+    transition_tolerance_frames: int = 0,
+    score_threshold: float = 0.0,
+) -> Dict[str, Any]:
+    """Replay every config over each video's detection summaries and score it against GT.
+
+    `detections` may be an inline summary dict, a `DetectionSummary`, or a
+    detection-store handle (summarized over detections >= `score_threshold`).
+    """
+    configs = [config for config in configs if config.valid()]
+    accumulators = [SummaryAccumulator() for _ in configs]
+    videos = 0
+    for video, gt_entry in gt.items():
+        pred_entry = preds.get(video)
+        if not gt_entry.states or all(len(v) == 0 for v in gt_entry.states.values()):
+            continue
+        if pred_entry is None or pred_entry.detections is None:
+            continue
+        # An empty summary still counts: the video is replayed as all `outside` over the GT length.
+        summary = pred_entry.detections
+        if isinstance(summary, Mapping):
+            summary = DetectionSummary.from_dict(summary)
+        elif not isinstance(summary, DetectionSummary):
+            summary = summary.summary(score_threshold)
+        videos += 1
+        gt_labels = _expand_labels(gt_entry.states)
+        codes = replay_states(summary.evidence(class_weights, evidence_mode), configs)
+        for acc, row in zip(accumulators, codes):
+            metrics = compute_state_metrics(
+                gt_entry.states,
+                codes_to_intervals(row),
+                fps=pred_entry.fps,
+                transition_tolerance_frames=transition_tolerance_frames,
+                gt_labels=gt_labels,
+            )
+            acc.add(asdict(metrics))
+
+    results = []
+    for config, acc in zip(configs, accumulators):
+        summary = acc.summary()
+        row: Dict[str, Any] = asdict(config)
+        for metric in REPLAY_METRICS:
+            row[f"{metric}_mean"] = summary[f"{metric}_mean"]
+        results.append(row)
+    return {
+        "videos_evaluated": videos,
+        "evidence": evidence_mode,
+        "score_threshold": score_threshold,
+        "class_weights": dict(class_weights) if class_weights else None,
+        "transition_tolerance_frames": transition_tolerance_frames,
+        "results": results,
+        "pareto_front": pareto_front(results),
+    }
+
+
+def _float_list(value: str) -> List[float]:
+    return [float(x.strip()) for x in value.split(",") if x.strip()]
+
+
+def _class_weights(values: Optional[List[str]]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    weights: Dict[str, float] = {}
+    for value in values:
+        name, _, weight = value.partition("=")
+        weights[name] = float(weight)
+    return weights
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Replay the work-zone state machine over per-frame detection summaries for a threshold grid."
+    )
+    parser.add_argument("--gt", required=True, help="Path to ground-truth JSON.")
+    parser.add_argument(
+        "--pred",
+        required=True,
+        help="Predictions JSON whose entries carry per-frame `detections` summaries, or a detection store.",
+    )
+    parser.add_argument("--detections", help="Sidecar detection store to attach to --pred.")
+    parser.add_argument(
+        "--score-threshold",
+        type=float,
+        default=0.0,
+        help="Ignore stored detections scoring below this when summarizing a detection store.",
+    )
+    parser.add_argument("--ema-alpha", default="0.3", help="Comma-separated EMA smoothing factors.")
+    parser.add_argument("--approach-on", default="1.0", help="Comma-separated outside->approaching thresholds.")
+    parser.add_argument("--inside-on", default="3.0", help="Comma-separated ->inside thresholds.")
+    parser.add_argument("--inside-off", default="2.0", help="Comma-separated inside->exiting thresholds.")
+    parser.add_argument("--approach-off", default="0.5", help="Comma-separated ->outside thresholds.")
+    parser.add_argument(
+        "--evidence",
+        choices=("count", "score"),
+        default="count",
+        help="Per-frame evidence: weighted class counts or weighted max scores.",
+    )
+    parser.add_argument(
+        "--class-weight",
+        action="append",
+        help="Evidence weight per class as name=weight (repeatable; default: 1 for every class).",
+    )
+    parser.add_argument(
+        "--transition-tolerance-frames",
+        type=int,
+        default=0,
+        help="Allowed frame tolerance when matching state transitions.",
+    )
+    parser.add_argument("--out", help="Optional path to write the results JSON.")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    configs = [
+        ReplayConfig(*values)
+        for values in itertools.product(
+            _float_list(args.ema_alpha),
+            _float_list(args.approach_on),
+            _float_list(args.inside_on),
+            _float_list(args.inside_off),
+            _float_list(args.approach_off),
+        )
+    ]
+    results = replay_sweep(
+        load_ground_truth(args.gt),
+        load_predictions(args.pred, detections=args.detections),
+        configs,
+        class_weights=_class_weights(args.class_weight),
+        evidence_mode=args.evidence,
+        transition_tolerance_frames=args.transition_tolerance_frames,
+        score_threshold=args.score_threshold,
+    )
+    write_report(results, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+import math
+import random
+import statistics
+from dataclasses import replace
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .aggregate import SummaryAccumulator
+from .data_models import StateIntervals, VideoGroundTruth, VideoPredictions
+from .grouping import GroupedAccumulator, _city, parse_group_by_specs
+from .io import load_ground_truth, load_predictions
+from .metrics.registry import summary_fields
+from .report import _evaluate_video, _report_from_accumulators
+
+Bounds = Tuple[Optional[float], Optional[float]]
+
+_UNIT = (0.0, 1.0)
+_NON_NEGATIVE = (0.0, None)
+# Value ranges of the summary metrics; unlisted metrics are unbounded.
+METRIC_BOUNDS: Dict[str, Bounds] = {
+    **{
+        name: _UNIT
+        for name in (
+            "frame_accuracy",
+            "transition_recall",
+            "transition_precision",
+            "transition_accuracy",
+            "event_recall",
+            "event_precision",
+            "advisory_event_recall",
+            "advisory_event_precision",
+            "false_activation_rate",
+            "false_advisory_rate",
+            "simulated_speed_violation_reduction",
+            "late_advisory_rate",
+            "advisory_coverage_ratio",
+            "iou_outside",
+            "iou_approaching",
+            "iou_inside",
+            "iou_exiting",
+            "mean_iou",
+            "macro_precision",
+            "macro_recall",
+            "macro_f1",
+        )
+    },
+    **{
+        name: _NON_NEGATIVE
+        for name in (
+            "time_in_error_frames",
+            "time_in_error_sec",
+            "entry_timing_mae_frames",
+            "entry_timing_mae_sec",
+            "advisory_timing_mae_frames",
+            "advisory_timing_mae_sec",
+            "mean_activation_persistence_frames",
+            "mean_activation_persistence_sec",
+            "false_activations_per_minute",
+            "false_advisories_per_minute",
+            "fps_estimate",
+            "latency_p50_sec",
+            "latency_p95_sec",
+            "latency_p99_sec",
+            "max_gap_sec",
+            "real_time_factor",
+            "stall_count",
+            "gt_inside_start_frame",
+            "pred_inside_start_frame",
+            "pred_inside_start_matched_frame",
+            "gt_approaching_start_frame",
+            "pred_approaching_start_frame",
+            "pred_approaching_start_matched_frame",
+        )
+    },
+    "cohen_kappa": (-1.0, 1.0),
+}
+
+
+def stratified_sample(
+    videos: Iterable[str],
+    fraction: float,
+    seed: int = 0,
+    key: Callable[[str], str] = _city,
+) -> Tuple[List[str], Dict[str, Tuple[int, int]]]:
+    """Sample `fraction` of each stratum (at least one video per stratum).
+
+    Returns the sorted sample and `{stratum: (sampled, population)}`.
+    """
+    if not 0 < fraction <= 1:
+        raise ValueError(f"Sample fraction must be in (0, 1], got {fraction}")
+    strata: Dict[str, List[str]] = {}
+    for video in sorted(videos):
+        strata.setdefault(key(video), []).append(video)
+    rng = random.Random(seed)
+    sample: List[str] = []
+    sizes: Dict[str, Tuple[int, int]] = {}
+    for stratum in sorted(strata):
+        members = strata[stratum]
+        n = min(len(members), max(1, math.ceil(fraction * len(members))))
+        sample.extend(rng.sample(members, n))
+        sizes[stratum] = (n, len(members))
+    return sorted(sample), sizes
+
+
+def _stride_states(states: StateIntervals, stride: int) -> StateIntervals:
+    # Keep frames i * stride: [start, end] -> [ceil(start / k), floor(end / k)].
+    out: StateIntervals = {}
+    for state, intervals in states.items():
+        strided = [(-(-start // stride), end // stride) for start, end in intervals]
+        out[state] = [(start, end) for start, end in strided if start <= end]
+    return out
+
+
+def _rescale_frames(payload: Dict[str, Any], stride: int) -> None:
+    # Frame-count and frame-index fields are reported in original frames.
+    for name, value in payload.items():
+        if (name.endswith("_frames") or name.endswith("_frame")) and isinstance(value, (int, float)):
+            payload[name] = value * stride
+
+
+def _wilson(p: float, n: float, z: float) -> Tuple[float, float]:
+    denom = 1.0 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half_width = z / denom * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n))
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+def stratified_estimate(
+    values_by_stratum: Mapping[str, Sequence[float]],
+    population: Mapping[str, int],
+    confidence: float = 0.95,
+    bounds: Optional[Bounds] = None,
+) -> Optional[Dict[str, Any]]:
+    """Stratified mean with a confidence interval.
+
+    Strata are weighted by population size (renormalized over strata with
+    values) and use the finite population correction. Strata with a single
+    value borrow the pooled sample variance.
+
+    For metrics bounded on both sides (`bounds`), the interval is a Wilson
+    score interval on the rescaled stratified proportion with the effective
+    sample size p(1 - p) / variance (the sample count when the sampled values
+    are all equal), so it stays non-degenerate for zero-inflated rates. Other
+    metrics use a normal-approximation interval clipped to `bounds`.
+    """
+    strata = {name: list(values) for name, values in values_by_stratum.items() if values}
+    if not strata:
+        return None
+    all_values = [v for values in strata.values() for v in values]
+    pooled_var = statistics.variance(all_values) if len(all_values) > 1 else 0.0
+    total = sum(population[name] for name in strata)
+    estimate = 0.0
+    variance = 0.0
+    for name, values in strata.items():
+        weight = population[name] / total
+        n = len(values)
+        estimate += weight * statistics.fmean(values)
+        s2 = statistics.variance(values) if n > 1 else pooled_var
+        fpc = max(0.0, 1.0 - n / population[name])
+        variance += weight * weight * fpc * s2 / n
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    low, high = bounds if bounds is not None else (None, None)
+    if low is not None and high is not None:
+        span = high - low
+        p = min(1.0, max(0.0, (estimate - low) / span))
+        scaled_variance = variance / (span * span)
+        n_eff = p * (1 - p) / scaled_variance if scaled_variance > 0 and 0 < p < 1 else len(all_values)
+        ci_low, ci_high = (low + span * bound for bound in _wilson(p, n_eff, z))
+    else:
+        half_width = z * math.sqrt(variance)
+        ci_low, ci_high = estimate - half_width, estimate + half_width
+        if low is not None:
+            ci_low, ci_high = max(low, ci_low), max(low, ci_high)
+        if high is not None:
+            ci_low, ci_high = min(high, ci_low), min(high, ci_high)
+    return {
+        "estimate": estimate,
+        "ci_low": ci_low,
+        "ci_high": ci_high,
+        "n": len(all_values),
+    }
+
+
+def generate_sampled_report(
+    gt_path: str,
+    pred_path: str,
+    fraction: float,
+    seed: int = 0,
+    frame_stride: int = 1,
+    confidence: float = 0.95,
+    transition_tolerance_frames: int = 0,
+    min_event_overlap_frames: int = 1,
+    source_fps: float = 30.0,
+    stall_threshold_sec: float = 0.5,
+    metrics: Optional[Sequence[str]] = None,
+    group_by: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """Evaluate a city-stratified sample of videos and estimate the full summary.
+
+    Only the sampled videos' predictions are parsed. With `frame_stride` > 1,
+    every k-th frame is evaluated (FPS and transition tolerance scale down;
+    `*_frames` fields are scaled back to original frames). `group_by` adds
+    `groups` over the sampled videos (no estimates).
+    """
+    if frame_stride < 1:
+        raise ValueError("frame_stride must be >= 1")
+    grouped = GroupedAccumulator(parse_group_by_specs(group_by)) if group_by else None
+    gt = load_ground_truth(gt_path)
+    sample, strata = stratified_sample(gt.keys(), fraction, seed)
+    preds = load_predictions(pred_path, videos=set(sample))
+
+    videos: Dict[str, Any] = {}
+    summary = SummaryAccumulator()
+    for video in sample:
+        gt_entry = gt[video]
+        pred_entry = preds.get(video)
+        if frame_stride > 1:
+            gt_entry = replace(gt_entry, states=_stride_states(gt_entry.states, frame_stride))
+            if pred_entry is not None and pred_entry.states is not None:
+                pred_entry = replace(
+                    pred_entry,
+                    states=_stride_states(pred_entry.states, frame_stride),
+                    fps=pred_entry.fps / frame_stride if pred_entry.fps else pred_entry.fps,
+                )
+        payload = _evaluate_video(
+            gt_entry,
+            pred_entry,
+            transition_tolerance_frames=-(-transition_tolerance_frames // frame_stride),
+            min_event_overlap_frames=max(1, min_event_overlap_frames // frame_stride),
+            source_fps=source_fps,
+            stall_threshold_sec=stall_threshold_sec,
+            metrics=metrics,
+        )
+        if frame_stride > 1:
+            _rescale_frames(payload, frame_stride)
+        videos[video] = payload
+        summary.add(payload)
+        if grouped is not None:
+            grouped.add(video, payload)
+
+    population = {name: size for name, (_, size) in strata.items()}
+    estimates: Dict[str, Any] = {}
+    for name, stats in summary_fields().items():
+        if "mean" not in stats:
+            continue
+        by_stratum: Dict[str, List[float]] = {}
+        for video, payload in videos.items():
+            value = payload.get(name)
+            if value is not None and "error" not in payload:
+                by_stratum.setdefault(_city(video), []).append(value)
+        estimates[name] = stratified_estimate(by_stratum, population, confidence, METRIC_BOUNDS.get(name))
+
+    report = _report_from_accumulators(videos, summary, grouped)
+    report["sample"] = {
+        "fraction": fraction,
+        "seed": seed,
+        "frame_stride": frame_stride,
+        "confidence": confidence,
+        "videos_sampled": len(sample),
+        "videos_total": len(gt),
+        "strata": {name: {"sampled": n, "total": size} for name, (n, size) in strata.items()},
+        "estimates": estimates,
+    }
+    return report
@@ -0,0 +1,140 @@
+import json
+import math
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .data_models import VideoGroundTruth, VideoPredictions
+from .metrics.state import _expand_labels
+
+# (threshold, d_true_positive, d_false_positive, d_false_activation_episode)
+SweepEvent = Tuple[float, int, int, int]
+
+
+def _sweep_events(
+    gt_labels: Sequence[str], scores: Sequence[float], outside_state: str = "outside"
+) -> Tuple[List[SweepEvent], int, int, int]:
+    """Threshold events for "advisory active when score >= threshold".
+
+    Each scored frame switches on at its own score. A GT-outside frame adds
+    a false activation episode there; two adjacent GT-outside frames merge
+    into one episode once both are on, i.e. at the lower of their scores.
+    Returns events, GT advisory frames, GT outside frames and total frames.
+    """
+    total = max(len(gt_labels), len(scores))
+    events: List[SweepEvent] = []
+    positives = 0
+    previous: Optional[float] = None
+    for t in range(total):
+        active = t < len(gt_labels) and gt_labels[t] != outside_state
+        positives += active
+        score = scores[t] if t < len(scores) else math.nan
+        if math.isnan(score):
+            previous = None
+            continue
+        if active:
+            events.append((score, 1, 0, 0))
+            previous = None
+        else:
+            events.append((score, 0, 1, 1))
+            if previous is not None:
+                events.append((min(score, previous), 0, 0, -1))
+            previous = score
+    return events, positives, total - positives, total
+
+
+def sweep_curve(
+    events: List[SweepEvent],
+    positives: int,
+    negatives: int,
+    minutes: Optional[float],
+) -> Dict[str, Any]:
+    """Curves at every distinct threshold (descending) from one sort and running sums.
+
+    `average_precision` is the step-wise area under the precision/recall
+    curve, sum((R_k - R_{k-1}) * P_k).
+    """
+    events = sorted(events, key=lambda e: -e[0])
+    curve: Dict[str, List[Optional[float]]] = {
+        "threshold": [],
+        "precision": [],
+        "recall": [],
+        "false_activation_rate": [],
+        "false_activations_per_minute": [],
+    }
+    tp = fp = episodes = 0
+    average_precision = 0.0
+    previous_recall = 0.0
+    for i, (threshold, d_tp, d_fp, d_episodes) in enumerate(events):
+        tp += d_tp
+        fp += d_fp
+        episodes += d_episodes
+        if i + 1 < len(events) and events[i + 1][0] == threshold:
+            continue
+        precision = tp / (tp + fp)
+        recall = tp / positives if positives else None
+        if recall is not None:
+            average_precision += (recall - previous_recall) * precision
+            previous_recall = recall
+        curve["threshold"].append(threshold)
+        curve["precision"].append(precision)
+        curve["recall"].append(recall)
+        curve["false_activation_rate"].append(fp / negatives if negatives else None)
+        curve["false_activations_per_minute"].append(episodes / minutes if minutes else None)
+    return {
+        "positives": positives,
+        "negatives": negatives,
+        "average_precision": average_precision if positives and events else None,
+        "curve": curve,
+    }
+
+
+def _decimate(curve: Dict[str, List[Any]], max_points: int) -> Dict[str, List[Any]]:
+    n = len(curve["threshold"])
+    if max_points < 2 or n <= max_points:
+        return curve
+    keep = sorted({round(i * (n - 1) / (max_points - 1)) for i in range(max_points)})
+    return {name: [values[i] for i in keep] for name, values in curve.items()}
+
+
+def score_sweep(
+    gt: Mapping[str, VideoGroundTruth],
+    preds: Mapping[str, VideoPredictions],
+    outside_state: str = "outside",
+    max_points: int = 101,
+) -> Dict[str, Any]:
+    """Precision/recall/false-activation curves over the activation threshold.
+
+    A frame is advisory-active when its score is >= the threshold; frames
+    without a score never activate. Per-video curves and the pooled dataset
+    curve (all videos' events in one sort) are computed exactly; the
+    reported curves keep at most `max_points` evenly spaced thresholds.
+    """
+    videos: Dict[str, Any] = {}
+    pooled: List[SweepEvent] = []
+    positives = negatives = 0
+    minutes: Optional[float] = 0.0
+    for video, gt_entry in gt.items():
+        pred_entry = preds.get(video)
+        if not gt_entry.states or all(len(v) == 0 for v in gt_entry.states.values()):
+            continue
+        if pred_entry is None or pred_entry.scores is None:
+            continue
+        events, pos, neg, total = _sweep_events(_expand_labels(gt_entry.states), pred_entry.scores, outside_state)
+        video_minutes = total / pred_entry.fps / 60.0 if pred_entry.fps else None
+        result = sweep_curve(events, pos, neg, video_minutes)
+        result["curve"] = _decimate(result["curve"], max_points)
+        videos[video] = result
+        pooled.extend(events)
+        positives += pos
+        negatives += neg
+        minutes = minutes + video_minutes if minutes is not None and video_minutes is not None else None
+    dataset = sweep_curve(pooled, positives, negatives, minutes)
+    dataset["curve"] = _decimate(dataset["curve"], max_points)
+    dataset["videos"] = len(videos)
+    ap = [v["average_precision"] for v in videos.values() if v["average_precision"] is not None]
+    dataset["mean_average_precision"] = sum(ap) / len(ap) if ap else None
+    return {"videos": videos, "dataset": dataset}
+
+
+def write_score_sweep(result: Mapping[str, Any], out_path: str) -> None:
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
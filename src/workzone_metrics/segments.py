@@ -0,0 +1,50 @@
+import json
+from typing import Any, Dict, Iterable, List, Mapping
+
+from .data_models import VideoGroundTruth, VideoPredictions
+from .metrics.state import _disagreement_runs, _label_runs, _max_frame
+
+
+def error_segments(
+    gt: Mapping[str, VideoGroundTruth],
+    preds: Mapping[str, VideoPredictions],
+) -> List[Dict[str, Any]]:
+    """One record per contiguous run where GT and predicted states disagree.
+
+    Runs come from a linear merge of the two interval run lists (no per-frame
+    expansion) and are sorted longest first. Videos skipped by the report
+    (empty GT, missing predictions) yield no records.
+    """
+    records: List[Dict[str, Any]] = []
+    for video, gt_entry in gt.items():
+        pred_entry = preds.get(video)
+        if not gt_entry.states or all(len(v) == 0 for v in gt_entry.states.values()):
+            continue
+        if pred_entry is None or pred_entry.states is None:
+            continue
+        total_frames = max(_max_frame(gt_entry.states), _max_frame(pred_entry.states)) + 1
+        runs = _disagreement_runs(
+            _label_runs(gt_entry.states, total_frames), _label_runs(pred_entry.states, total_frames)
+        )
+        for start, end, gt_state, pred_state in runs:
+            record: Dict[str, Any] = {
+                "video": video,
+                "start": start,
+                "end": end,
+                "length": end - start + 1,
+                "gt_state": gt_state,
+                "pred_state": pred_state,
+            }
+            if pred_entry.fps:
+                record["start_sec"] = start / pred_entry.fps
+                record["end_sec"] = (end + 1) / pred_entry.fps
+            records.append(record)
+    records.sort(key=lambda r: (-r["length"], r["video"], r["start"]))
+    return records
+
+
+def write_error_segments(records: Iterable[Mapping[str, Any]], out_path: str) -> None:
+    with open(out_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, sort_keys=True))
+            f.write("\n")
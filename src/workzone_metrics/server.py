@@ -0,0 +1,251 @@
+import argparse
+import hashlib
+import json
+import os
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+from .data_models import VideoGroundTruth, VideoPredictions
+from .io import load_ground_truth, load_predictions, predictions_from_dict
+from .metrics.registry import parse_metrics_arg
+from .metrics.state import _expand_labels
+from .report import _build_report
+
+try:
+    from .metrics.batched import paint_codes
+except ImportError:  # Without NumPy only labels are kept expanded.
+    paint_codes = None
+
+
+def _metric_patterns(value: Any) -> Optional[List[str]]:
+    # Accept the CLI's comma-separated form as well as a JSON list.
+    if isinstance(value, str):
+        return parse_metrics_arg(value)
+    return [str(pattern) for pattern in value]
+
+
+_EVAL_PARAMS = {
+    "transition_tolerance_frames": int,
+    "min_event_overlap_frames": int,
+    "source_fps": float,
+    "stall_threshold_sec": float,
+    "metrics": _metric_patterns,
+}
+
+
+def _fingerprint(path: str) -> str:
+    """Cheap content fingerprint: path, size and mtime of the file or its CSVs."""
+    path_obj = Path(path).resolve()
+    digest = hashlib.sha1(str(path_obj).encode("utf-8"))
+    if path_obj.is_dir():
+        members = sorted(path_obj.rglob("*.csv"))
+    else:
+        members = [path_obj]
+    for member in members:
+        stat = member.stat()
+        digest.update(f"{member}|{stat.st_size}|{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EvaluationService:
+    """Holds GT and an LRU of parsed predictions for repeated evaluations."""
+
+    def __init__(self, gt_path: str, cache_size: int = 16):
+        started = time.monotonic()
+        self.gt_path = gt_path
+        self.gt: Mapping[str, VideoGroundTruth] = load_ground_truth(gt_path)
+        self.gt_labels: Dict[str, List[str]] = {}
+        self.gt_codes: Dict[str, Any] = {}
+        self.cache_size = max(1, cache_size)
+        self._preds: "OrderedDict[str, Mapping[str, VideoPredictions]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self.stats: Dict[str, Any] = {
+            "gt_load_sec": time.monotonic() - started,
+            "requests": 0,
+            "evaluations": 0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "cache_evictions": 0,
+        }
+
+    def _expand_gt(self) -> None:
+        for video, entry in self.gt.items():
+            if video not in self.gt_labels and entry.states:
+                self.gt_labels[video] = _expand_labels(entry.states)
+                if paint_codes is not None:
+                    self.gt_codes[video] = paint_codes(entry.states)
+
+    def _predictions(self, path: str) -> Mapping[str, VideoPredictions]:
+        key = _fingerprint(path)
+        with self._lock:
+            cached = self._preds.get(key)
+            if cached is not None:
+                self._preds.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                return cached
+            self.stats["cache_misses"] += 1
+        preds = load_predictions(path)
+        with self._lock:
+            self._preds[key] = preds
+            self._preds.move_to_end(key)
+            while len(self._preds) > self.cache_size:
+                self._preds.popitem(last=False)
+                self.stats["cache_evictions"] += 1
+        return preds
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.stats["requests"] += 1
+
+    def warmup(self, pred_paths: Optional[List[str]] = None) -> Dict[str, Any]:
+        started = time.monotonic()
+        with self._lock:
+            self._expand_gt()
+        for path in pred_paths or []:
+            self._predictions(path)
+        return {"warmup_sec": time.monotonic() - started, "gt_videos_expanded": len(self.gt_labels)}
+
+    def evaluate(self, request: Mapping[str, Any]) -> Dict[str, Any]:
+        if "pred" in request:
+            if not isinstance(request["pred"], str):
+                raise ValueError("'pred' must be a predictions path.")
+            preds = self._predictions(request["pred"])
+        elif "predictions" in request:
+            preds = predictions_from_dict(request["predictions"])
+        else:
+            raise ValueError("Evaluate request needs 'pred' (path) or 'predictions' (inline intervals).")
+        params = {
+            name: cast(request[name]) for name, cast in _EVAL_PARAMS.items() if request.get(name) is not None
+        }
+        with self._lock:
+            self._expand_gt()
+            self.stats["evaluations"] += 1
+        gt_codes = self.gt_codes if paint_codes is not None else None
+        return _build_report(self.gt, preds, gt_labels=self.gt_labels, gt_codes=gt_codes, **params)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "gt_path": self.gt_path,
+                "gt_videos": len(self.gt),
+                "gt_videos_expanded": len(self.gt_labels),
+                "cache_size": len(self._preds),
+                "cache_capacity": self.cache_size,
+                "uptime_sec": time.time() - self._started,
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "wzm-eval"
+    service: EvaluationService
+
+    def address_string(self) -> str:
+        # Unix-socket peers have no (host, port) address.
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if not getattr(self.server, "quiet", False):
+            super().log_message(format, *args)
+
+    def _send(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload, sort_keys=True).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        payload = json.loads(self.rfile.read(length).decode("utf-8"))
+        if not isinstance(payload, dict):
+            raise ValueError("Request body must be a JSON object.")
+        return payload
+
+    def do_GET(self) -> None:
+        self.service.count_request()
+        if self.path == "/stats":
+            self._send(200, self.service.snapshot())
+        else:
+            self._send(404, {"error": f"unknown endpoint {self.path}"})
+
+    def do_POST(self) -> None:
+        self.service.count_request()
+        try:
+            body = self._body()
+            if self.path == "/evaluate":
+                self._send(200, self.service.evaluate(body))
+            elif self.path == "/warmup":
+                paths = body.get("pred") or []
+                self._send(200, self.service.warmup([paths] if isinstance(paths, str) else paths))
+            else:
+                self._send(404, {"error": f"unknown endpoint {self.path}"})
+        except (ValueError, TypeError, OSError, KeyError) as exc:
+            self._send(400, {"error": str(exc)})
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(
+    service: EvaluationService,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: Optional[str] = None,
+    quiet: bool = False,
+) -> socketserver.BaseServer:
+    handler = type("EvaluationHandler", (_Handler,), {"service": service})
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server: socketserver.BaseServer = _UnixHTTPServer(socket_path, handler)
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+    server.quiet = quiet
+    return server
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="wzm-eval serve",
+        description="Serve workzone metric evaluations from a long-lived process.",
+    )
+    parser.add_argument("--gt", required=True, help="Path to ground-truth JSON or compiled store.")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: localhost only).")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port.")
+    parser.add_argument("--socket", help="Serve on this unix socket path instead of TCP.")
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=16,
+        help="Number of parsed prediction sets kept in the LRU cache.",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Do not log requests.")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    service = EvaluationService(args.gt, cache_size=args.cache_size)
+    service.warmup()
+    server = make_server(service, args.host, args.port, args.socket, quiet=args.quiet)
+    where = args.socket or "http://{}:{}".format(*server.server_address[:2])
+    print(f"Serving {len(service.gt)} GT videos on {where}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
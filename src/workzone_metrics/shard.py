@@ -0,0 +1,142 @@
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .aggregate import SummaryAccumulator
+from .grouping import GroupedAccumulator
+from .io import load_ground_truth, load_predictions
+from .report import _evaluate_all, _report_from_accumulators, write_report
+
+PARTIAL_FORMAT = "wzm-partial"
+PARTIAL_VERSION = 1
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parse `i/N` (0-based shard index out of N shards)."""
+    index, sep, count = spec.partition("/")
+    try:
+        shard = (int(index), int(count))
+    except ValueError:
+        shard = None
+    if not sep or shard is None or shard[1] < 1 or not 0 <= shard[0] < shard[1]:
+        raise ValueError(f"Invalid shard spec {spec!r}; expected i/N with 0 <= i < N.")
+    return shard
+
+
+def select_shard(videos: Iterable[str], index: int, count: int) -> List[str]:
+    """Round-robin over sorted video names, so every machine agrees on the split."""
+    return [video for i, video in enumerate(sorted(videos)) if i % count == index]
+
+
+def evaluate_partial(
+    gt_path: str,
+    pred_path: str,
+    shard: Tuple[int, int] = (0, 1),
+    transition_tolerance_frames: int = 0,
+    min_event_overlap_frames: int = 1,
+    source_fps: float = 30.0,
+    stall_threshold_sec: float = 0.5,
+    group_by: Optional[Sequence[str]] = None,
+    metrics: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """Evaluate one shard of the GT videos and return its mergeable partial state."""
+    gt = load_ground_truth(gt_path)
+    gt = {video: gt[video] for video in select_shard(gt.keys(), *shard)}
+    params = {
+        "transition_tolerance_frames": transition_tolerance_frames,
+        "min_event_overlap_frames": min_event_overlap_frames,
+        "source_fps": source_fps,
+        "stall_threshold_sec": stall_threshold_sec,
+        "group_by": list(group_by) if group_by else None,
+        "metrics": list(metrics) if metrics else None,
+    }
+    videos, summary, grouped = _evaluate_all(gt, load_predictions(pred_path), **params)
+    return {
+        "format": PARTIAL_FORMAT,
+        "version": PARTIAL_VERSION,
+        "params": params,
+        "shard": list(shard),
+        "videos": videos,
+        "summary": summary.to_dict(),
+        "groups": grouped.to_dict() if grouped is not None else None,
+    }
+
+
+def load_partial(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    if not isinstance(raw, dict) or raw.get("format") != PARTIAL_FORMAT:
+        raise ValueError(f"Not a wzm partial file: {path}")
+    if raw.get("version") != PARTIAL_VERSION:
+        raise ValueError(f"Unsupported partial version {raw.get('version')!r}: {path}")
+    return raw
+
+
+def merge_partials(partials: Sequence[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Combine shard partials into the report a single full run would produce.
+
+    All parts must share evaluation parameters and shard count and cover
+    disjoint videos. Missing shards are listed under `shards.missing`.
+    """
+    if not partials:
+        raise ValueError("At least one partial is required.")
+    params = partials[0]["params"]
+    count = partials[0]["shard"][1]
+    videos: Dict[str, Any] = {}
+    summary = SummaryAccumulator()
+    grouped: Optional[GroupedAccumulator] = None
+    seen: List[int] = []
+    for part in partials:
+        if part["params"] != params:
+            raise ValueError(f"Partials were evaluated with different parameters: {part['params']} != {params}")
+        index, part_count = part["shard"]
+        if part_count != count:
+            raise ValueError(f"Partials disagree on shard count: {part_count} != {count}")
+        if index in seen:
+            raise ValueError(f"Shard {index}/{count} given more than once.")
+        seen.append(index)
+        overlap = videos.keys() & part["videos"].keys()
+        if overlap:
+            raise ValueError(f"Videos appear in more than one partial: {sorted(overlap)[:5]}")
+        videos.update(part["videos"])
+        summary.merge(SummaryAccumulator.from_dict(part["summary"]))
+        if part.get("groups") is not None:
+            groups = GroupedAccumulator.from_dict(part["groups"])
+            if grouped is None:
+                grouped = groups
+            else:
+                grouped.merge(groups)
+    report = _report_from_accumulators(dict(sorted(videos.items())), summary, grouped)
+    report["shards"] = {
+        "count": count,
+        "merged": sorted(seen),
+        "missing": [i for i in range(count) if i not in seen],
+    }
+    return report
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Merge partial aggregates written by `wzm-eval --shard i/N --partial`."
+    )
+    parser.add_argument("partials", nargs="+", help="Partial files to merge.")
+    parser.add_argument("--out", help="Optional path to write the merged report JSON.")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    report = merge_partials([load_partial(path) for path in args.partials])
+    missing = report["shards"]["missing"]
+    if missing:
+        print(
+            f"Warning: merged {len(report['shards']['merged'])}/{report['shards']['count']} shards; "
+            f"missing {missing}",
+            file=sys.stderr,
+        )
+    write_report(report, args.out)
+
+
+if __name__ == "__main__":
+    main()
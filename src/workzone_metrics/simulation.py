@@ -0,0 +1,204 @@
+import argparse
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .data_models import STATE_CODES, VideoGroundTruth, VideoPredictions
+from .io import load_ground_truth, load_predictions
+from .metrics.batched import _paint
+from .metrics.state import _max_frame
+from .report import write_report
+
+PERCENTILES = (5, 50, 95)
+
+
+@dataclass
+class AdvisoryTrack:
+    """One video's predicted advisory mask and GT advisory spans."""
+
+    mask: np.ndarray  # bool per frame: advisory shown (predicted state != outside)
+    spans: np.ndarray  # (k, 2) inclusive [start, end] runs of GT state != outside
+    fps: float
+
+
+def _true_runs(mask: np.ndarray) -> np.ndarray:
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    return np.stack((np.flatnonzero(edges == 1), np.flatnonzero(edges == -1) - 1), axis=1)
+
+
+def advisory_tracks(
+    gt: Mapping[str, VideoGroundTruth],
+    preds: Mapping[str, VideoPredictions],
+    source_fps: float = 30.0,
+    outside_state: str = "outside",
+) -> Dict[str, AdvisoryTrack]:
+    """Advisory tracks of evaluable videos, over the same frames as the state metrics.
+
+    Videos without a positive prediction FPS use `source_fps`.
+    """
+    outside = STATE_CODES.index(outside_state) if outside_state in STATE_CODES else -1
+    tracks: Dict[str, AdvisoryTrack] = {}
+    for video, gt_entry in gt.items():
+        pred_entry = preds.get(video)
+        if not any(gt_entry.states.values()) or pred_entry is None or pred_entry.states is None:
+            continue
+        total = max(_max_frame(gt_entry.states), _max_frame(pred_entry.states)) + 1
+        gt_codes = np.zeros(total, dtype=np.int8)
+        pred_codes = np.zeros(total, dtype=np.int8)
+        _paint(gt_entry.states, gt_codes)
+        _paint(pred_entry.states, pred_codes)
+        fps = pred_entry.fps if pred_entry.fps and pred_entry.fps > 0 else source_fps
+        tracks[video] = AdvisoryTrack(pred_codes != outside, _true_runs(gt_codes != outside), fps)
+    return tracks
+
+
+def simulate_compliance(
+    tracks: Mapping[str, AdvisoryTrack],
+    gains: Sequence[float] = (0.4,),
+    delays_sec: Sequence[float] = (0.0,),
+    min_leads_sec: Sequence[Optional[float]] = (None,),
+) -> Dict[str, Any]:
+    """Expected speed-violation reduction for every (gain, delay, min-lead) scenario.
+
+    Within a GT advisory span, a frame is complied with when the advisory has
+    been shown continuously for at least the reaction delay. A span counts
+    only when its advisory started at least `min_lead` seconds before the span
+    (`None` = no requirement); its lead is measured from the first predicted
+    advisory run overlapping it. A video's reduction is gain x complied frames
+    / GT advisory frames, so (gain, 0, None) equals
+    `simulated_speed_violation_reduction`.
+
+    All scenarios come from one pass over the dataset: per-span complied
+    counts for every delay via one sorted search, the lead filter and the
+    per-video sums by broadcasting, and gains (which scale linearly) last.
+    Each scenario reports the pooled `expected_reduction` (over all GT
+    advisory frames) and the spread of per-video reductions.
+    """
+    gains_arr = np.clip(np.asarray(gains, dtype=np.float64), 0.0, 1.0)
+    delays = np.asarray(delays_sec, dtype=np.float64)
+    leads = np.array([-np.inf if lead is None else lead for lead in min_leads_sec], dtype=np.float64)
+    videos = [video for video, track in tracks.items() if len(track.spans)]
+
+    span_keys: List[np.ndarray] = []  # per GT advisory frame: span index and predicted advisory age
+    span_video: List[np.ndarray] = []
+    span_frames: List[np.ndarray] = []
+    span_lead: List[np.ndarray] = []
+    span_fps: List[np.ndarray] = []
+    span_count = 0
+    max_age = 0
+    for v, video in enumerate(videos):
+        track = tracks[video]
+        runs = _true_runs(track.mask)
+        # Frames since the current predicted advisory run started (-1 while off).
+        age = np.full(len(track.mask), -1, dtype=np.int64)
+        for start, end in runs.tolist():
+            age[start : end + 1] = np.arange(end - start + 1)
+        if len(runs):
+            max_age = max(max_age, int((runs[:, 1] - runs[:, 0]).max()))
+        starts, ends = track.spans[:, 0], track.spans[:, 1]
+        lengths = ends - starts + 1
+        frames = np.concatenate([np.arange(s, e + 1) for s, e in track.spans.tolist()])
+        index = np.repeat(np.arange(span_count, span_count + len(starts)), lengths)
+        span_keys.append(np.stack((index, age[frames])))
+        first = np.searchsorted(runs[:, 1], starts) if len(runs) else np.zeros(len(starts), dtype=np.int64)
+        overlaps = first < len(runs)
+        overlaps[overlaps] &= runs[first[overlaps], 0] <= ends[overlaps]
+        lead = np.full(len(starts), -np.inf)
+        lead[overlaps] = (starts[overlaps] - runs[first[overlaps], 0]) / track.fps
+        span_video.append(np.full(len(starts), v))
+        span_frames.append(lengths)
+        span_lead.append(lead)
+        span_fps.append(np.full(len(starts), track.fps))
+        span_count += len(starts)
+
+    shape = (len(gains_arr), len(delays), len(leads))
+    stats: Dict[str, np.ndarray] = {}
+    total_frames = 0
+    if videos:
+        index, age = np.concatenate(span_keys, axis=1)
+        base = max_age + 2  # Keys (age + 1) stay below `base` within a span.
+        keys = np.sort(index * base + age + 1)
+        fps = np.concatenate(span_fps)
+        # Complied frames per (span, delay): ages >= ceil(delay * fps), via one sorted search.
+        delay_frames = np.ceil(fps[:, None] * delays[None, :] - 1e-9).astype(np.int64)
+        queries = np.arange(span_count)[:, None] * base + np.clip(delay_frames + 1, 0, base)
+        span_end = np.searchsorted(keys, (np.arange(span_count) + 1) * base)
+        complied = span_end[:, None] - np.searchsorted(keys, queries)
+        timely = np.concatenate(span_lead)[:, None] >= leads[None, :]
+        per_span = complied[:, :, None] * timely[:, None, :]  # (spans, delays, leads)
+        video_starts = np.searchsorted(np.concatenate(span_video), np.arange(len(videos)))
+        per_video = np.add.reduceat(per_span, video_starts, axis=0)
+        frames_per_video = np.add.reduceat(np.concatenate(span_frames), video_starts)
+        total_frames = int(frames_per_video.sum())
+        share = per_video / frames_per_video[:, None, None]
+        base_stats = {
+            "expected_reduction": per_video.sum(axis=0) / total_frames,
+            "mean_reduction": share.mean(axis=0),
+            "std_reduction": share.std(axis=0),
+        }
+        for q, values in zip(PERCENTILES, np.percentile(share, PERCENTILES, axis=0)):
+            base_stats[f"p{q:02d}_reduction"] = values
+        stats = {name: gains_arr[:, None, None] * values[None, :, :] for name, values in base_stats.items()}
+
+    scenarios: List[Dict[str, Any]] = []
+    for g, d, l in np.ndindex(*shape):
+        row: Dict[str, Any] = {
+            "gain": float(gains_arr[g]),
+            "delay_sec": float(delays[d]),
+            "min_lead_sec": None if math.isinf(leads[l]) else float(leads[l]),
+        }
+        for name in ("expected_reduction", "mean_reduction", "std_reduction") + tuple(
+            f"p{q:02d}_reduction" for q in PERCENTILES
+        ):
+            row[name] = float(stats[name][g, d, l]) if stats else None
+        scenarios.append(row)
+    return {"videos": len(videos), "gt_advisory_frames": total_frames, "scenarios": scenarios}
+
+
+def _float_list(value: str) -> List[float]:
+    return [float(x.strip()) for x in value.split(",") if x.strip()]
+
+
+def _lead_list(value: str) -> List[Optional[float]]:
+    return [None if x.strip().lower() == "none" else float(x.strip()) for x in value.split(",") if x.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Simulate advisory compliance over a grid of gain, reaction-delay and min-lead scenarios."
+    )
+    parser.add_argument("--gt", required=True, help="Path to ground-truth JSON.")
+    parser.add_argument("--pred", required=True, help="Path to predictions JSON/CSV/dir.")
+    parser.add_argument("--gain", default="0.4", help="Comma-separated compliance gains in [0, 1].")
+    parser.add_argument("--delay-sec", default="0", help="Comma-separated driver reaction delays (seconds).")
+    parser.add_argument(
+        "--min-lead-sec",
+        default="none",
+        help="Comma-separated minimum advisory lead before a GT span (seconds; none = no requirement).",
+    )
+    parser.add_argument(
+        "--source-fps",
+        type=float,
+        default=30.0,
+        help="Frame rate for videos whose predictions carry no FPS.",
+    )
+    parser.add_argument("--out", help="Optional path to write the results JSON.")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    tracks = advisory_tracks(load_ground_truth(args.gt), load_predictions(args.pred), source_fps=args.source_fps)
+    results = simulate_compliance(
+        tracks,
+        gains=_float_list(args.gain),
+        delays_sec=_float_list(args.delay_sec),
+        min_leads_sec=_lead_list(args.min_lead_sec),
+    )
+    write_report(results, args.out)
+
+
+if __name__ == "__main__":
+    main()
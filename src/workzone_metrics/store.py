@@ -0,0 +1,299 @@
+import argparse
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .compare import HIGHER_IS_BETTER, LOWER_IS_BETTER
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    gt_path TEXT,
+    gt_hash TEXT,
+    pred_source TEXT,
+    params TEXT NOT NULL,
+    summary TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_name ON runs (name);
+CREATE TABLE IF NOT EXISTS videos (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    video TEXT NOT NULL,
+    error TEXT,
+    PRIMARY KEY (run_id, video)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    metric TEXT NOT NULL,
+    video TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, metric, video)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS metrics_video ON metrics (video, metric);
+"""
+
+
+def open_store(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def file_hash(path: str) -> str:
+    """sha1 of a file's bytes, or of every file under a directory (sorted by path)."""
+    path_obj = Path(path)
+    members = sorted(p for p in path_obj.rglob("*") if p.is_file()) if path_obj.is_dir() else [path_obj]
+    digest = hashlib.sha1()
+    for member in members:
+        if path_obj.is_dir():
+            digest.update(str(member.relative_to(path_obj)).encode("utf-8"))
+        with member.open("rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _numeric(value: Any) -> bool:
+    return value is None or (isinstance(value, (int, float)) and not isinstance(value, bool))
+
+
+def record_run(
+    conn: sqlite3.Connection,
+    report: Mapping[str, Any],
+    name: str,
+    gt_path: Optional[str] = None,
+    pred_source: Optional[str] = None,
+    params: Optional[Mapping[str, Any]] = None,
+    gt_hash: Optional[str] = None,
+) -> int:
+    """Insert one `{"videos", "summary"}` report; returns the new run id.
+
+    Only scalar numeric per-video fields are stored; nested blocks such as
+    `transition_breakdown` stay in the run's summary JSON.
+    """
+    if gt_hash is None and gt_path and Path(gt_path).exists():
+        gt_hash = file_hash(gt_path)
+    with conn:
+        cursor = conn.execute(
+            "INSERT INTO runs (name, created_at, gt_path, gt_hash, pred_source, params, summary)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                name,
+                time.strftime("%Y-%m-%dT%H:%M:%S"),
+                gt_path,
+                gt_hash,
+                pred_source,
+                json.dumps(dict(params or {}), sort_keys=True),
+                json.dumps(report.get("summary", {}), sort_keys=True),
+            ),
+        )
+        run_id = cursor.lastrowid
+        videos = report.get("videos", {})
+        conn.executemany(
+            "INSERT INTO videos (run_id, video, error) VALUES (?, ?, ?)",
+            ((run_id, video, payload.get("error")) for video, payload in videos.items()),
+        )
+        conn.executemany(
+            "INSERT INTO metrics (run_id, metric, video, value) VALUES (?, ?, ?, ?)",
+            (
+                (run_id, metric, video, value)
+                for video, payload in videos.items()
+                for metric, value in payload.items()
+                if metric != "error" and _numeric(value)
+            ),
+        )
+    return run_id
+
+
+def import_report(
+    conn: sqlite3.Connection,
+    report_path: str,
+    name: Optional[str] = None,
+    gt_path: Optional[str] = None,
+    params: Optional[Mapping[str, Any]] = None,
+) -> List[int]:
+    """Import a report JSON; multi-run comparison reports add one run per entry."""
+    with open(report_path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    path = Path(report_path)
+    base_name = name or f"{path.parent.name}/{path.stem}"
+    if "runs" in report:
+        return [
+            record_run(
+                conn,
+                run,
+                f"{base_name}:{run_name}",
+                gt_path=gt_path,
+                pred_source=run.get("pred"),
+                params=params,
+            )
+            for run_name, run in report["runs"].items()
+        ]
+    return [record_run(conn, report, base_name, gt_path=gt_path, pred_source=str(path), params=params)]
+
+
+def resolve_run(conn: sqlite3.Connection, ref: str) -> int:
+    """Run id from a numeric id or a run name (latest run with that name)."""
+    if ref.isdigit():
+        row = conn.execute("SELECT id FROM runs WHERE id = ?", (int(ref),)).fetchone()
+    else:
+        row = conn.execute(
+            "SELECT id FROM runs WHERE name = ? ORDER BY id DESC LIMIT 1", (ref,)
+        ).fetchone()
+    if row is None:
+        raise ValueError(f"Unknown run: {ref}")
+    return row[0]
+
+
+def list_runs(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    rows = conn.execute(
+        "SELECT r.id, r.name, r.created_at, r.gt_hash, r.pred_source, r.params,"
+        " (SELECT COUNT(*) FROM videos v WHERE v.run_id = r.id)"
+        " FROM runs r ORDER BY r.id"
+    ).fetchall()
+    return [
+        {
+            "id": run_id,
+            "name": name,
+            "created_at": created_at,
+            "gt_hash": gt_hash,
+            "pred_source": pred_source,
+            "params": json.loads(params),
+            "videos": videos,
+        }
+        for run_id, name, created_at, gt_hash, pred_source, params, videos in rows
+    ]
+
+
+def compare_stored_runs(
+    conn: sqlite3.Connection,
+    baseline: str,
+    candidate: str,
+    metrics: Optional[Sequence[str]] = None,
+    min_delta: float = 0.0,
+) -> Dict[str, Any]:
+    """Per-metric regressions/improvements between two stored runs.
+
+    A video regresses when the candidate is worse than the baseline by more
+    than `min_delta` in the metric's direction.
+    """
+    base_id = resolve_run(conn, baseline)
+    cand_id = resolve_run(conn, candidate)
+    metrics = list(metrics) if metrics else HIGHER_IS_BETTER + LOWER_IS_BETTER
+    out: Dict[str, Any] = {"baseline": base_id, "candidate": cand_id, "metrics": {}}
+    for metric in metrics:
+        sign = -1 if metric in LOWER_IS_BETTER else 1
+        rows = conn.execute(
+            "SELECT b.video, b.value, c.value FROM metrics b"
+            " JOIN metrics c ON c.run_id = ? AND c.metric = b.metric AND c.video = b.video"
+            " WHERE b.run_id = ? AND b.metric = ? AND b.value IS NOT NULL AND c.value IS NOT NULL"
+            " ORDER BY b.video",
+            (cand_id, base_id, metric),
+        ).fetchall()
+        regressed: List[Tuple[str, float, float, float]] = []
+        improved: List[Tuple[str, float, float, float]] = []
+        for video, base_val, cand_val in rows:
+            delta = cand_val - base_val
+            if delta * sign < -min_delta:
+                regressed.append((video, base_val, cand_val, delta))
+            elif delta * sign > min_delta:
+                improved.append((video, base_val, cand_val, delta))
+        regressed.sort(key=lambda row: row[3] * sign)
+        improved.sort(key=lambda row: -row[3] * sign)
+        out["metrics"][metric] = {
+            "n": len(rows),
+            "regressed": [dict(zip(("video", "baseline", "candidate", "delta"), r)) for r in regressed],
+            "improved": [dict(zip(("video", "baseline", "candidate", "delta"), r)) for r in improved],
+        }
+    return out
+
+
+def _params_arg(values: Optional[Iterable[str]]) -> Dict[str, Any]:
+    params: Dict[str, Any] = {}
+    for value in values or []:
+        key, sep, raw = value.partition("=")
+        if not sep:
+            raise ValueError(f"Expected key=value, got {value!r}")
+        try:
+            params[key] = json.loads(raw)
+        except json.JSONDecodeError:
+            params[key] = raw
+    return params
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Import and query evaluation runs in a SQLite store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_import = sub.add_parser("import", help="Import existing report JSONs.")
+    p_import.add_argument("db", help="SQLite store path.")
+    p_import.add_argument("reports", nargs="+", help="Report JSON files.")
+    p_import.add_argument("--name", help="Run name (default: <parent dir>/<file stem>).")
+    p_import.add_argument("--gt", help="GT file the reports were evaluated against (hashed).")
+    p_import.add_argument(
+        "--param", action="append", help="Evaluation parameter to record, e.g. transition_tolerance_frames=5."
+    )
+
+    p_runs = sub.add_parser("runs", help="List stored runs.")
+    p_runs.add_argument("db", help="SQLite store path.")
+
+    p_compare = sub.add_parser("compare", help="Per-video regressions between two runs.")
+    p_compare.add_argument("db", help="SQLite store path.")
+    p_compare.add_argument("baseline", help="Baseline run id or name.")
+    p_compare.add_argument("candidate", help="Candidate run id or name.")
+    p_compare.add_argument("--metric", action="append", help="Metric to compare (repeatable; default: all).")
+    p_compare.add_argument("--min-delta", type=float, default=0.0, help="Ignore changes up to this size.")
+    p_compare.add_argument("--limit", type=int, default=20, help="Videos listed per metric and direction.")
+
+    p_sql = sub.add_parser("sql", help="Run a read-only SQL query and print rows as JSON.")
+    p_sql.add_argument("db", help="SQLite store path.")
+    p_sql.add_argument("query", help="SQL, e.g. SELECT name, COUNT(*) FROM runs JOIN videos ...")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "sql":
+        conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+        cursor = conn.execute(args.query)
+        columns = [d[0] for d in cursor.description or []]
+        for row in cursor:
+            print(json.dumps(dict(zip(columns, row))))
+        return
+    conn = open_store(args.db)
+    if args.command == "import":
+        if args.name and len(args.reports) > 1:
+            parser.error("--name needs a single report.")
+        try:
+            params = _params_arg(args.param)
+        except ValueError as exc:
+            parser.error(str(exc))
+        for report_path in args.reports:
+            run_ids = import_report(conn, report_path, name=args.name, gt_path=args.gt, params=params)
+            print(f"Imported {report_path} as run {', '.join(map(str, run_ids))}")
+    elif args.command == "runs":
+        for run in list_runs(conn):
+            print(json.dumps(run, sort_keys=True))
+    elif args.command == "compare":
+        try:
+            result = compare_stored_runs(
+                conn, args.baseline, args.candidate, metrics=args.metric, min_delta=args.min_delta
+            )
+        except ValueError as exc:
+            parser.error(str(exc))
+        for entry in result["metrics"].values():
+            entry["regressed_count"] = len(entry["regressed"])
+            entry["improved_count"] = len(entry["improved"])
+            entry["regressed"] = entry["regressed"][: args.limit]
+            entry["improved"] = entry["improved"][: args.limit]
+        print(json.dumps(result, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
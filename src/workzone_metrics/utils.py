@@ -1,5 +1,5 @@
 import statistics
-from typing import List, Optional, Tuple
+from typing import List, Optional, Sequence, Tuple
 
 
 def _mean(values: List[Optional[float]]) -> Optional[float]:
@@ -16,3 +16,14 @@ def _overlap_len(a: Tuple[int, int], b: Tuple[int, int]) -> int:
     start = max(a[0], b[0])
     end = min(a[1], b[1])
     return max(0, end - start + 1)
+
+
+def _percentile(sorted_values: Sequence[float], q: float) -> Optional[float]:
+    """Linear-interpolated percentile (q in [0, 100]) of an already sorted sequence."""
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * q / 100.0
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    frac = pos - lo
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * frac
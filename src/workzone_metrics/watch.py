@@ -0,0 +1,150 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .aggregate import SummaryAccumulator
+from .data_models import VideoGroundTruth
+from .io import load_ground_truth, load_predictions_from_timeline_csv, video_name_from_timeline_path
+from .grouping import GroupedAccumulator, parse_group_by_specs
+from .metrics.state import _expand_labels
+from .report import _evaluate_video, _report_from_accumulators
+
+TIMELINE_PATTERNS = ("*_timeline*.csv", "sota_*.csv")
+
+
+class ReportWatcher:
+    """Incrementally maintained report over a directory of timeline CSVs.
+
+    Each poll re-evaluates only videos whose timeline file is new or changed
+    and has been stable (same size and mtime) since the previous poll, and
+    swaps their contribution in the summary (and `group_by`) accumulators.
+    """
+
+    def __init__(
+        self,
+        gt: Mapping[str, VideoGroundTruth],
+        directory: str,
+        group_by: Optional[Sequence[str]] = None,
+        **params: Any,
+    ):
+        self.gt = gt
+        self.directory = Path(directory)
+        self.params = params
+        self.gt_labels: Dict[str, List[str]] = {}
+        self.videos: Dict[str, Dict[str, Any]] = {}
+        self.accumulator = SummaryAccumulator()
+        self.grouped = GroupedAccumulator(parse_group_by_specs(group_by)) if group_by else None
+        self._seen: Dict[Path, Tuple[int, int]] = {}
+        self._evaluated: Dict[Path, Tuple[int, int]] = {}
+        for video, entry in gt.items():
+            self._set(video, _evaluate_video(entry, None, **params))
+
+    def _set(self, video: str, payload: Dict[str, Any]) -> None:
+        previous = self.videos.get(video)
+        if previous is not None:
+            self.accumulator.remove(previous)
+            if self.grouped is not None:
+                self.grouped.remove(video, previous)
+        self.videos[video] = payload
+        self.accumulator.add(payload)
+        if self.grouped is not None:
+            self.grouped.add(video, payload)
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        found: Dict[Path, Tuple[int, int]] = {}
+        for pattern in TIMELINE_PATTERNS:
+            for path in self.directory.rglob(pattern):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                found[path] = (stat.st_size, stat.st_mtime_ns)
+        return found
+
+    def poll(self) -> List[str]:
+        """Evaluate settled new/changed timelines; returns the updated videos."""
+        found = self._scan()
+        updated: List[str] = []
+        for path in sorted(found):
+            stamp = found[path]
+            settled = self._seen.get(path) == stamp
+            if not settled or self._evaluated.get(path) == stamp:
+                continue
+            video = video_name_from_timeline_path(str(path))
+            gt_entry = self.gt.get(video)
+            if gt_entry is None:
+                self._evaluated[path] = stamp
+                continue
+            try:
+                pred_entry = load_predictions_from_timeline_csv(str(path))[video]
+            except (ValueError, OSError):
+                # Partially written file; retried once its size/mtime change.
+                self._evaluated[path] = stamp
+                continue
+            if video not in self.gt_labels and gt_entry.states:
+                self.gt_labels[video] = _expand_labels(gt_entry.states)
+            self._set(
+                video,
+                _evaluate_video(gt_entry, pred_entry, gt_labels=self.gt_labels.get(video), **self.params),
+            )
+            self._evaluated[path] = stamp
+            updated.append(video)
+        self._seen = found
+        return updated
+
+    def report(self) -> Dict[str, Any]:
+        return _report_from_accumulators(self.videos, self.accumulator, self.grouped)
+
+
+def write_report_atomic(report: Dict[str, Any], out_path: str) -> None:
+    out = Path(out_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out.with_name(f".{out.name}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        f.write(json.dumps(report, indent=2, sort_keys=True))
+    os.replace(tmp_path, out)
+
+
+def watch(
+    gt_path: str,
+    directory: str,
+    out_path: str,
+    poll_interval_sec: float = 2.0,
+    write_interval_sec: float = 30.0,
+    idle_timeout_sec: Optional[float] = 600.0,
+    sentinel: Optional[str] = "DONE",
+    **params: Any,
+) -> Dict[str, Any]:
+    """Poll `directory` for timelines and rewrite the report as they land.
+
+    Stops once `sentinel` exists in the directory (after a final poll) or no
+    timeline has changed for `idle_timeout_sec`.
+    """
+    watcher = ReportWatcher(load_ground_truth(gt_path), directory, **params)
+    last_change = time.monotonic()
+    last_write = None
+    dirty = True
+    while True:
+        stop = bool(sentinel) and (Path(directory) / sentinel).exists()
+        # A file needs two identical polls to count as settled.
+        for _ in range(2 if stop else 1):
+            if watcher.poll():
+                dirty = True
+                last_change = time.monotonic()
+        now = time.monotonic()
+        if idle_timeout_sec is not None and now - last_change >= idle_timeout_sec:
+            stop = True
+        if dirty and (stop or last_write is None or now - last_write >= write_interval_sec):
+            write_report_atomic(watcher.report(), out_path)
+            last_write = now
+            dirty = False
+            summary = watcher.accumulator
+            print(
+                f"Updated {out_path}: {summary.videos_evaluated}/{summary.videos_total} videos evaluated",
+                flush=True,
+            )
+        if stop:
+            return watcher.report()
+        time.sleep(poll_interval_sec)
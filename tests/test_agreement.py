@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from workzone_metrics.agreement import compute_agreement
+
+
+def test_pairwise_agreement_matrices(tmp_path):
+    a = {
+        "v1.mp4": {"outside": [[0, 4]], "inside": [[5, 9]]},
+        "v2.mp4": {"outside": [[0, 9]]},
+    }
+    b = {
+        "v1.mp4": {"outside": [[0, 5]], "inside": [[6, 9]]},
+        "v2.mp4": {"outside": [[0, 9]]},
+    }
+    c = {
+        "v1.mp4": {"outside": [[0, 4]], "inside": [[5, 7]], "exiting": [[8, 9]]},
+        "v3.mp4": {"outside": [[0, 9]]},
+    }
+    paths = {}
+    for name, data in (("a", a), ("b", b), ("c", c)):
+        path = tmp_path / f"{name}.json"
+        path.write_text(json.dumps(data))
+        paths[name] = str(path)
+
+    result = compute_agreement(paths, transition_tolerance_frames=1, jobs=2)
+
+    ab = result["pairs"]["a|b"]
+    assert ab["summary"]["videos_compared"] == 2
+    assert ab["videos"]["v1.mp4"]["frame_accuracy"] == 0.9
+    # 5x5 vs 6x4 split: p_o = 0.9, p_e = 0.5 * 0.6 + 0.5 * 0.4 = 0.5.
+    assert ab["videos"]["v1.mp4"]["cohen_kappa"] == pytest.approx(0.8)
+    assert ab["videos"]["v1.mp4"]["transition_recall"] == 1.0
+    # v2 is all `outside` in both files: kappa is undefined.
+    assert ab["videos"]["v2.mp4"]["cohen_kappa"] is None
+
+    ac = result["pairs"]["a|c"]
+    assert ac["summary"]["videos_only_in_a"] == 1
+    assert ac["videos"]["v1.mp4"]["transition_recall"] == 1.0
+    assert ac["videos"]["v1.mp4"]["transition_precision"] == 0.5
+
+    files = result["files"]
+    i, j = files.index("a"), files.index("c")
+    assert result["matrices"]["transition_recall"][i][j] == 1.0
+    assert result["matrices"]["transition_recall"][j][i] == 0.5
+    assert result["matrices"]["frame_accuracy"][i][i] == 1.0
+    assert result["videos"]["v1.mp4"]["frame_accuracy"][i][j] == 0.8
+    assert result["videos"]["v1.mp4"]["frame_accuracy"][j][i] == 0.8
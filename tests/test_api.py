@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from workzone_metrics import GTExpansionCache, evaluate
+from workzone_metrics.data_models import VideoGroundTruth, VideoPredictions
+from workzone_metrics.io import ground_truth_from_dict, load_ground_truth, load_predictions
+from workzone_metrics.report import _build_report
+
+GT = {
+    "a.mp4": {"outside": [[0, 9]], "approaching": [[10, 19]], "inside": [[20, 39]]},
+    "b.mp4": {"outside": [[0, 4]], "inside": [[5, 14]], "exiting": [[15, 19]]},
+    "empty.mp4": {},
+}
+PREDS = {
+    "a.mp4": {"fps": 30, "states": {"outside": [[0, 12]], "approaching": [[13, 21]], "inside": [[22, 49]]}},
+    "b.mp4": {"fps": 30, "states": {"outside": [[0, 6]], "inside": [[7, 14]]}},
+}
+
+
+def test_evaluate_matches_file_based_report(tmp_path):
+    gt_path, pred_path = tmp_path / "gt.json", tmp_path / "pred.json"
+    gt_path.write_text(json.dumps(GT))
+    pred_path.write_text(json.dumps(PREDS))
+    params = {"transition_tolerance_frames": 3, "group_by": ["city"]}
+    expected = _build_report(load_ground_truth(str(gt_path)), load_predictions(str(pred_path)), **params)
+
+    cache = GTExpansionCache()
+    assert evaluate(GT, PREDS, cache=cache, **params) == expected
+    # Typed inputs, bare interval dicts and (video, pred) pairs give the same report.
+    typed_gt = load_ground_truth(str(gt_path))
+    pairs = ((video, entry) for video, entry in load_predictions(str(pred_path)).items())
+    assert evaluate(typed_gt, pairs, cache=cache, **params) == expected
+    bare = {video: entry["states"] for video, entry in PREDS.items()}
+    report = evaluate(GT, bare, cache=cache, transition_tolerance_frames=3)
+    assert report["videos"]["a.mp4"]["transition_recall"] == expected["videos"]["a.mp4"]["transition_recall"]
+    assert report["videos"]["a.mp4"].get("false_activations_per_minute") is None
+    assert cache.info() == {"hits": 4, "misses": 2, "size": 2, "maxsize": 2048}
+
+
+def test_cache_evicts_and_detects_changed_gt():
+    cache = GTExpansionCache(maxsize=2)
+    states = {name: VideoGroundTruth(states={"inside": [(0, i)]}) for i, name in enumerate("xyz", start=1)}
+    for name in "xyz":
+        cache.get(name, states[name].states)
+    assert len(cache) == 2 and cache.misses == 3
+    cache.get("z", states["z"].states)
+    assert cache.hits == 1
+    cache.get("x", states["x"].states)  # evicted earlier
+    assert cache.misses == 4
+
+    labels, transitions = cache.get("x", {"outside": [(0, 1)], "inside": [(2, 3)]})
+    assert labels == ["outside", "outside", "inside", "inside"]
+    assert transitions == [("outside", "inside", 2)]
+    assert cache.misses == 5
+
+
+def test_cached_transitions_account_for_longer_predictions():
+    gt = {"a.mp4": {"outside": [[0, 4]], "inside": [[5, 9]]}}
+    pred_states = {"outside": [(0, 4)], "inside": [(5, 9)], "exiting": [(10, 14)]}
+    preds = {"a.mp4": VideoPredictions(pred_states, 30, None, None)}
+    cached = evaluate(gt, preds, cache=GTExpansionCache())
+    uncached = _build_report(ground_truth_from_dict(gt), preds)
+    assert cached == uncached
+    assert cached["videos"]["a.mp4"]["transition_recall"] == 0.5
+
+
+
+def test_warm_cache_skips_gt_painting_on_batched_path(monkeypatch):
+    batched = pytest.importorskip("workzone_metrics.metrics.batched")
+    cache = GTExpansionCache()
+    cold = evaluate(GT, PREDS, cache=cache, transition_tolerance_frames=3)
+    painted = []
+    paint = batched._paint
+    monkeypatch.setattr(batched, "_paint", lambda states, out: painted.append(states) or paint(states, out))
+    assert evaluate(GT, PREDS, cache=cache, transition_tolerance_frames=3) == cold
+    # Only the two prediction timelines are painted; GT codes come from the cache.
+    assert len(painted) == 2
+    assert cache.info()["hits"] == 2
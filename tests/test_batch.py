@@ -0,0 +1,132 @@
+import json
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from workzone_metrics.batch import BatchJob, Manifest, main, run_batch
+
+
+def _write_dummy_pipeline(tmp_path: Path) -> Path:
+    script = tmp_path / "dummy_pipeline.py"
+    script.write_text(
+        textwrap.dedent(
+            """
+            import sys
+            import time
+            from pathlib import Path
+
+            video, out_dir = Path(sys.argv[1]), Path(sys.argv[2])
+            mode = video.read_text().strip()
+            attempts = out_dir / "attempts.txt"
+            count = int(attempts.read_text()) + 1 if attempts.exists() else 1
+            attempts.write_text(str(count))
+            if mode == "hang":
+                time.sleep(30)
+            if mode == "partial":
+                (out_dir / (video.stem + "_timeline.csv")).write_text("frame,state\\n")
+                time.sleep(30)
+            if mode == "crash_after_write":
+                (out_dir / (video.stem + "_timeline.csv")).write_text("frame,state\\n0,outside\\n")
+                sys.exit(3)
+            if mode == "flaky" and count == 1:
+                sys.exit(1)
+            if mode == "fail":
+                sys.exit(2)
+            (out_dir / (video.stem + "_timeline.csv")).write_text("frame,state\\n0,outside\\n")
+            """
+        )
+    )
+    return script
+
+
+def _jobs(tmp_path: Path, modes):
+    videos = tmp_path / "videos"
+    videos.mkdir()
+    jobs = []
+    for name, mode in modes.items():
+        if mode is not None:
+            (videos / name).write_text(mode)
+        jobs.append(BatchJob(name=name, video_path=videos / name, out_dir=tmp_path / "out" / Path(name).stem))
+    return jobs
+
+
+def test_batch_timeout_retry_and_manifest(tmp_path):
+    script = _write_dummy_pipeline(tmp_path)
+    jobs = _jobs(
+        tmp_path,
+        {"a.mp4": "ok", "b.mp4": "flaky", "c.mp4": "hang", "d.mp4": "fail", "e.mp4": None},
+    )
+    manifest_path = tmp_path / "manifest.json"
+    counts = run_batch(
+        jobs,
+        f"{sys.executable} {script} {{video}} {{out_dir}}",
+        Manifest(str(manifest_path)),
+        cpu_workers=3,
+        timeout_sec=1.0,
+        retries=1,
+        expected_output="{out_dir}/{stem}_timeline.csv",
+    )
+    assert counts == {"done": 2, "failed": 2, "skipped": 1}
+
+    entries = json.loads(manifest_path.read_text())["videos"]
+    assert entries["b.mp4"]["attempts"] == 2
+    assert entries["c.mp4"]["timed_out"] is True
+    assert entries["e.mp4"]["reason"] == "missing_video"
+
+    # Resuming skips finished videos and only reruns failures.
+    (tmp_path / "videos" / "c.mp4").write_text("ok")
+    counts = run_batch(
+        jobs,
+        f"{sys.executable} {script} {{video}} {{out_dir}}",
+        Manifest(str(manifest_path)),
+        cpu_workers=2,
+        expected_output="{out_dir}/{stem}_timeline.csv",
+    )
+    assert counts == {"done": 3, "failed": 1, "skipped": 1}
+    assert (tmp_path / "out" / "a" / "attempts.txt").read_text() == "1"
+
+
+def test_timeout_after_writing_output_fails_and_resume_reruns(tmp_path):
+    script = _write_dummy_pipeline(tmp_path)
+    jobs = _jobs(tmp_path, {"p.mp4": "partial", "x.mp4": "crash_after_write"})
+    manifest_path = tmp_path / "manifest.json"
+    command = f"{sys.executable} {script} {{video}} {{out_dir}}"
+    expected = "{out_dir}/{stem}_timeline.csv"
+    counts = run_batch(
+        jobs, command, Manifest(str(manifest_path)), cpu_workers=2, timeout_sec=1.0, retries=1, expected_output=expected
+    )
+    assert counts == {"done": 0, "failed": 2, "skipped": 0}
+    entries = json.loads(manifest_path.read_text())["videos"]
+    assert entries["p.mp4"]["timed_out"] is True and entries["p.mp4"]["attempts"] == 2
+    assert entries["x.mp4"]["attempts"] == 2
+    # Each attempt starts without the previous attempt's output.
+    assert (tmp_path / "out" / "p" / "p_timeline.csv.stale").exists()
+
+    # Resume reruns the failed jobs even though a (partial) timeline exists.
+    (tmp_path / "videos" / "p.mp4").write_text("ok")
+    counts = run_batch(
+        jobs, command, Manifest(str(manifest_path)), expected_output=expected, accept_output_on_error=True
+    )
+    assert counts == {"done": 2, "failed": 0, "skipped": 0}
+    assert (tmp_path / "out" / "p" / "p_timeline.csv").read_text() == "frame,state\n0,outside\n"
+
+
+def test_unstartable_jobs_fail_in_manifest_and_bad_templates_are_rejected(tmp_path, capsys):
+    jobs = _jobs(tmp_path, {"a.mp4": "ok", "b.mp4": "ok"})
+    manifest_path = tmp_path / "manifest.json"
+    counts = run_batch(jobs, str(tmp_path / "no_such_pipeline") + " {video}", Manifest(str(manifest_path)), retries=1)
+    assert counts == {"done": 0, "failed": 2, "skipped": 0}
+    entry = json.loads(manifest_path.read_text())["videos"]["a.mp4"]
+    assert entry["attempts"] == 2 and entry["error"].startswith("FileNotFoundError")
+
+    with pytest.raises(ValueError, match="foo"):
+        run_batch(jobs, "echo {foo}", Manifest(None))
+    videos, outputs = str(tmp_path / "videos"), str(tmp_path / "outputs")
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--videos", videos, "--outputs", outputs, "--cmd", "echo {foo}"])
+    assert exit_info.value.code == 2 and "foo" in capsys.readouterr().err
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--videos", videos, "--outputs", outputs, "--cmd", str(tmp_path / "no_such_pipeline")])
+    assert exit_info.value.code == 1
@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from workzone_metrics.data_models import VideoGroundTruth, VideoPredictions
+from workzone_metrics.metrics.batched import batch_intermediates
+from workzone_metrics.metrics.registry import EvalContext
+from workzone_metrics.report import _build_report
+
+STATES = ["outside", "approaching", "inside", "exiting"]
+
+
+def _random_states(rng, length):
+    states = {}
+    frame = 0
+    while frame < length:
+        end = min(length - 1, frame + rng.randint(0, 30))
+        states.setdefault(rng.choice(STATES), []).append((frame, end))
+        # Occasional overlaps and gaps exercise the painting priority.
+        frame = end + rng.randint(-3, 4)
+        frame = max(frame, end - 5 + 1)
+    return states
+
+
+def _dataset(seed=0, videos=40):
+    rng = random.Random(seed)
+    gt, preds = {}, {}
+    for i in range(videos):
+        name = f"{rng.choice(['boston', 'denver'])}_v{i}.mp4"
+        length = rng.randint(1, 400)
+        gt[name] = VideoGroundTruth(states=_random_states(rng, length))
+        pred_length = max(1, length + rng.randint(-40, 40))
+        preds[name] = VideoPredictions(
+            states=_random_states(rng, pred_length), fps=30.0, detections=None, ocr=None
+        )
+    gt["boston_empty.mp4"] = VideoGroundTruth(states={})
+    gt["boston_missing.mp4"] = VideoGroundTruth(states={"inside": [(0, 9)]})
+    return gt, preds
+
+
+@pytest.mark.parametrize("tolerance", [0, 3])
+def test_batched_report_matches_per_video(tolerance):
+    gt, preds = _dataset(seed=tolerance)
+    params = dict(transition_tolerance_frames=tolerance, min_event_overlap_frames=2, group_by=["city"])
+    assert _build_report(gt, preds, batched=True, **params) == _build_report(gt, preds, batched=False, **params)
+
+
+def test_batched_report_with_metric_selection():
+    gt, preds = _dataset(seed=7)
+    params = dict(metrics=["transition_*", "false_activation*"])
+    assert _build_report(gt, preds, batched=True, **params) == _build_report(gt, preds, batched=False, **params)
+
+
+def test_batch_intermediates_equal_context_values():
+    gt, preds = _dataset(seed=3, videos=10)
+    pairs = [(gt[v].states, preds[v].states) for v in preds]
+    for (gt_states, pred_states), values in zip(pairs, batch_intermediates(pairs, transition_tolerance_frames=2)):
+        ctx = EvalContext(gt_states, pred_states, transition_tolerance_frames=2)
+        for name, value in values.items():
+            if name == "transition_matches":
+                assert value[:3] == ctx[name][:3]
+                assert vars(value[3]) == vars(ctx[name][3])
+            else:
+                assert value == ctx[name], name
@@ -0,0 +1,73 @@
+import json
+import random
+
+import pytest
+
+from workzone_metrics import cli
+from workzone_metrics.data_models import VideoGroundTruth, VideoPredictions
+from workzone_metrics.metrics.chunked import chunked_intermediates
+from workzone_metrics.metrics.registry import EvalContext
+from workzone_metrics.report import _build_report
+
+STATES = ["outside", "approaching", "inside", "exiting"]
+
+
+def _random_states(rng, length):
+    states = {}
+    frame = 0
+    while frame < length:
+        end = min(length - 1, frame + rng.randint(0, 60))
+        states.setdefault(rng.choice(STATES), []).append((frame, end))
+        # Overlaps and gaps exercise the painting priority across window edges.
+        frame = max(frame + 1, end + rng.randint(-5, 6))
+    return states
+
+
+@pytest.mark.parametrize("chunk_frames", [1, 7, 250])
+@pytest.mark.parametrize("tolerance,min_overlap", [(0, 1), (4, 3), (50, 0)])
+def test_chunked_intermediates_match_single_shot(chunk_frames, tolerance, min_overlap):
+    rng = random.Random(chunk_frames * 100 + tolerance)
+    for _ in range(10):
+        gt_states = _random_states(rng, rng.randint(1, 1500))
+        pred_states = _random_states(rng, rng.randint(1, 1500))
+        ctx = EvalContext(
+            gt_states, pred_states, transition_tolerance_frames=tolerance, min_event_overlap_frames=min_overlap
+        )
+        values = chunked_intermediates(gt_states, pred_states, chunk_frames, tolerance, min_overlap)
+        for name, value in values.items():
+            if name == "transition_matches":
+                assert value[:3] == ctx[name][:3]
+                assert value[3].to_dict() == ctx[name][3].to_dict()
+            else:
+                assert value == ctx[name], name
+
+
+def test_chunked_report_matches_single_shot():
+    rng = random.Random(0)
+    gt = {f"drive{i}.mp4": VideoGroundTruth(states=_random_states(rng, rng.randint(200, 3000))) for i in range(6)}
+    preds = {
+        video: VideoPredictions(
+            states=_random_states(rng, rng.randint(200, 3000)), fps=30.0, detections=None, ocr=None
+        )
+        for video in gt
+    }
+    params = dict(transition_tolerance_frames=5, min_event_overlap_frames=2)
+    expected = _build_report(gt, preds, batched=False, **params)
+    assert _build_report(gt, preds, chunk_frames=512, batched=False, **params) == expected
+    assert _build_report(gt, preds, chunk_frames=1000, **params) == expected
+    with pytest.raises(ValueError):
+        chunked_intermediates(gt["drive0.mp4"].states, preds["drive0.mp4"].states, 0)
+
+
+def test_cli_chunk_frames(tmp_path, capsys):
+    gt_path = tmp_path / "gt.json"
+    pred_path = tmp_path / "pred.json"
+    gt_path.write_text(json.dumps({"v.mp4": {"outside": [[0, 4]], "inside": [[5, 99]]}}))
+    pred_path.write_text(json.dumps({"v.mp4": {"states": {"outside": [[0, 6]], "inside": [[7, 99]]}}}))
+    out_path = tmp_path / "report.json"
+    cli.main(["--gt", str(gt_path), "--pred", str(pred_path), "--out", str(out_path), "--chunk-frames", "16"])
+    chunked = json.loads(out_path.read_text())
+    cli.main(["--gt", str(gt_path), "--pred", str(pred_path), "--out", str(out_path)])
+    assert chunked == json.loads(out_path.read_text())
+    with pytest.raises(SystemExit):
+        cli.main(["--gt", str(gt_path), "--pred", str(pred_path), "--chunk-frames", "0"])
@@ -0,0 +1,44 @@
+import json
+
+from workzone_metrics.compare import compare_runs, parse_pred_arg
+from workzone_metrics.report import generate_report
+
+
+def _write_json(path, payload):
+    path.write_text(json.dumps(payload))
+    return str(path)
+
+
+def test_compare_runs_matches_single_reports(tmp_path):
+    gt = {
+        "a.mp4": {"outside": [[0, 4]], "approaching": [[5, 7]], "inside": [[8, 9]]},
+        "b.mp4": {"outside": [[0, 9]], "inside": [[10, 14]]},
+    }
+    run_a = {
+        "a.mp4": {"states": {"outside": [[0, 4]], "approaching": [[5, 7]], "inside": [[8, 9]]}},
+        "b.mp4": {"states": {"outside": [[0, 11]], "inside": [[12, 14]]}},
+    }
+    run_b = {
+        "a.mp4": {"states": {"outside": [[0, 6]], "inside": [[7, 9]]}},
+        "b.mp4": {"states": {"outside": [[0, 9]], "inside": [[10, 14]]}},
+    }
+    gt_path = _write_json(tmp_path / "gt.json", gt)
+    paths = {
+        "runA": _write_json(tmp_path / "a.json", run_a),
+        "runB": _write_json(tmp_path / "b.json", run_b),
+    }
+    report = compare_runs(gt_path, paths, jobs=2)
+
+    for name, path in paths.items():
+        assert report["runs"][name]["summary"] == generate_report(gt_path, path)["summary"]
+
+    accuracy = report["comparisons"]["runB_vs_runA"]["metrics"]["frame_accuracy"]
+    assert (accuracy["wins"], accuracy["losses"], accuracy["ties"]) == (1, 1, 0)
+    deltas = report["comparisons"]["runB_vs_runA"]["videos"]
+    assert abs(deltas["b.mp4"]["frame_accuracy"] - 2 / 15) < 1e-12
+    assert deltas["a.mp4"]["time_in_error_frames"] == 3
+
+
+def test_parse_pred_arg():
+    assert parse_pred_arg("strict=results/strict") == ("strict", "results/strict")
+    assert parse_pred_arg("results/new/") == ("new", "results/new/")
@@ -0,0 +1,64 @@
+import json
+
+from workzone_metrics.convert import encode_rle, has_overlaps, main
+from workzone_metrics.io import load_ground_truth, load_predictions, states_from_rle
+from workzone_metrics.report import _build_report
+
+GT = {
+    "a.mp4": {
+        "outside": [[0, 9], [60, 79]],
+        "approaching": [[12, 20]],
+        "inside": [[21, 30], [31, 45]],
+        "exiting": [[46, 59]],
+    },
+    "b.mp4": {"inside": [[5, 14]], "construction_flagger": [[20, 24]]},
+}
+PRED = {
+    "a.mp4": {"fps": 30, "states": {"outside": [[0, 14], [58, 79]], "inside": [[15, 57]]}, "ocr": None},
+    "b.mp4": {"fps": 25, "states": {"approaching": [[0, 4]], "inside": [[5, 20]]}},
+}
+
+
+def test_encode_keeps_event_boundaries_and_unknown_states():
+    runs, table = encode_rle({"outside": [(0, 9)], "inside": [(12, 20), (21, 30)]})
+    assert table is None
+    # Gap 10-11 becomes outside; adjacent inside intervals stay separate runs.
+    assert runs == [[0, 12], [2, 9], [2, 10]]
+    assert states_from_rle(runs) == {"outside": [(0, 11)], "inside": [(12, 20), (21, 30)]}
+
+    runs, table = encode_rle({"inside": [(0, 4)], "outside": [(3, 6)], "flagger": [(5, 9)]})
+    assert table == ["outside", "approaching", "inside", "exiting", "flagger"]
+    assert states_from_rle(runs, table) == {"inside": [(0, 2)], "outside": [(3, 6)], "flagger": [(7, 9)]}
+    assert encode_rle({"inside": []}) == ([], None)
+
+
+def test_convert_round_trip_matches_report(tmp_path):
+    gt_path, pred_path = tmp_path / "gt.json", tmp_path / "pred.json"
+    gt_path.write_text(json.dumps(GT))
+    pred_path.write_text(json.dumps(PRED))
+    main(["--gt", str(gt_path), "--out", str(tmp_path / "gt_rle.json")])
+    main(["--pred", str(pred_path), "--out", str(tmp_path / "pred_rle.json")])
+
+    converted = json.loads((tmp_path / "pred_rle.json").read_text())
+    assert converted["a.mp4"]["rle"] == [[0, 15], [2, 43], [0, 22]]
+    assert converted["a.mp4"]["fps"] == 30
+    assert (tmp_path / "gt_rle.json").stat().st_size < gt_path.stat().st_size
+
+    original = _build_report(load_ground_truth(str(gt_path)), load_predictions(str(pred_path)))
+    compact = _build_report(
+        load_ground_truth(str(tmp_path / "gt_rle.json")), load_predictions(str(tmp_path / "pred_rle.json"))
+    )
+    assert compact == original
+
+
+def test_convert_warns_about_resolved_overlaps(tmp_path, capsys):
+    gt = dict(GT, **{"c.mp4": {"outside": [[0, 850]], "approaching": [[850, 900]]}})
+    gt_path = tmp_path / "gt.json"
+    gt_path.write_text(json.dumps(gt))
+    main(["--gt", str(gt_path), "--out", str(tmp_path / "gt_rle.json")])
+    err = capsys.readouterr().err
+    assert "in 1 videos" in err and "c.mp4" in err and "a.mp4" not in err
+    assert has_overlaps({"inside": [(0, 4), (4, 9)]})
+    assert not has_overlaps({"inside": [(0, 4)], "exiting": [(5, 9)]})
+    converted = load_ground_truth(str(tmp_path / "gt_rle.json"))
+    assert converted["c.mp4"].states["approaching"] == [(851, 900)]
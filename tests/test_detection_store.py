@@ -0,0 +1,82 @@
+import json
+import pickle
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from workzone_metrics.data_models import VideoGroundTruth
+from workzone_metrics.detection_store import DetectionHandle, DetectionStore, main, write_detection_store
+from workzone_metrics.io import load_predictions
+from workzone_metrics.replay import ReplayConfig, replay_sweep
+
+
+def _records(frames):
+    return [{"frame": f, "class": "cone", "score": 0.9, "box": [0, 0, 10, 10]} for f in frames]
+
+
+def test_store_round_trip_and_lazy_rows(tmp_path):
+    out = tmp_path / "dets.wzd"
+    detections = {
+        "a.mp4": _records([3, 1, 1]) + [{"frame": 2, "class": "sign", "score": 0.2}],
+        "b.mp4": _records([0]),
+        "c.mp4": [],
+    }
+    write_detection_store(detections, str(out), fps={"a.mp4": 30.0}, num_frames={"b.mp4": 5, "c.mp4": 3})
+
+    store = load_predictions(str(out))
+    assert isinstance(store, DetectionStore)
+    assert store.classes == ["cone", "sign"]
+    assert isinstance(store.columns["frame"], np.memmap)
+    handle = store["a.mp4"].detections
+    assert isinstance(handle, DetectionHandle)
+    assert store["a.mp4"].fps == 30.0 and store["a.mp4"].states is None
+    assert handle.row_count == 4
+    assert handle.rows()["frame"].tolist() == [1, 1, 2, 3]
+    window = handle.rows(2, 3)
+    assert window["frame"].tolist() == [2, 3]
+    assert np.isnan(window["box"][0]).all()
+    assert window["box"][1].tolist() == [0, 0, 10, 10]
+
+    summary = handle.summary(score_threshold=0.5)
+    assert summary.counts.tolist() == [[0, 0], [2, 0], [0, 0], [1, 0]]
+    assert store["b.mp4"].detections.summary().counts.shape == (5, 2)
+    empty = store["c.mp4"].detections
+    assert empty.row_count == 0 and empty  # Handles of videos without detections stay truthy.
+    assert empty.summary().counts.tolist() == [[0, 0]] * 3
+
+    restored = pickle.loads(pickle.dumps(handle))
+    assert restored.rows()["frame"].tolist() == [1, 1, 2, 3]
+
+
+def test_sidecar_attach_and_replay(tmp_path):
+    store_path = tmp_path / "dets.wzd"
+    write_detection_store(
+        {"a.mp4": _records([1, 1, 2, 3, 3, 4, 4, 5, 5, 6])}, str(store_path), num_frames={"a.mp4": 10}
+    )
+    pred_path = tmp_path / "pred.json"
+    pred_path.write_text(
+        json.dumps({"a.mp4": {"fps": 30, "states": {"outside": [[0, 9]]}}, "other.mp4": {"states": {}}})
+    )
+
+    preds = load_predictions(str(pred_path), detections=str(store_path))
+    assert isinstance(preds["a.mp4"].detections, DetectionHandle)
+    assert preds["a.mp4"].states == {"outside": [(0, 9)]}
+    assert preds["other.mp4"].detections is None
+    assert list(load_predictions(str(pred_path), videos={"other.mp4"}, detections=str(store_path))) == [
+        "other.mp4"
+    ]
+
+    gt = {"a.mp4": VideoGroundTruth(states={"outside": [(0, 0), (7, 9)], "approaching": [(1, 6)]})}
+    result = replay_sweep(gt, preds, [ReplayConfig(ema_alpha=1.0, approach_on=1, inside_on=3, inside_off=2)])
+    assert result["results"][0]["frame_accuracy_mean"] == 1.0
+
+
+def test_export_cli(tmp_path, capsys):
+    pred_path = tmp_path / "pred.json"
+    pred_path.write_text(json.dumps({"a.mp4": {"fps": 15, "detections": _records([0, 2])}}))
+    main(["--pred", str(pred_path), "--out", str(tmp_path / "dets.wzd")])
+    store = DetectionStore(str(tmp_path / "dets.wzd"))
+    assert store["a.mp4"].fps == 15
+    assert store["a.mp4"].detections.rows()["frame"].tolist() == [0, 2]
+    assert "Wrote 1 videos" in capsys.readouterr().out
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from workzone_metrics import cli
+from workzone_metrics.grouping import parse_group_by, parse_group_by_specs
+from workzone_metrics.report import generate_report
+
+
+def test_group_by_city_and_metadata(tmp_path):
+    gt = {
+        "boston_aaa_000000_00010_snippet.mp4": {"outside": [[0, 4]], "inside": [[5, 9]]},
+        "boston_bbb_000001_00020_snippet.mp4": {"outside": [[0, 9]]},
+        "pittsburgh_ccc_000000_00030_snippet.mp4": {"outside": [[0, 4]], "inside": [[5, 9]]},
+    }
+    preds = {video: {"states": {"outside": [[0, 9]]}} for video in gt}
+    metadata = {
+        "boston_aaa_000000_00010_snippet.mp4": {"weather": "rain"},
+        "pittsburgh_ccc_000000_00030_snippet.mp4": {"weather": "rain"},
+    }
+    gt_path = tmp_path / "gt.json"
+    pred_path = tmp_path / "pred.json"
+    meta_path = tmp_path / "meta.json"
+    gt_path.write_text(json.dumps(gt))
+    pred_path.write_text(json.dumps(preds))
+    meta_path.write_text(json.dumps(metadata))
+
+    report = generate_report(
+        str(gt_path), str(pred_path), group_by=["city", f"{meta_path}:weather"]
+    )
+    groups = report["groups"]
+    assert groups["city"]["boston"]["videos_evaluated"] == 2
+    assert groups["city"]["boston"]["frame_accuracy_mean"] == 0.75
+    assert groups["city"]["pittsburgh"]["frame_accuracy_mean"] == 0.5
+    assert groups["weather"]["(missing)"]["videos_total"] == 1
+    assert groups["city+weather"]["boston|rain"]["frame_accuracy_mean"] == 0.5
+    assert report["summary"]["frame_accuracy_mean"] == 2 / 3
+
+
+def test_metadata_entries_must_be_objects(tmp_path):
+    meta_path = tmp_path / "meta.json"
+    meta_path.write_text(json.dumps({"a.mp4": {"weather": "rain"}, "b.mp4": None, "c.mp4": "rain"}))
+    with pytest.raises(ValueError, match=r"c\.mp4 in .*meta\.json"):
+        parse_group_by(f"{meta_path}:weather")
+    meta_path.write_text(json.dumps({"a.mp4": {"weather": "rain"}, "b.mp4": None}))
+    key = parse_group_by(f"{meta_path}:weather").key
+    assert (key("a.mp4"), key("b.mp4")) == ("rain", "(missing)")
+
+
+def test_group_by_specs_get_unique_names_and_fail_early(tmp_path, capsys):
+    groupers = parse_group_by_specs(["city", "regex:^[a-z]+_(a+|b+)", "regex:_(0+1?)_"])
+    assert [g.name for g in groupers] == ["city", "regex:^[a-z]+_(a+|b+)", "regex:_(0+1?)_"]
+    with pytest.raises(ValueError, match="Duplicate"):
+        parse_group_by_specs(["city", "city"])
+
+    missing = tmp_path / "missing.json"
+    for spec in (["city", "city"], [f"{missing}:weather"], ["nonsense"]):
+        argv = ["--gt", str(missing), "--pred", str(missing)]
+        for value in spec:
+            argv += ["--group-by", value]
+        with pytest.raises(SystemExit) as exit_info:
+            cli.main(argv)
+        assert exit_info.value.code == 2 and "--group-by" in capsys.readouterr().err
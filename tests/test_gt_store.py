@@ -0,0 +1,52 @@
+import json
+import pickle
+
+from workzone_metrics.gt_store import CompiledGroundTruth, main as compile_gt
+from workzone_metrics.io import load_ground_truth, load_predictions
+from workzone_metrics.report import _build_report
+
+
+def test_compiled_gt_round_trip(tmp_path):
+    gt_path = tmp_path / "gt.json"
+    gt_path.write_text(
+        '{"a.mp4": {"outside": [[0, 150], [900, 423]], "inside": [[229, 338]], "exiting": []},'
+        ' "b.mp4": {"outside": [], "approaching": []}}'
+    )
+    store_path = tmp_path / "gt.wzgt"
+    compile_gt(["--gt", str(gt_path), "--out", str(store_path)])
+
+    expected = load_ground_truth(str(gt_path))
+    compiled = load_ground_truth(str(store_path))
+    assert isinstance(compiled, CompiledGroundTruth)
+    assert sorted(compiled) == ["a.mp4", "b.mp4"]
+    assert compiled["a.mp4"].states == {
+        state: intervals for state, intervals in expected["a.mp4"].states.items() if intervals
+    }
+    assert compiled["a.mp4"].states["outside"] == [(0, 150), (423, 900)]
+    assert compiled["b.mp4"].states == {}
+
+    reopened = pickle.loads(pickle.dumps(compiled))
+    assert reopened["a.mp4"] == compiled["a.mp4"]
+
+
+def test_compiled_gt_decodes_each_video_once(tmp_path, monkeypatch):
+    gt_path, pred_path = tmp_path / "gt.json", tmp_path / "pred.json"
+    gt_path.write_text(json.dumps({f"{v}.mp4": {"outside": [[0, 4]], "inside": [[5, 9]]} for v in "abc"}))
+    pred_path.write_text(json.dumps({"a.mp4": {"states": {"outside": [[0, 9]]}}}))
+    store_path = tmp_path / "gt.wzgt"
+    compile_gt(["--gt", str(gt_path), "--out", str(store_path)])
+
+    decoded = []
+    decode = CompiledGroundTruth._decode
+    monkeypatch.setattr(
+        CompiledGroundTruth, "_decode", lambda self, video: decoded.append(video) or decode(self, video)
+    )
+    compiled = CompiledGroundTruth(str(store_path), cache_size=2)
+    report = _build_report(compiled, load_predictions(str(pred_path)), chunk_frames=4)
+    assert report["videos"]["a.mp4"]["frame_accuracy"] == 0.5
+    assert sorted(decoded) == ["a.mp4", "b.mp4", "c.mp4"]
+
+    assert compiled["c.mp4"] is compiled["c.mp4"]
+    compiled["a.mp4"]  # Evicts b.mp4 (least recently used) from the two-video cache.
+    compiled["b.mp4"]
+    assert decoded[3:] == ["a.mp4", "b.mp4"]
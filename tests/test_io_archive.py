@@ -0,0 +1,67 @@
+import tarfile
+import zipfile
+
+import pytest
+
+from workzone_metrics.io import is_prediction_archive, load_predictions, load_predictions_from_timeline_dir
+
+TIMELINE = "frame,time_sec,state\n0,0.0,OUTSIDE\n10,0.33,APPROACHING\n20,0.66,INSIDE\n"
+
+
+def _write_tree(root):
+    (root / "batch" / "a").mkdir(parents=True)
+    (root / "batch" / "a" / "a_timeline_fusion.csv").write_text(TIMELINE)
+    (root / "batch" / "sota_b.csv").write_text(TIMELINE.replace("INSIDE", "EXITING"))
+    (root / "batch" / "c_timeline.csv").write_text(TIMELINE)
+    (root / "batch" / "notes.csv").write_text("frame,state\n0,inside\n")
+
+
+def _zip(root, path):
+    with zipfile.ZipFile(path, "w") as zf:
+        for member in sorted((root / "batch").rglob("*.csv")):
+            zf.write(member, member.relative_to(root).as_posix())
+
+
+@pytest.mark.parametrize("suffix", [".zip", ".tar.gz"])
+def test_archive_matches_extracted_directory(tmp_path, suffix):
+    _write_tree(tmp_path)
+    archive = tmp_path / f"batch{suffix}"
+    if suffix == ".zip":
+        _zip(tmp_path, archive)
+    else:
+        with tarfile.open(archive, "w:gz") as tf:
+            tf.add(tmp_path / "batch", arcname="batch")
+    assert is_prediction_archive(str(archive))
+
+    expected = load_predictions_from_timeline_dir(str(tmp_path / "batch"))
+    preds = load_predictions(str(archive))
+    assert preds.keys() == {"a.mp4", "b.mp4", "c.mp4"}
+    assert preds["b.mp4"].states["exiting"] == [(20, 20)]
+    for video in expected:
+        assert preds[video].states == expected[video].states
+        assert preds[video].fps == expected[video].fps
+        assert preds[video].frame_times == expected[video].frame_times
+
+    assert load_predictions(str(archive), videos={"b.mp4"}).keys() == {"b.mp4"}
+
+
+def test_zip_members_parsed_in_worker_processes(tmp_path):
+    _write_tree(tmp_path)
+    archive = tmp_path / "batch.zip"
+    _zip(tmp_path, archive)
+    serial = load_predictions(str(archive))
+    parallel = load_predictions(str(archive), jobs=2)
+    assert list(parallel) == list(serial)
+    assert all(parallel[video].states == serial[video].states for video in serial)
+
+
+def test_archive_without_timelines(tmp_path):
+    archive = tmp_path / "empty.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("readme.txt", "nothing here")
+    with pytest.raises(ValueError, match="No timeline CSVs"):
+        load_predictions(str(archive))
+    assert not is_prediction_archive(str(tmp_path / "missing.zip"))
+    json_path = tmp_path / "preds.json"
+    json_path.write_text("{}")
+    assert not is_prediction_archive(str(json_path))
@@ -0,0 +1,33 @@
+import json
+import pickle
+
+from workzone_metrics.io import load_predictions
+from workzone_metrics.label_store import LabelStore, main as export_labels
+from workzone_metrics.report import generate_report
+
+
+def test_label_store_round_trip_and_eval(tmp_path):
+    gt_path = tmp_path / "gt.json"
+    gt_path.write_text(json.dumps({"a.mp4": {"outside": [[0, 4]], "inside": [[5, 9]]}}))
+    pred_path = tmp_path / "pred.json"
+    pred_path.write_text(
+        json.dumps(
+            {
+                "a.mp4": {"fps": 30, "states": {"outside": [[0, 5]], "inside": [[6, 8]], "exiting": [[9, 9]]}},
+                "b.mp4": {"states": {"approaching": [[0, 2]]}},
+            }
+        )
+    )
+    store_path = tmp_path / "pred.wzl"
+    export_labels(["--pred", str(pred_path), "--out", str(store_path)])
+
+    store = load_predictions(str(store_path))
+    assert isinstance(store, LabelStore)
+    labels = store.labels("a.mp4")
+    assert isinstance(labels, memoryview)
+    assert [store.states[c] for c in labels[4:7]] == ["outside", "outside", "inside"]
+    assert store["a.mp4"].fps == 30
+    assert store["b.mp4"].states == {"approaching": [(0, 2)]}
+
+    assert pickle.loads(pickle.dumps(store))["a.mp4"] == store["a.mp4"]
+    assert generate_report(str(gt_path), str(store_path)) == generate_report(str(gt_path), str(pred_path))
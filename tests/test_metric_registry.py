@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+from workzone_metrics.metrics import registry
+from workzone_metrics.metrics.registry import (
+    EvalContext,
+    compute_metrics,
+    register_intermediate,
+    register_metric,
+    required_intermediates,
+    select_metrics,
+)
+from workzone_metrics.report import generate_report
+from workzone_metrics.shard import evaluate_partial, merge_partials
+
+
+@pytest.fixture
+def isolated_registry(monkeypatch):
+    registry._ensure_loaded()
+    monkeypatch.setattr(registry, "_METRICS", dict(registry._METRICS))
+    monkeypatch.setattr(registry, "_INTERMEDIATES", dict(registry._INTERMEDIATES))
+    monkeypatch.setattr(registry, "_SELECTIONS", {})
+    monkeypatch.setattr(registry, "_SUMMARY_FIELDS", None)
+
+
+def test_select_metrics_patterns_and_intermediates():
+    selected = select_metrics(["frame_accuracy", "transition_*"])
+    assert selected == [
+        "frame_accuracy",
+        "transition_recall",
+        "transition_precision",
+        "transition_accuracy",
+        "transition_breakdown",
+    ]
+    assert required_intermediates(["frame_accuracy", "transition_recall"]) == [
+        "total_frames",
+        "gt_labels",
+        "pred_labels",
+        "label_pairs",
+        "correct_frames",
+        "gt_transitions",
+        "transition_matches",
+    ]
+    with pytest.raises(ValueError):
+        select_metrics(["no_such_metric*"])
+
+
+def test_report_computes_only_selected_metrics(tmp_path):
+    gt_path = tmp_path / "gt.json"
+    pred_path = tmp_path / "pred.json"
+    gt_path.write_text(json.dumps({"v.mp4": {"outside": [[0, 4]], "inside": [[5, 9]]}}))
+    pred_path.write_text(json.dumps({"v.mp4": {"states": {"outside": [[0, 5]], "inside": [[6, 9]]}}}))
+
+    report = generate_report(str(gt_path), str(pred_path), metrics=["frame_accuracy", "iou_*"])
+    assert set(report["videos"]["v.mp4"]) == {
+        "frame_accuracy",
+        "iou_outside",
+        "iou_approaching",
+        "iou_inside",
+        "iou_exiting",
+    }
+    assert report["summary"]["frame_accuracy_mean"] == 0.9
+    assert report["summary"]["transition_recall_mean"] is None
+
+
+def test_third_party_metric_shares_intermediates(isolated_registry):
+    calls = []
+
+    @register_intermediate("inside_frames", requires=("pred_labels",))
+    def _inside_frames(ctx):
+        calls.append(1)
+        return sum(1 for label in ctx["pred_labels"] if label == "inside")
+
+    @register_metric("inside_frames_pred", requires=("inside_frames",))
+    def _inside_frames_pred(ctx):
+        return ctx["inside_frames"]
+
+    @register_metric("inside_share_pred", requires=("inside_frames", "total_frames"))
+    def _inside_share_pred(ctx):
+        return ctx["inside_frames"] / ctx["total_frames"]
+
+    ctx = EvalContext({"outside": [(0, 9)]}, {"outside": [(0, 7)], "inside": [(8, 9)]})
+    out = compute_metrics(ctx, select_metrics(["inside_*_pred", "frame_accuracy"]))
+    assert out == {"frame_accuracy": 0.8, "inside_frames_pred": 2, "inside_share_pred": 0.2}
+    assert len(calls) == 1
+
+
+def test_third_party_metric_summary_stats_reach_summary_groups_and_shards(isolated_registry, tmp_path):
+    @register_metric("inside_frames_pred", requires=("pred_labels",), summary=("mean", "total"))
+    def _inside_frames_pred(ctx):
+        return sum(1 for label in ctx["pred_labels"] if label == "inside")
+
+    with pytest.raises(ValueError, match="median"):
+        register_metric("bad_stats", summary=("median",))
+
+    gt = {f"{city}_{i}.mp4": {"outside": [[0, 4]], "inside": [[5, 9]]} for city in ("boston", "denver") for i in (1, 2)}
+    preds = {video: {"states": {"outside": [[0, 9 - i]], "inside": [[10 - i, 9]]}} for i, video in enumerate(gt, 1)}
+    gt_path, pred_path = tmp_path / "gt.json", tmp_path / "pred.json"
+    gt_path.write_text(json.dumps(gt))
+    pred_path.write_text(json.dumps(preds))
+
+    report = generate_report(str(gt_path), str(pred_path), group_by=["city"])
+    assert report["summary"]["inside_frames_pred_mean"] == 2.5
+    assert report["summary"]["inside_frames_pred_total"] == 10
+    assert report["groups"]["city"]["denver"]["inside_frames_pred_mean"] == 3.5
+    partials = [evaluate_partial(str(gt_path), str(pred_path), shard=(k, 2)) for k in range(2)]
+    assert merge_partials(partials)["summary"]["inside_frames_pred_total"] == 10
@@ -0,0 +1,50 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from workzone_metrics.data_models import VideoGroundTruth, VideoPredictions
+from workzone_metrics.postprocess import (
+    FilterConfig,
+    apply_filters,
+    grid_search,
+    hysteresis_filter,
+    hysteresis_stack,
+    majority_filter,
+    min_duration_filter,
+    pareto_front,
+)
+
+
+def test_filters():
+    codes = np.array([0, 0, 0, 2, 0, 0, 1, 1, 1, 1, 2, 2, 2])
+    assert majority_filter(codes, 3).tolist() == [0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 2]
+    assert min_duration_filter(codes, 3).tolist() == [0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 2]
+    assert hysteresis_filter(codes, 3).tolist() == [0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 2]
+    assert apply_filters(codes, FilterConfig()).tolist() == codes.tolist()
+    assert hysteresis_stack(codes, [1, 3, 5]).tolist() == [
+        codes.tolist(),
+        hysteresis_filter(codes, 3).tolist(),
+        hysteresis_filter(codes, 5).tolist(),
+    ]
+
+
+def test_majority_filter_does_not_order_states():
+    # A median over codes would pick approaching here and drop exiting below.
+    assert majority_filter(np.array([0, 0, 1, 3, 3]), 5)[2] == 0
+    codes = np.array([2, 2, 2, 3, 3, 0, 0, 0])
+    assert majority_filter(codes, 5).tolist() == codes.tolist()
+
+
+def test_grid_search_reduces_flicker():
+    gt = {"a.mp4": VideoGroundTruth(states={"outside": [(0, 19)], "inside": [(20, 39)]})}
+    flicker = {"outside": [(0, 9), (11, 19), (22, 22)], "inside": [(10, 10), (20, 21), (23, 39)]}
+    preds = {"a.mp4": VideoPredictions(states=flicker, fps=30, detections=None, ocr=None)}
+    result = grid_search(
+        gt, preds, min_durations=[1, 3], hysteresis_frames=[1, 2], transition_tolerance_frames=3
+    )
+    by_config = {(r["min_duration_frames"], r["hysteresis_frames"]): r for r in result["results"]}
+    assert by_config[(1, 1)]["transition_precision_mean"] == 0.2
+    assert by_config[(3, 1)]["transition_precision_mean"] == 1.0
+    assert by_config[(1, 1)]["entry_timing_mae_frames_mean"] == 10
+    assert result["pareto_front"] == pareto_front(result["results"])
+    assert {r["transition_precision_mean"] for r in result["pareto_front"]} <= {0.2, 1.0}
@@ -0,0 +1,88 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from workzone_metrics.data_models import VideoGroundTruth, VideoPredictions
+from workzone_metrics.replay import (
+    DetectionSummary,
+    ReplayConfig,
+    codes_to_intervals,
+    replay_states,
+    replay_sweep,
+)
+
+
+def _summary(cones):
+    return {"classes": {"cone": {"count": cones}, "sign": {"score": [0.5] * len(cones)}}}
+
+
+def test_replay_states_matches_single_config_runs():
+    evidence = np.array([0, 2, 2, 4, 4, 4, 1, 1, 0, 0], dtype=float)
+    configs = [
+        ReplayConfig(ema_alpha=1.0, approach_on=1, inside_on=3, inside_off=2, approach_off=0.5),
+        ReplayConfig(ema_alpha=1.0, approach_on=1, inside_on=5, inside_off=2, approach_off=0.5),
+    ]
+    codes = replay_states(evidence, configs)
+    assert codes[0].tolist() == [0, 1, 1, 2, 2, 2, 3, 3, 0, 0]
+    assert codes[1].tolist() == [0, 1, 1, 1, 1, 1, 1, 1, 0, 0]
+    for config, row in zip(configs, codes):
+        assert replay_states(evidence, [config])[0].tolist() == row.tolist()
+    assert codes_to_intervals(codes[0]) == {
+        "outside": [(0, 0), (8, 9)],
+        "approaching": [(1, 2)],
+        "inside": [(3, 5)],
+        "exiting": [(6, 7)],
+    }
+
+
+def test_detection_summary_evidence():
+    summary = DetectionSummary.from_dict(
+        {"frames": [0, 2], "classes": {"cone": {"count": [1, 3], "score": [0.9, 0.7]}}}
+    )
+    assert summary.evidence().tolist() == [1, 0, 3]
+    assert summary.evidence({"cone": 0.5}, mode="score").tolist() == pytest.approx([0.45, 0, 0.35])
+
+
+def test_replay_sweep_scores_configs():
+    gt = {
+        "a.mp4": VideoGroundTruth(
+            states={"outside": [(0, 0), (8, 9)], "approaching": [(1, 2)], "inside": [(3, 5)], "exiting": [(6, 7)]}
+        )
+    }
+    preds = {
+        "a.mp4": VideoPredictions(
+            states=None, fps=30, detections=_summary([0, 2, 2, 4, 4, 4, 1, 1, 0, 0]), ocr=None
+        )
+    }
+    configs = [
+        ReplayConfig(ema_alpha=1.0, approach_on=1, inside_on=3, inside_off=2, approach_off=0.5),
+        ReplayConfig(ema_alpha=1.0, approach_on=1, inside_on=5, inside_off=2, approach_off=0.5),
+        ReplayConfig(ema_alpha=1.0, approach_on=4, inside_on=3),  # invalid, dropped
+    ]
+    result = replay_sweep(gt, preds, configs, class_weights={"cone": 1.0})
+    assert result["videos_evaluated"] == 1
+    assert len(result["results"]) == 2
+    best, worse = result["results"]
+    assert best["frame_accuracy_mean"] == 1.0
+    assert best["transition_precision_mean"] == 1.0
+    assert worse["frame_accuracy_mean"] == 0.5
+    assert result["pareto_front"][0]["inside_on"] == 3
+
+
+def test_replay_sweep_keeps_videos_without_detections():
+    config = ReplayConfig(ema_alpha=1.0, approach_on=1, inside_on=3, inside_off=2, approach_off=0.5)
+    assert codes_to_intervals(np.zeros(0, dtype=np.int8)) == {}
+    gt = {
+        "negative.mp4": VideoGroundTruth(states={"outside": [(0, 9)]}),
+        "no_frames.mp4": VideoGroundTruth(states={"outside": [(0, 4)], "inside": [(5, 9)]}),
+        "missing.mp4": VideoGroundTruth(states={"outside": [(0, 9)]}),
+    }
+    preds = {
+        "negative.mp4": VideoPredictions(states=None, fps=30, detections=_summary([0] * 10), ocr=None),
+        "no_frames.mp4": VideoPredictions(states=None, fps=30, detections={"classes": {}}, ocr=None),
+        "missing.mp4": VideoPredictions(states=None, fps=30, detections=None, ocr=None),
+    }
+    result = replay_sweep(gt, preds, [config])
+    assert result["videos_evaluated"] == 2
+    # All-outside replays: perfect on the true negative, half right on the other video.
+    assert result["results"][0]["frame_accuracy_mean"] == 0.75
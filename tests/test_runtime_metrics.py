@@ -0,0 +1,41 @@
+import json
+
+from workzone_metrics.io import load_predictions_from_timeline_csv
+from workzone_metrics.metrics.runtime import compute_runtime_metrics
+from workzone_metrics.report import generate_report
+
+
+def _write_timeline(path, times):
+    lines = ["frame,state,time_sec"]
+    for i, t in enumerate(times):
+        state = "outside" if i < 3 else "approaching"
+        lines.append(f"{i * 2},{state},{t}")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_runtime_metrics_from_timeline(tmp_path):
+    csv_path = tmp_path / "clip_timeline_fusion.csv"
+    # Rows every 2 frames; one 1.0 s stall between rows 3 and 4.
+    _write_timeline(csv_path, [0.0, 0.1, 0.2, 0.3, 1.3, 1.4])
+    preds = load_predictions_from_timeline_csv(str(csv_path))
+    frame_times = preds["clip.mp4"].frame_times
+    assert list(frame_times.frames) == [0, 2, 4, 6, 8, 10]
+
+    runtime = compute_runtime_metrics(frame_times, source_fps=20.0, stall_threshold_sec=0.5)
+    assert runtime.stall_count == 1
+    assert abs(runtime.max_gap_sec - 1.0) < 1e-9
+    assert abs(runtime.latency_p50_sec - 0.1) < 1e-9
+    assert abs(runtime.processing_time_sec - 1.4) < 1e-9
+    # 10 frames at 20 fps is 0.5 s of video processed in 1.4 s.
+    assert abs(runtime.real_time_factor - 2.8) < 1e-9
+
+
+def test_runtime_summary_in_report(tmp_path):
+    gt_path = tmp_path / "gt.json"
+    gt_path.write_text(json.dumps({"clip.mp4": {"outside": [[0, 5]], "approaching": [[6, 10]]}}))
+    _write_timeline(tmp_path / "clip_timeline.csv", [0.0, 0.01, 0.02, 0.03, 0.04, 0.05])
+    report = generate_report(str(gt_path), str(tmp_path / "clip_timeline.csv"))
+    assert report["videos"]["clip.mp4"]["stall_count"] == 0
+    assert report["summary"]["real_time_factor_n"] == 1
+    assert report["summary"]["videos_slower_than_real_time"] == 0
+    assert report["summary"]["stall_count_total"] == 0
@@ -0,0 +1,65 @@
+import json
+
+from workzone_metrics.io import load_predictions
+from workzone_metrics.report import generate_report
+from workzone_metrics.sampling import (
+    METRIC_BOUNDS,
+    _stride_states,
+    generate_sampled_report,
+    stratified_estimate,
+    stratified_sample,
+)
+
+
+def test_stratified_sample_covers_every_city():
+    videos = [f"boston_{i:02d}.mp4" for i in range(20)] + ["denver_00.mp4", "denver_01.mp4"]
+    sample, strata = stratified_sample(videos, 0.1, seed=3)
+    assert strata == {"boston": (2, 20), "denver": (1, 2)}
+    assert len(sample) == 3
+    assert stratified_sample(videos, 0.1, seed=3)[0] == sample
+    assert _stride_states({"inside": [(5, 9), (10, 10)]}, 5) == {"inside": [(1, 1), (2, 2)]}
+
+
+def test_sampled_report_skips_unsampled_inputs_and_bounds_full_mean(tmp_path):
+    gt = {}
+    for city in ("boston", "denver"):
+        for i in range(10):
+            gt[f"{city}_{i:02d}.mp4"] = {"outside": [[0, 49]], "inside": [[50, 99]]}
+    gt_path = tmp_path / "gt.json"
+    gt_path.write_text(json.dumps(gt))
+    pred_dir = tmp_path / "timelines"
+    pred_dir.mkdir()
+    for i, video in enumerate(sorted(gt)):
+        switch = 50 + (i * 7) % 11 - 5
+        rows = ["frame,state,time_sec"]
+        rows += [f"{f},{'INSIDE' if f >= switch else 'OUT'},{f / 30:.4f}" for f in range(100)]
+        (pred_dir / f"{video[:-4]}_timeline.csv").write_text("\n".join(rows))
+
+    sampled = set(stratified_sample(gt, 0.3, seed=1)[0])
+    unsampled = sorted(set(gt) - sampled)[0]
+    # Never opened when sampling: parsing it would raise.
+    (pred_dir / f"{unsampled[:-4]}_timeline.csv").write_text("no,header\n")
+    assert set(load_predictions(str(pred_dir), videos=sampled)) == sampled
+
+    report = generate_sampled_report(str(gt_path), str(pred_dir), 0.3, seed=1, group_by=["city"])
+    assert set(report["videos"]) == sampled
+    assert report["groups"]["city"]["denver"]["videos_total"] == 3
+    assert report["sample"]["strata"]["boston"] == {"sampled": 3, "total": 10}
+    estimate = report["sample"]["estimates"]["frame_accuracy"]
+    assert estimate["n"] == 6
+
+    (pred_dir / f"{unsampled[:-4]}_timeline.csv").unlink()
+    full = generate_report(str(gt_path), str(pred_dir))["summary"]["frame_accuracy_mean"]
+    assert estimate["ci_low"] <= full <= estimate["ci_high"]
+
+
+def test_rate_interval_stays_open_and_in_range_when_sample_is_constant():
+    bounds = METRIC_BOUNDS["transition_recall"]
+    misses = stratified_estimate({"boston": [0.0, 0.0, 0.0]}, {"boston": 30}, bounds=bounds)
+    assert misses["estimate"] == 0.0 and misses["ci_low"] == 0.0 and misses["ci_high"] > 0.2
+    hits = stratified_estimate({"boston": [1.0, 1.0], "denver": [1.0]}, {"boston": 20, "denver": 5}, bounds=bounds)
+    assert hits["ci_high"] == 1.0 and hits["ci_low"] < 0.9
+    mixed = stratified_estimate({"boston": [0.0, 0.05, 0.0, 0.9]}, {"boston": 40}, bounds=bounds)
+    assert 0.0 <= mixed["ci_low"] < mixed["estimate"] < mixed["ci_high"] <= 1.0
+    count = stratified_estimate({"boston": [0.0, 0.0, 5.0]}, {"boston": 40}, bounds=METRIC_BOUNDS["stall_count"])
+    assert count["ci_low"] == 0.0 < count["ci_high"]
@@ -0,0 +1,85 @@
+import json
+import math
+import random
+from array import array
+
+import pytest
+
+from workzone_metrics.cli import main
+from workzone_metrics.data_models import VideoGroundTruth, VideoPredictions
+from workzone_metrics.io import load_predictions
+from workzone_metrics.score_sweep import _sweep_events, score_sweep, sweep_curve
+
+
+def _brute_force(gt_labels, scores, threshold):
+    total = max(len(gt_labels), len(scores))
+    gt = [gt_labels[t] if t < len(gt_labels) else "outside" for t in range(total)]
+    on = [t < len(scores) and not math.isnan(scores[t]) and scores[t] >= threshold for t in range(total)]
+    tp = sum(1 for g, p in zip(gt, on) if p and g != "outside")
+    fp = sum(1 for g, p in zip(gt, on) if p and g == "outside")
+    episodes, in_false = 0, False
+    for g, p in zip(gt, on):
+        is_false = g == "outside" and p
+        episodes += is_false and not in_false
+        in_false = is_false
+    return tp, fp, episodes
+
+
+def test_sweep_matches_brute_force_thresholding():
+    rng = random.Random(3)
+    for _ in range(200):
+        n = rng.randint(1, 40)
+        gt_labels = [rng.choice(["outside", "outside", "inside", "approaching"]) for _ in range(n)]
+        scores = [rng.choice([math.nan] + [i / 4 for i in range(5)]) for _ in range(rng.randint(0, n + 5))]
+        events, pos, neg, total = _sweep_events(gt_labels, scores)
+        result = sweep_curve(events, pos, neg, minutes=total / 60.0)
+        curve = result["curve"]
+        for i, threshold in enumerate(curve["threshold"]):
+            tp, fp, episodes = _brute_force(gt_labels, scores, threshold)
+            assert curve["precision"][i] == tp / (tp + fp)
+            assert curve["recall"][i] == (tp / pos if pos else None)
+            assert curve["false_activations_per_minute"][i] == pytest.approx(episodes / (total / 60.0))
+        assert curve["threshold"] == sorted(set(s for s in scores if not math.isnan(s)), reverse=True)
+
+
+def test_average_precision_and_pooled_dataset():
+    gt = {
+        "a.mp4": VideoGroundTruth(states={"outside": [(0, 1)], "inside": [(2, 3)]}),
+        "b.mp4": VideoGroundTruth(states={"inside": [(0, 1)], "outside": [(2, 3)]}),
+        "c.mp4": VideoGroundTruth(states={"inside": [(0, 3)]}),
+    }
+    preds = {
+        "a.mp4": VideoPredictions(None, 1.0, None, None, scores=array("d", [0.1, 0.2, 0.9, 0.8])),
+        "b.mp4": VideoPredictions(None, 1.0, None, None, scores=array("d", [0.7, 0.3, 0.6, 0.0])),
+        "c.mp4": VideoPredictions(None, 1.0, None, None),
+    }
+    result = score_sweep(gt, preds, max_points=3)
+    assert set(result["videos"]) == {"a.mp4", "b.mp4"}
+    assert result["videos"]["a.mp4"]["average_precision"] == 1.0
+    # b: 0.7 (TP), 0.6 (FP), 0.3 (TP) -> 0.5 * 1 + 0.5 * 2/3
+    assert result["videos"]["b.mp4"]["average_precision"] == pytest.approx(0.5 + 1 / 3)
+    assert len(result["videos"]["b.mp4"]["curve"]["threshold"]) == 3
+    dataset = result["dataset"]
+    assert dataset["positives"] == 4 and dataset["negatives"] == 4
+    assert dataset["curve"]["threshold"] == [0.9, 0.3, 0.0]
+    assert dataset["curve"]["recall"][-1] == 1.0
+    assert dataset["mean_average_precision"] == pytest.approx((1.0 + 0.5 + 1 / 3) / 2)
+
+
+def test_timeline_score_column_and_cli(tmp_path):
+    csv_path = tmp_path / "a_timeline_fusion.csv"
+    csv_path.write_text(
+        "frame,time_sec,state,score\n0,0.0,OUTSIDE,0.1\n2,0.2,OUTSIDE,\n4,0.4,INSIDE,0.9\n5,0.5,INSIDE,0.8\n"
+    )
+    entry = load_predictions(str(csv_path))["a.mp4"]
+    assert list(entry.scores)[:2] == [0.1, 0.1]
+    assert all(math.isnan(v) for v in entry.scores[2:4])
+    assert list(entry.scores)[4:] == [0.9, 0.8]
+
+    gt_path = tmp_path / "gt.json"
+    gt_path.write_text(json.dumps({"a.mp4": {"outside": [[0, 3]], "inside": [[4, 5]]}}))
+    out = tmp_path / "sweep.json"
+    main(["--gt", str(gt_path), "--pred", str(csv_path), "--out", str(tmp_path / "r.json"), "--score-sweep", str(out)])
+    sweep = json.loads(out.read_text())
+    assert sweep["videos"]["a.mp4"]["average_precision"] == 1.0
+    assert sweep["videos"]["a.mp4"]["curve"]["false_activations_per_minute"] == [0.0, 0.0, pytest.approx(100.0)]
@@ -0,0 +1,73 @@
+import json
+
+from workzone_metrics.cli import main
+from workzone_metrics.data_models import VideoGroundTruth, VideoPredictions
+from workzone_metrics.metrics.state import _disagreement_runs, _label_runs, _labels_from_intervals
+from workzone_metrics.segments import error_segments
+
+
+def test_label_runs_follow_painting_priority():
+    states = {"inside": [(2, 8)], "outside": [(5, 5)], "approaching": [(0, 3)]}
+    runs = _label_runs(states, 12)
+    assert runs == [
+        (0, 3, "approaching"),
+        (4, 4, "inside"),
+        (5, 5, "outside"),
+        (6, 8, "inside"),
+        (9, 11, "outside"),
+    ]
+    expanded = [label for start, end, label in runs for _ in range(start, end + 1)]
+    assert expanded == _labels_from_intervals(states, 12)
+
+
+def test_disagreement_runs_split_on_state_pair():
+    gt = [(0, 4, "outside"), (5, 9, "inside")]
+    pred = [(0, 2, "outside"), (3, 6, "approaching"), (7, 9, "inside")]
+    assert _disagreement_runs(gt, pred) == [
+        (3, 4, "outside", "approaching"),
+        (5, 6, "inside", "approaching"),
+    ]
+
+
+def test_error_segments_cli_sorted_by_length(tmp_path):
+    gt = {
+        "a.mp4": {"outside": [[0, 4]], "inside": [[5, 19]]},
+        "b.mp4": {"outside": [[0, 9]]},
+    }
+    preds = {
+        "a.mp4": {"states": {"outside": [[0, 9]], "inside": [[10, 19]]}, "fps": 10},
+        "b.mp4": {"states": {"outside": [[0, 7]], "approaching": [[8, 9]]}},
+    }
+    gt_path = tmp_path / "gt.json"
+    pred_path = tmp_path / "pred.json"
+    out_path = tmp_path / "errors.ndjson"
+    gt_path.write_text(json.dumps(gt))
+    pred_path.write_text(json.dumps(preds))
+
+    main(
+        ["--gt", str(gt_path), "--pred", str(pred_path), "--out", str(tmp_path / "r.json")]
+        + ["--error-segments", str(out_path)]
+    )
+    records = [json.loads(line) for line in out_path.read_text().splitlines()]
+    assert records == [
+        {
+            "video": "a.mp4",
+            "start": 5,
+            "end": 9,
+            "length": 5,
+            "gt_state": "inside",
+            "pred_state": "outside",
+            "start_sec": 0.5,
+            "end_sec": 1.0,
+        },
+        {
+            "video": "b.mp4",
+            "start": 8,
+            "end": 9,
+            "length": 2,
+            "gt_state": "outside",
+            "pred_state": "approaching",
+        },
+    ]
+    gt_entry = VideoGroundTruth(states={"outside": [(0, 9)]})
+    assert error_segments({"c.mp4": gt_entry}, {"c.mp4": VideoPredictions(None, None, None, None)}) == []
@@ -0,0 +1,55 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from workzone_metrics.report import generate_report
+from workzone_metrics.server import EvaluationService, make_server
+
+
+def _request(base, path, payload=None):
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    with urllib.request.urlopen(urllib.request.Request(base + path, data=data)) as resp:
+        return json.loads(resp.read().decode("utf-8"))
+
+
+def test_server_evaluate_matches_generate_report(tmp_path):
+    gt_path = tmp_path / "gt.json"
+    gt_path.write_text(json.dumps({"a.mp4": {"outside": [[0, 4]], "inside": [[5, 9]]}}))
+    pred = {"a.mp4": {"fps": 30, "states": {"outside": [[0, 6]], "inside": [[7, 9]]}}}
+    pred_path = tmp_path / "pred.json"
+    pred_path.write_text(json.dumps(pred))
+
+    server = make_server(EvaluationService(str(gt_path), cache_size=2), port=0, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = "http://127.0.0.1:{}".format(server.server_address[1])
+    try:
+        assert _request(base, "/warmup", {"pred": str(pred_path)})["gt_videos_expanded"] == 1
+        expected = generate_report(str(gt_path), str(pred_path), transition_tolerance_frames=2)
+        by_path = _request(base, "/evaluate", {"pred": str(pred_path), "transition_tolerance_frames": 2})
+        inline = _request(base, "/evaluate", {"predictions": pred, "transition_tolerance_frames": 2})
+        assert by_path == json.loads(json.dumps(expected))
+        assert inline == by_path
+
+        stats = _request(base, "/stats")
+        assert stats["cache_hits"] == 1
+        assert stats["cache_misses"] == 1
+        assert stats["evaluations"] == 2
+
+        bad_requests = (
+            ("/evaluate", {"pred": 5}),
+            ("/evaluate", {"predictions": pred, "transition_tolerance_frames": [2]}),
+            ("/evaluate", {"predictions": pred, "metrics": 5}),
+            ("/warmup", {"pred": 5}),
+        )
+        for path, bad in bad_requests:
+            with pytest.raises(urllib.error.HTTPError) as err:
+                _request(base, path, bad)
+            assert err.value.code == 400
+            assert "error" in json.loads(err.value.read().decode("utf-8"))
+    finally:
+        server.shutdown()
+        server.server_close()
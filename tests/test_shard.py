@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from workzone_metrics.cli import main
+from workzone_metrics.report import generate_report
+from workzone_metrics.shard import load_partial, merge_partials, parse_shard, select_shard
+
+
+def _write_inputs(tmp_path):
+    gt = {
+        "boston_a_snippet.mp4": {"outside": [[0, 4]], "inside": [[5, 9]]},
+        "boston_b_snippet.mp4": {"outside": [[0, 9]]},
+        "denver_c_snippet.mp4": {"outside": [[0, 2]], "approaching": [[3, 5]], "inside": [[6, 19]]},
+    }
+    preds = {
+        "boston_a_snippet.mp4": {"states": {"outside": [[0, 6]], "inside": [[7, 9]]}},
+        "boston_b_snippet.mp4": {"states": {"outside": [[0, 9]]}},
+        "denver_c_snippet.mp4": {"states": {"outside": [[0, 4]], "inside": [[5, 19]]}},
+    }
+    gt_path = tmp_path / "gt.json"
+    pred_path = tmp_path / "pred.json"
+    gt_path.write_text(json.dumps(gt))
+    pred_path.write_text(json.dumps(preds))
+    return str(gt_path), str(pred_path)
+
+
+def test_parse_and_select_shard():
+    assert parse_shard("1/3") == (1, 3)
+    with pytest.raises(ValueError):
+        parse_shard("3/3")
+    assert select_shard(["c", "a", "b", "d"], 1, 2) == ["b", "d"]
+
+
+def test_merged_partials_match_full_report(tmp_path):
+    gt_path, pred_path = _write_inputs(tmp_path)
+    parts = []
+    for i in range(2):
+        part = tmp_path / f"shard{i}.part"
+        main(
+            ["--gt", gt_path, "--pred", pred_path, "--shard", f"{i}/2", "--partial", str(part)]
+            + ["--group-by", "city"]
+        )
+        parts.append(load_partial(str(part)))
+
+    merged = merge_partials(parts)
+    full = generate_report(gt_path, pred_path, group_by=["city"])
+    assert merged["shards"]["missing"] == []
+    assert merged["videos"] == full["videos"]
+    for key, value in full["summary"].items():
+        if isinstance(value, dict):
+            assert merged["summary"][key] == value, key
+        else:
+            assert merged["summary"][key] == pytest.approx(value), key
+    assert merged["groups"]["city"]["boston"]["videos_evaluated"] == 2
+
+    # 40 frames in total; 35 on the diagonal.
+    summary = full["summary"]
+    assert summary["confusion_matrix"]["counts"][2] == [2, 0, 17, 0]
+    assert summary["pooled_frame_accuracy"] == pytest.approx(35 / 40)
+    assert summary["pooled_iou_inside"] == pytest.approx(17 / 20)
+    assert summary["pooled_iou_approaching"] == 0.0
+
+    missing = merge_partials(parts[:1])
+    assert missing["shards"]["missing"] == [1]
+    with pytest.raises(ValueError):
+        merge_partials([parts[0], parts[0]])
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from workzone_metrics.data_models import VideoGroundTruth, VideoPredictions
+from workzone_metrics.report import _build_report
+from workzone_metrics.simulation import advisory_tracks, main, simulate_compliance
+
+
+def _dataset():
+    gt = {
+        "a.mp4": VideoGroundTruth(states={"outside": [(0, 9)], "inside": [(10, 29)]}),
+        "b.mp4": VideoGroundTruth(states={"outside": [(0, 19)], "approaching": [(20, 39)]}),
+        "c.mp4": VideoGroundTruth(states={"outside": [(0, 9)]}),
+    }
+    preds = {
+        "a.mp4": VideoPredictions(
+            states={"outside": [(0, 4)], "approaching": [(5, 29)]}, fps=10.0, detections=None, ocr=None
+        ),
+        "b.mp4": VideoPredictions(
+            states={"outside": [(0, 29)], "inside": [(30, 39)]}, fps=10.0, detections=None, ocr=None
+        ),
+        "c.mp4": VideoPredictions(states={"inside": [(0, 9)]}, fps=10.0, detections=None, ocr=None),
+    }
+    return gt, preds
+
+
+def test_delay_and_lead_scenarios():
+    gt, preds = _dataset()
+    result = simulate_compliance(
+        advisory_tracks(gt, preds), gains=[0.4], delays_sec=[0.0, 1.0], min_leads_sec=[None, 0.0, 1.0]
+    )
+    assert result["videos"] == 2  # c.mp4 has no GT advisory frames
+    assert result["gt_advisory_frames"] == 40
+    rows = {(row["delay_sec"], row["min_lead_sec"]): row for row in result["scenarios"]}
+    # a.mp4: advisory from frame 5, 0.5 s before its span; b.mp4: 1 s late.
+    assert rows[(0.0, None)]["mean_reduction"] == pytest.approx(0.4 * (20 / 20 + 10 / 20) / 2)
+    assert rows[(1.0, None)]["expected_reduction"] == pytest.approx(0.4 * (15 + 0) / 40)
+    assert rows[(0.0, 0.0)]["expected_reduction"] == pytest.approx(0.4 * 20 / 40)
+    assert rows[(0.0, 1.0)]["expected_reduction"] == 0.0
+    assert rows[(0.0, None)]["std_reduction"] == pytest.approx(0.4 * 0.25)
+
+
+def test_base_scenario_matches_report_metric():
+    gt, preds = _dataset()
+    report = _build_report(gt, preds)
+    result = simulate_compliance(advisory_tracks(gt, preds), gains=[0.4])
+    assert result["scenarios"][0]["mean_reduction"] == pytest.approx(
+        report["summary"]["simulated_speed_violation_reduction_mean"]
+    )
+
+
+def test_cli_writes_scenario_grid(tmp_path):
+    gt_path = tmp_path / "gt.json"
+    pred_path = tmp_path / "pred.json"
+    out_path = tmp_path / "sim.json"
+    gt_path.write_text(json.dumps({"a.mp4": {"outside": [[0, 9]], "inside": [[10, 29]]}}))
+    pred_path.write_text(json.dumps({"a.mp4": {"fps": 10, "states": {"outside": [[0, 4]], "inside": [[5, 29]]}}}))
+    argv = ["--gt", str(gt_path), "--pred", str(pred_path), "--out", str(out_path)]
+    main(argv + ["--gain", "0.2,0.4", "--delay-sec", "0,0.5,1", "--min-lead-sec", "none,1"])
+    result = json.loads(out_path.read_text())
+    assert len(result["scenarios"]) == 12
+    assert result["scenarios"][-1]["min_lead_sec"] == 1.0
@@ -1,4 +1,4 @@
-from workzone_metrics.metrics.state import compute_state_metrics
+from workzone_metrics.metrics.state import TransitionBreakdown, _match_transitions, compute_state_metrics
 
 
 def test_state_metrics_basic():
@@ -82,3 +82,39 @@ def test_state_metrics_empty_cases_are_none():
     assert metrics.event_precision is None
     assert metrics.advisory_event_recall is None
     assert metrics.advisory_event_precision is None
+
+
+def test_transition_breakdown_by_type():
+    gt = {"outside": [(0, 9), (30, 39)], "inside": [(10, 29)]}
+    pred = {"outside": [(0, 11), (27, 39)], "inside": [(12, 26)]}
+    breakdown = TransitionBreakdown()
+    metrics = compute_state_metrics(gt, pred, transition_tolerance_frames=2, transition_breakdown=breakdown)
+    assert metrics.transition_recall == 0.5
+
+    other = TransitionBreakdown.from_dict(breakdown.to_dict())
+    breakdown.merge(other)
+    summary = breakdown.summary()
+    assert summary["outside->inside"]["matched"] == 2
+    assert summary["outside->inside"]["offset_histogram"] == {"2": 2}
+    assert summary["outside->inside"]["recall_curve"] == [[0, 0.0], [1, 0.0], [2, 1.0]]
+    assert summary["inside->outside"]["unmatched_gt"] == 2
+    assert summary["inside->outside"]["recall"] == 0.0
+
+
+def test_recall_curve_uses_nearest_prediction_at_any_tolerance():
+    gt = {"outside": [(0, 9), (30, 39)], "inside": [(10, 29)]}
+    pred = {"outside": [(0, 11), (27, 39)], "inside": [(12, 26)]}
+    breakdown = TransitionBreakdown()
+    metrics = compute_state_metrics(gt, pred, transition_tolerance_frames=0, transition_breakdown=breakdown)
+    assert metrics.transition_recall == 0.0
+    summary = breakdown.summary()
+    assert summary["outside->inside"]["recall_curve"] == [[0, 0.0], [1, 0.0], [2, 1.0]]
+    assert summary["inside->outside"]["recall_curve"][-1] == [3, 1.0]
+
+    # Greedy matching takes the earlier prediction; the curve still sees the nearer one.
+    gt_transitions = [("outside", "inside", 10)]
+    pred_transitions = [("outside", "inside", 7), ("outside", "inside", 10)]
+    breakdown = TransitionBreakdown()
+    _match_transitions(gt_transitions, pred_transitions, 3, breakdown)
+    assert breakdown.offsets["outside->inside"] == {-3: 1}
+    assert breakdown.summary()["outside->inside"]["recall_curve"] == [[0, 1.0]]
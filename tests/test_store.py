@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from workzone_metrics.cli import main as eval_main
+from workzone_metrics.store import compare_stored_runs, import_report, list_runs, open_store
+
+
+def test_store_records_runs_and_finds_regressions(tmp_path):
+    gt = {
+        "a.mp4": {"outside": [[0, 4]], "inside": [[5, 9]]},
+        "b.mp4": {"outside": [[0, 9]]},
+    }
+    good = {video: {"states": states} for video, states in gt.items()}
+    worse = {
+        "a.mp4": {"states": {"outside": [[0, 6]], "inside": [[7, 9]]}},
+        "b.mp4": {"states": {"outside": [[0, 9]]}},
+    }
+    gt_path = tmp_path / "gt.json"
+    gt_path.write_text(json.dumps(gt))
+    for name, preds in (("good", good), ("worse", worse)):
+        (tmp_path / f"{name}.json").write_text(json.dumps(preds))
+    db = str(tmp_path / "results.db")
+    report_path = tmp_path / "report.json"
+
+    eval_main(["--gt", str(gt_path), "--pred", f"good={tmp_path / 'good.json'}", "--store", db])
+    eval_main(
+        ["--gt", str(gt_path), "--pred", f"worse={tmp_path / 'worse.json'}", "--store", db]
+        + ["--transition-tolerance-frames", "1", "--out", str(report_path)]
+    )
+
+    conn = open_store(db)
+    import_report(conn, str(report_path), name="imported")
+    runs = list_runs(conn)
+    assert [run["name"] for run in runs] == ["good", "worse", "imported"]
+    assert runs[1]["params"]["transition_tolerance_frames"] == 1
+    assert runs[0]["gt_hash"] == runs[1]["gt_hash"]
+
+    result = compare_stored_runs(conn, "good", "worse", metrics=["frame_accuracy", "false_activation_rate"])
+    frame = result["metrics"]["frame_accuracy"]
+    assert frame["n"] == 2
+    assert [row["video"] for row in frame["regressed"]] == ["a.mp4"]
+    assert frame["regressed"][0]["delta"] == pytest.approx(-0.2)
+    assert result["metrics"]["false_activation_rate"]["regressed"] == []
+    assert compare_stored_runs(conn, "worse", "imported")["metrics"]["frame_accuracy"]["regressed"] == []
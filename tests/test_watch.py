@@ -0,0 +1,68 @@
+import json
+
+from workzone_metrics.io import load_ground_truth
+from workzone_metrics.report import generate_report
+from workzone_metrics.watch import ReportWatcher, watch
+
+
+def _timeline(path, states):
+    rows = ["frame,state,time_sec"] + [f"{i},{s},{i / 30}" for i, s in enumerate(states)]
+    path.write_text("\n".join(rows) + "\n")
+
+
+def test_watcher_updates_incrementally(tmp_path):
+    gt_path = tmp_path / "gt.json"
+    gt_path.write_text(
+        json.dumps(
+            {
+                "a.mp4": {"outside": [[0, 4]], "inside": [[5, 9]]},
+                "b.mp4": {"outside": [[0, 9]]},
+            }
+        )
+    )
+    outputs = tmp_path / "outputs"
+    outputs.mkdir()
+    watcher = ReportWatcher(load_ground_truth(str(gt_path)), str(outputs))
+    assert watcher.report()["summary"]["videos_evaluated"] == 0
+
+    _timeline(outputs / "a_timeline_fusion.csv", ["outside"] * 6 + ["inside"] * 4)
+    assert watcher.poll() == []  # first sighting: wait for the file to settle
+    assert watcher.poll() == ["a.mp4"]
+    assert watcher.poll() == []
+    assert watcher.report()["summary"]["videos_evaluated"] == 1
+
+    _timeline(outputs / "b_timeline.csv", ["outside"] * 10)
+    (outputs / "DONE").write_text("")
+    out_path = tmp_path / "report.json"
+    report = watch(str(gt_path), str(outputs), str(out_path), poll_interval_sec=0.01)
+
+    expected = generate_report(str(gt_path), str(outputs))
+    assert json.loads(out_path.read_text())["videos"] == json.loads(json.dumps(expected["videos"]))
+    assert report["summary"]["videos_evaluated"] == 2
+    for key, value in expected["summary"].items():
+        if isinstance(value, float):
+            assert abs(report["summary"][key] - value) < 1e-9
+        else:
+            assert report["summary"][key] == value
+
+
+def test_watcher_keeps_groups_in_step_with_changed_timelines(tmp_path):
+    gt = {"boston_a.mp4": {"outside": [[0, 4]], "inside": [[5, 9]]}, "denver_b.mp4": {"outside": [[0, 9]]}}
+    gt_path = tmp_path / "gt.json"
+    gt_path.write_text(json.dumps(gt))
+    outputs = tmp_path / "outputs"
+    outputs.mkdir()
+    watcher = ReportWatcher(load_ground_truth(str(gt_path)), str(outputs), group_by=["city"])
+    _timeline(outputs / "boston_a_timeline.csv", ["outside"] * 10)
+    watcher.poll()
+    watcher.poll()
+    _timeline(outputs / "boston_a_timeline.csv", ["outside"] * 6 + ["inside"] * 4)
+    _timeline(outputs / "denver_b_timeline.csv", ["outside"] * 10)
+    watcher.poll()
+    assert sorted(watcher.poll()) == ["boston_a.mp4", "denver_b.mp4"]
+
+    groups = watcher.report()["groups"]["city"]
+    expected = generate_report(str(gt_path), str(outputs), group_by=["city"])["groups"]["city"]
+    assert groups["boston"]["videos_evaluated"] == 1
+    assert groups["boston"]["frame_accuracy_mean"] == expected["boston"]["frame_accuracy_mean"] == 0.9
+    assert groups["denver"] == expected["denver"]